@@ -3,6 +3,11 @@ import numpy as np
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
+import sys
+
+# Los módulos compartidos del pipeline viven en RGB_img_corpus_one
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'RGB_img_corpus_one'))
+from image_channels import extract_channels
 
 # Función para convertir una imagen en un vector y almacenar la imagen RGB y su vector separado por canales
 def image_to_vector_and_save(image_path, save_path):
@@ -11,13 +16,8 @@ def image_to_vector_and_save(image_path, save_path):
     # Redimensionar la imagen a un tamaño fijo, por ejemplo, 100x100 píxeles
     image_resized = cv2.resize(image, (100, 100))
     
-    # Separar la imagen en los tres canales (B, G, R)
-    B, G, R = cv2.split(image_resized)
-
-    # Aplanar cada canal 2D en un vector 1D
-    R_vector = R.flatten()
-    G_vector = G.flatten()
-    B_vector = B.flatten()
+    # Separar los canales R, G y B en una sola matriz (una fila por canal), con una sola copia
+    R_vector, G_vector, B_vector = extract_channels(image_resized, 'RGB')
 
     # Crear un DataFrame con columnas separadas para R, G y B
     vector_df = pd.DataFrame({
@@ -1,50 +1,36 @@
 import numpy as np
 import pandas as pd
 import os
-from scipy import stats
+import sys
 
-# Función para leer el archivo Excel y calcular las estadísticas
-def calculate_statistics_from_excel(excel_path, save_path):
-    # Leer el archivo Excel existente
-    vector_df = pd.read_excel(excel_path)
+# Los módulos compartidos del pipeline viven en RGB_img_corpus_one
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'RGB_img_corpus_one'))
+from streaming_statistics import ChannelAccumulator, iter_excel_row_chunks
+
+# Función para leer el archivo Excel por bloques y calcular las estadísticas
+def calculate_statistics_from_excel(excel_path, save_path, chunk_rows=4096):
+    # Un acumulador en línea por canal: el archivo se lee por bloques, sin cargarlo completo
+    acumuladores = {'R': ChannelAccumulator(), 'G': ChannelAccumulator(), 'B': ChannelAccumulator()}
+
+    for encabezados, bloque in iter_excel_row_chunks(excel_path, chunk_rows):
+        for canal, acumulador in acumuladores.items():
+            valores = bloque[:, encabezados.index(canal)]
+            acumulador.update(valores[~np.isnan(valores)])
 
-    # Calcular las estadísticas para el canal R, G y B
-    mode_r = stats.mode(vector_df['R'])
-    mode_g = stats.mode(vector_df['G'])
-    mode_b = stats.mode(vector_df['B'])
-    
     # Imprimir los modos para depuración
-    print("Modo R:", mode_r)
-    print("Modo G:", mode_g)
-    print("Modo B:", mode_b)
+    print("Modo R:", acumuladores['R'].mode())
+    print("Modo G:", acumuladores['G'].mode())
+    print("Modo B:", acumuladores['B'].mode())
 
+    canales = ['R', 'G', 'B']
     stats_df = pd.DataFrame({
-        'Channel': ['R', 'G', 'B'],
-        'Moda': [
-            mode_r.mode,  # Sin indexar
-            mode_g.mode,  # Sin indexar
-            mode_b.mode   # Sin indexar
-        ],
-        'Desviación Estándar': [
-            np.std(vector_df['R']), 
-            np.std(vector_df['G']), 
-            np.std(vector_df['B'])
-        ],
-        'Promedio': [
-            np.mean(vector_df['R']), 
-            np.mean(vector_df['G']), 
-            np.mean(vector_df['B'])
-        ],
-        'Valor Máximo': [
-            np.max(vector_df['R']), 
-            np.max(vector_df['G']), 
-            np.max(vector_df['B'])
-        ],
-        'Valor Mínimo': [
-            np.min(vector_df['R']), 
-            np.min(vector_df['G']), 
-            np.min(vector_df['B'])
-        ]
+        'Channel': canales,
+        'Moda': [acumuladores[c].mode() for c in canales],
+        # Desviación estándar poblacional, igual que np.std
+        'Desviación Estándar': [acumuladores[c].std(ddof=0) for c in canales],
+        'Promedio': [acumuladores[c].mean for c in canales],
+        'Valor Máximo': [acumuladores[c].maximum for c in canales],
+        'Valor Mínimo': [acumuladores[c].minimum for c in canales]
     })
 
     # Guardar las estadísticas en un nuevo archivo Excel
@@ -1,24 +1,23 @@
 import cv2
 import numpy as np
 import os
-import pandas as pd
+import sys
 
-# Función para convertir una imagen en un vector y almacenar el vector separado por canales
-def image_to_vector(image_path):
+# Los módulos compartidos del pipeline viven en RGB_img_corpus_one
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'RGB_img_corpus_one'))
+from channel_store import ChannelVectorBuilder
+
+# Tamaño al que se redimensionan las imágenes (ancho, alto)
+IMAGE_SIZE = (8, 8)
+
+# Función para leer una imagen y redimensionarla al tamaño fijo
+def resize_image(image_path):
     # Leer la imagen en formato RGB
     image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"No se pudo leer la imagen en {image_path}")
     # Redimensionar la imagen a un tamaño fijo, por ejemplo, 100x100 píxeles
-    image_resized = cv2.resize(image, (8, 8))
-    
-    # Separar la imagen en los tres canales (B, G, R)
-    B, G, R = cv2.split(image_resized)
-
-    # Aplanar cada canal 2D en un vector 1D
-    R_vector = R.flatten()
-    G_vector = G.flatten()
-    B_vector = B.flatten()
-
-    return R_vector, G_vector, B_vector
+    return cv2.resize(image, IMAGE_SIZE)
 
 # Ruta del corpus de imágenes
 corpus_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\curpus'
@@ -26,29 +25,19 @@ corpus_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\curpus'
 # Obtener todos los archivos de imagen en el directorio
 image_files = [f for f in os.listdir(corpus_path) if f.endswith(('.png', '.jpg', '.jpeg'))]
 
-# DataFrame para almacenar los datos de las imágenes
-all_vectors_df = pd.DataFrame()
+# Matriz preasignada para los vectores de todas las imágenes (sin pd.concat por imagen)
+builder = ChannelVectorBuilder((IMAGE_SIZE[1], IMAGE_SIZE[0]), channels='RGB', capacity=len(image_files))
 
 # Iterar a través de cada archivo de imagen
 for image_file in image_files:
     image_path = os.path.join(corpus_path, image_file)  # Ruta completa de la imagen
-    R_vector, G_vector, B_vector = image_to_vector(image_path)  # Convertir la imagen a vector
-
-    # Crear un DataFrame temporal para la imagen actual
-    vector_df = pd.DataFrame({
-        'Imagen': image_file,
-        'R': [R_vector.tolist()],  # Convertir a lista para guardar en Excel
-        'G': [G_vector.tolist()],
-        'B': [B_vector.tolist()]
-    })
-
-    # Concatenar los datos al DataFrame general
-    all_vectors_df = pd.concat([all_vectors_df, vector_df], ignore_index=True)
-
-# Guardar el DataFrame de todos los vectores en un archivo Excel
-output_excel_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus\0.1.all_image_vectors.xlsx'
-all_vectors_df.to_excel(output_excel_path, index=False)  # Guardar en Excel
-
-# Mostrar el DataFrame en consola
-print("DataFrame de Vectores de Imágenes (R, G, B separados):")
-print(all_vectors_df)
+    builder.add_image(image_file, resize_image(image_path))  # Copiar sus canales R, G y B a la siguiente fila
+
+# Guardar un arreglo uint8 (imágenes x píxeles) por canal, en lugar de listas en texto dentro de celdas de Excel
+output_vectors_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus\0.1.all_image_vectors.npz'
+builder.save(output_vectors_path)
+
+# Mostrar los vectores en consola
+print("Vectores de Imágenes (R, G, B separados):")
+print(builder.to_frame())
+print(f"Vectores guardados en: {output_vectors_path}")
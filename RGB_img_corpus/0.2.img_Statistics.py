@@ -1,43 +1,39 @@
+import os
+import sys
 import pandas as pd
-from ast import literal_eval
+
+# Los módulos compartidos del pipeline viven en RGB_img_corpus_one
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'RGB_img_corpus_one'))
+from channel_store import load_channel_vectors, convert_vectors_excel
 
 # Definir la ruta de entrada y salida
+INPUT_VECTORS_PATH = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus\0.1.all_image_vectors.npz'
 INPUT_EXCEL_PATH = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus\0.1.all_image_vectors.xlsx'
 OUTPUT_EXCEL_PATH = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus\0.2.resultado_R.xlsx'
 
 try:
-    # Leer el archivo Excel
-    df = pd.read_excel(INPUT_EXCEL_PATH)
-
-    # Verificar que la columna 'R' está presente
-    if 'R' not in df.columns:
-        raise ValueError("La columna 'R' no se encuentra en el DataFrame.")
-
-    # Crear una lista para almacenar los resultados
-    results = []
-
-    # Procesar la columna 'R'
-    for index, row in df.iterrows():
-        # Convertir el vector de la columna R de cadena a lista
-        vector_r = literal_eval(row['R']) if isinstance(row['R'], str) else row['R']
-        
-        # Crear un diccionario con la imagen y los valores R
-        image_data = {'Imagen': row['Imagen']}
-        for i in range(len(vector_r)):
-            image_data[f'R_{i}'] = vector_r[i]
-        
-        # Agregar el diccionario a la lista de resultados
-        results.append(image_data)
-
-    # Convertir los resultados a un DataFrame
-    df_results = pd.DataFrame(results).T
+    # Los archivos Excel de versiones anteriores (listas en texto) se convierten una sola vez
+    if not os.path.isfile(INPUT_VECTORS_PATH):
+        if not os.path.isfile(INPUT_EXCEL_PATH):
+            raise FileNotFoundError(INPUT_VECTORS_PATH)
+        convert_vectors_excel(INPUT_EXCEL_PATH, INPUT_VECTORS_PATH)
+
+    # Leer el canal R como un bloque uint8 (imágenes x píxeles), sin convertir texto
+    image_files, channels = load_channel_vectors(INPUT_VECTORS_PATH, ['R'])
+    R = channels['R']
+
+    # Misma tabla que antes: la primera fila con el nombre de cada imagen y después los valores R_0, R_1, ...
+    df_results = pd.concat([
+        pd.DataFrame([image_files]),
+        pd.DataFrame(R.T, index=[f'R_{i}' for i in range(R.shape[1])])
+    ])
 
     # Guardar el resultado en un nuevo archivo Excel
     df_results.to_excel(OUTPUT_EXCEL_PATH, index=False)
     print(f'Archivo guardado en: {OUTPUT_EXCEL_PATH}')
 
 except FileNotFoundError:
-    print(f"Error: El archivo '{INPUT_EXCEL_PATH}' no fue encontrado.")
+    print(f"Error: El archivo '{INPUT_VECTORS_PATH}' no fue encontrado.")
 except ValueError as e:
     print(f"Error de valor: {e}")
 except Exception as e:
@@ -1,45 +1,100 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 
+# Los módulos compartidos del pipeline viven en RGB_img_corpus_one
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'RGB_img_corpus_one'))
+from streaming_statistics import ChannelAccumulator, merge_accumulators, iter_excel_row_chunks
+
 # Definir la ruta del archivo de entrada y salida
 OUTPUT_EXCEL_PATH = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus\0.2.resultado_R.xlsx'
 
 #El resultado que se muestra de este código es los datos estadisticos de las iamgenes del corpus en la dimencion R
 OUTPUT_EXCEL_STATS_PATH = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus\0.3.resultado_Estadisticas.xlsx'
 
-try:
-    # Leer el archivo Excel
-    df = pd.read_excel(OUTPUT_EXCEL_PATH)
+# Número de filas que se leen del Excel en cada bloque
+CHUNK_ROWS = 4096
 
-    # Crear una lista para almacenar las estadísticas
-    estadisticas = []
+# Función para calcular las estadísticas de cada columna por bloques, en memoria constante
+def pixel_statistics(excel_path):
+    """
+    Calcula las estadísticas de cada columna y del corpus con acumuladores de 256 niveles.
+
+    :param excel_path: Ruta del archivo Excel.
+    :return: Lista de tuplas (columna, resumen), o None si el archivo no tiene datos.
+             Lanza ValueError o TypeError si algún valor no es un entero entre 0 y 255.
+    """
+    # Un acumulador por columna; el archivo se lee por bloques
+    acumuladores = None
+
+    for encabezados, bloque in iter_excel_row_chunks(excel_path, CHUNK_ROWS):
+        if acumuladores is None:
+            acumuladores = [ChannelAccumulator() for _ in encabezados]
+
+        # Agregar los valores numéricos de cada columna del bloque a su acumulador
+        for indice, acumulador in enumerate(acumuladores):
+            valores = bloque[:, indice]
+            acumulador.update(valores[~np.isnan(valores)])
+
+    if acumuladores is None:
+        return None
 
-    # Iterar sobre cada columna
-    for columna in df.columns:
-        # Obtener los valores de la columna
-        valores_columna = df[columna]
+    # Cada columna y el corpus completo (acumuladores combinados)
+    filas = list(zip(encabezados, acumuladores)) + [("Corpus", merge_accumulators(acumuladores))]
+    return [(columna, acumulador.summary()) for columna, acumulador in filas]
 
-        # Filtrar solo los valores numéricos
-        valores_numericos = pd.to_numeric(valores_columna, errors='coerce')
+# Función para calcular las estadísticas con pandas cuando los valores no son píxeles (decimales o fuera de rango)
+def float_statistics(excel_path):
+    """
+    Calcula las mismas estadísticas cargando el archivo completo y usando las funciones de pandas.
 
-        # OBTENCIÓN DE VALORES ESTADÍSTICOS
-        suma = valores_numericos.sum()
-        media = valores_numericos.mean()
-        mediana = valores_numericos.median()
-        varianza = valores_numericos.var()
-        desviacion_estandar = valores_numericos.std()
-        minimo = valores_numericos.min()
-        maximo = valores_numericos.max()
+    :param excel_path: Ruta del archivo Excel.
+    :return: Lista de tuplas (columna, resumen), o None si el archivo no tiene datos.
+    """
+    df = pd.read_excel(excel_path)
+
+    # Filtrar solo los valores numéricos de cada columna
+    columnas = [(columna, pd.to_numeric(df[columna], errors='coerce')) for columna in df.columns]
+    if not columnas:
+        return None
+    columnas.append(("Corpus", pd.concat([valores for _, valores in columnas], ignore_index=True)))
+
+    return [(columna, {
+        "Suma": valores.sum(),
+        "Media": valores.mean(),
+        "Mediana": valores.median(),
+        "Varianza": valores.var(),
+        "Desviación estándar": valores.std(),
+        "Mínimo": valores.min(),
+        "Máximo": valores.max()
+    }) for columna, valores in columnas]
+
+try:
+    # Los píxeles se procesan por bloques; otros valores usan el cálculo de pandas, igual que calculate_statistics
+    try:
+        resumenes = pixel_statistics(OUTPUT_EXCEL_PATH)
+    except (TypeError, ValueError):
+        resumenes = float_statistics(OUTPUT_EXCEL_PATH)
+
+    if resumenes is None:
+        raise ValueError("El archivo no contiene datos.")
+
+    # Crear una lista para almacenar las estadísticas
+    estadisticas = []
 
+    # OBTENCIÓN DE VALORES ESTADÍSTICOS de cada columna y del corpus completo
+    for columna, resumen in resumenes:
         # Almacenar los resultados en la lista
         estadisticas.append({
             "Columna": columna,
-            "Suma": suma,
-            "Media": media,
-            "Mediana": mediana,
-            "Varianza": varianza,
-            "Desviación estándar": desviacion_estandar,
-            "Mínimo": minimo,
-            "Máximo": maximo
+            "Suma": resumen["Suma"],
+            "Media": resumen["Media"],
+            "Mediana": resumen["Mediana"],
+            "Varianza": resumen["Varianza"],
+            "Desviación estándar": resumen["Desviación estándar"],
+            "Mínimo": resumen["Mínimo"],
+            "Máximo": resumen["Máximo"]
         })
 
     # Crear un DataFrame a partir de la lista de estadísticas
@@ -1,7 +1,11 @@
 import cv2
 import numpy as np
 import os
+import sys
 import pandas as pd
+from corpus_vectorizer import build_corpus_memmap
+from vector_store import open_corpus_memmap
+from image_channels import extract_channel
 
 # Función para convertir una imagen en el vector del canal R (Rojo)
 def image_to_r_vector(image_path, size=(4, 4)):
@@ -19,11 +23,11 @@ def image_to_r_vector(image_path, size=(4, 4)):
     # Redimensionar la imagen al tamaño especificado
     image_resized = cv2.resize(image, size)
     
-    # Separar la imagen en los tres canales B, G, R
-    _, _, r_channel = cv2.split(image_resized)
+    # Copiar solo el canal R, sin separar los tres canales
+    r_channel = extract_channel(image_resized, 'R')
     
-    # Aplanar el canal R en un vector 1D
-    r_vector = r_channel.flatten()
+    # Vector 1D del canal R (vista, sin otra copia)
+    r_vector = r_channel.reshape(-1)
     
     return r_vector
 
@@ -55,6 +59,21 @@ def process_image_corpus(corpus_path):
     
     return data_r
 
+# Función para procesar un corpus de imágenes escribiendo los vectores R en una matriz en disco
+def process_image_corpus_memmap(corpus_path, matrix_path, size=(4, 4)):
+    """
+    Procesa todas las imágenes en un directorio y escribe sus vectores R directamente
+    en una matriz np.memmap (una fila por imagen), sin mantener el corpus en memoria.
+    :param corpus_path: Directorio del corpus de imágenes.
+    :param matrix_path: Ruta del archivo .npy donde se guardará la matriz.
+    :param size: Tamaño para redimensionar la imagen (ancho, alto).
+    :return: Matriz mapeada en memoria y la lista de nombres de las imágenes (una por fila).
+    """
+    image_files = get_image_files(corpus_path)
+    build_corpus_memmap(corpus_path, image_files, matrix_path, size)
+    matrix, image_files, _ = open_corpus_memmap(matrix_path)
+    return matrix, image_files
+
 # Función para guardar los vectores R en un archivo Excel
 def save_vectors_to_excel(vectors, output_dir, filename='0.0.RGB_Vectors.xlsx'):
     """
@@ -78,16 +97,27 @@ def save_vectors_to_excel(vectors, output_dir, filename='0.0.RGB_Vectors.xlsx'):
     return excel_file
 
 # Función principal que coordina todo el proceso
-def main():
+def main(use_memmap=True):
+    """
+    Convierte el corpus a vectores R y los guarda.
+    :param use_memmap: True escribe los vectores en una matriz .npy en disco; False usa el diccionario
+                       y los guarda en Excel.
+    """
     corpus_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\curpus'
     output_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus_one'
     
-    # Procesar el corpus de imágenes para obtener los vectores R
-    image_vectors_r = process_image_corpus(corpus_path)
-    
-    # Guardar los vectores R en un archivo Excel
-    save_vectors_to_excel(image_vectors_r, output_path)
+    if use_memmap:
+        # Procesar el corpus escribiendo los vectores R directamente en la matriz
+        matrix_path = os.path.join(output_path, '0.0.RGB_Vectors.npy')
+        matrix, _ = process_image_corpus_memmap(corpus_path, matrix_path)
+        print(f"Matriz guardada en: {matrix_path} {matrix.shape}")
+    else:
+        # Procesar el corpus de imágenes para obtener los vectores R
+        image_vectors_r = process_image_corpus(corpus_path)
+        
+        # Guardar los vectores R en un archivo Excel
+        save_vectors_to_excel(image_vectors_r, output_path)
 
-# Ejecutar la función principal
+# Ejecutar la función principal (--excel usa el diccionario y el archivo Excel)
 if __name__ == "__main__":
-    main()
+    main(use_memmap='--excel' not in sys.argv[1:])
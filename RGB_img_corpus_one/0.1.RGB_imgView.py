@@ -1,8 +1,12 @@
 import cv2
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
+from corpus_vectorizer import build_corpus_memmap
+from vector_store import open_corpus_memmap
+from image_channels import extract_channel
 
 # ------------------ Funciones del código anterior ------------------
 
@@ -15,11 +19,11 @@ def image_to_r_vector(image_path, size=(100, 100)):
     # Redimensionar la imagen
     image_resized = cv2.resize(image, size)
     
-    # Separar la imagen en los canales B, G, R
-    _, _, r_channel = cv2.split(image_resized)
+    # Copiar solo el canal R, sin separar los tres canales
+    r_channel = extract_channel(image_resized, 'R')
     
-    # Aplanar el canal R
-    r_vector = r_channel.flatten()
+    # Vector del canal R (vista, sin otra copia)
+    r_vector = r_channel.reshape(-1)
     
     return r_vector, r_channel
 
@@ -40,6 +44,13 @@ def process_image_corpus(corpus_path, size=(100, 100)):
     
     return data_r, image_files
 
+# Función para procesar un corpus escribiendo los vectores R en una matriz mapeada en memoria
+def process_image_corpus_memmap(corpus_path, matrix_path, size=(100, 100)):
+    image_files = get_image_files(corpus_path)
+    build_corpus_memmap(corpus_path, image_files, matrix_path, size)
+    matrix, image_files, _ = open_corpus_memmap(matrix_path)
+    return matrix, image_files
+
 # Función para reconstruir la imagen del canal R a partir de su vector
 def reconstruct_r_image(r_vector, size=(100, 100)):
     return np.reshape(r_vector, size)
@@ -88,26 +99,41 @@ def save_r_vectors_to_excel(df_r, output_path):
     print(f"Archivo guardado en: {excel_file}")
 
 # Función principal que coordina el proceso
-def main():
+def main(use_memmap=True):
+    """
+    Vectoriza el corpus y muestra el canal R y su histograma de la primera imagen.
+    :param use_memmap: True lee los vectores desde una matriz .npy en disco; False usa un DataFrame
+                       y lo guarda en Excel.
+    """
     corpus_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\curpus'
     output_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus_one'
     image_original_size = (100, 100)
 
-    # Procesar el corpus de imágenes y obtener los vectores R
-    data_r, image_files = process_image_corpus(corpus_path, image_original_size)
-    
-    # Crear un DataFrame para los vectores R
-    df_r = pd.DataFrame(data_r)
+    if use_memmap:
+        # Escribir los vectores R directamente en la matriz y abrirla sin copiar
+        matrix_path = os.path.join(output_path, '0.1.RGB_Vectors.npy')
+        matrix, image_files = process_image_corpus_memmap(corpus_path, matrix_path, image_original_size)
+        print(f"Matriz guardada en: {matrix_path}")
 
-    # Guardar los vectores R en un archivo Excel
-    save_r_vectors_to_excel(df_r, output_path)
-    
-    # Seleccionar el vector R de la primera imagen
-    image_name = image_files[0]
-    r_vector = df_r[image_name]
+        # Seleccionar el vector R de la primera imagen (una fila de la matriz)
+        image_name = image_files[0]
+        r_vector = matrix[0]
+    else:
+        # Procesar el corpus de imágenes y obtener los vectores R
+        data_r, image_files = process_image_corpus(corpus_path, image_original_size)
+        
+        # Crear un DataFrame para los vectores R
+        df_r = pd.DataFrame(data_r)
+
+        # Guardar los vectores R en un archivo Excel
+        save_r_vectors_to_excel(df_r, output_path)
+        
+        # Seleccionar el vector R de la primera imagen
+        image_name = image_files[0]
+        r_vector = df_r[image_name].values
     
     # Reconstruir el canal R en una imagen 2D
-    r_image = reconstruct_r_image(r_vector.values, image_original_size)
+    r_image = reconstruct_r_image(r_vector, image_original_size)
     
     # Crear una imagen RGB con solo el canal R activo
     rgb_image = create_rgb_image_from_r(r_image)
@@ -118,6 +144,6 @@ def main():
     # Mostrar el histograma del canal R
     plot_r_histogram(r_image)
 
-# Ejecutar la función principal
+# Ejecutar la función principal (--excel usa el DataFrame y el archivo Excel)
 if __name__ == "__main__":
-    main()
+    main(use_memmap='--excel' not in sys.argv[1:])
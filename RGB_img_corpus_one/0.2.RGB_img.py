@@ -3,31 +3,7 @@ import numpy as np
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
-
-# Función para convertir una imagen en el vector del canal R (Rojo)
-def image_to_r_vector(image_path, size=(4, 4)):
-    """
-    Convierte una imagen en un vector 1D del canal R.
-    
-    :param image_path: La ruta completa de la imagen.
-    :param size: Tamaño al que se redimensionará la imagen, por defecto 4x4.
-    :return: Un vector 1D del canal R y el canal R en 2D.
-    """
-    # Leer la imagen en formato RGB
-    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-    if image is None:
-        raise ValueError(f"No se pudo leer la imagen en {image_path}")
-    
-    # Redimensionar la imagen a un tamaño fijo
-    image_resized = cv2.resize(image, size)
-    
-    # Separar la imagen en los tres canales B, G, R (OpenCV usa BGR por defecto)
-    _, _, r_channel = cv2.split(image_resized)
-    
-    # Aplanar el canal R en un vector 1D
-    r_vector = r_channel.flatten()
-    
-    return r_vector, r_channel
+from corpus_vectorizer import iter_r_vectors
 
 # Función para obtener todos los archivos de imagen en un directorio
 def get_image_files(corpus_path, extensions=('.png', '.jpg', '.jpeg')):
@@ -85,7 +61,7 @@ def visualize_r_channel(r_channel, image_file):
     plt.show()
 
 # Función principal para procesar todas las imágenes, guardar sus vectores R y visualizarlas
-def process_and_visualize_images(corpus_path, output_path, size=(4, 4)):
+def process_and_visualize_images(corpus_path, output_path, size=(4, 4), workers=None, chunksize=16):
     """
     Procesa todas las imágenes en un directorio, convierte su canal R en un vector,
     guarda el resultado en archivos Excel y visualiza el canal R en tonos de rojo.
@@ -93,6 +69,9 @@ def process_and_visualize_images(corpus_path, output_path, size=(4, 4)):
     :param corpus_path: Ruta del directorio donde están las imágenes.
     :param output_path: Ruta donde se guardarán los archivos Excel.
     :param size: Tamaño al que se redimensionarán las imágenes (por defecto 4x4).
+    :param workers: Número de procesos para decodificar (None = todos los núcleos, 1 = secuencial).
+    :param chunksize: Número de imágenes que se envían juntas a cada proceso.
+    :return: Lista de tuplas (archivo, error) con las imágenes que no se pudieron procesar.
     """
     # Obtener todos los archivos de imagen en el directorio
     image_files = get_image_files(corpus_path)
@@ -101,10 +80,14 @@ def process_and_visualize_images(corpus_path, output_path, size=(4, 4)):
     if not os.path.exists(output_path):
         os.makedirs(output_path)
     
-    # Iterar a través de cada archivo de imagen
-    for image_file in image_files:
-        image_path = os.path.join(corpus_path, image_file)  # Ruta completa de la imagen
-        r_vector, r_channel = image_to_r_vector(image_path, size)  # Convertir la imagen a vector R
+    # Iterar a través de los resultados, que llegan en el mismo orden que los archivos
+    errores = []
+    for image_file, r_vector, r_channel, error in iter_r_vectors(corpus_path, image_files, size, workers, chunksize):
+        # Reportar la imagen que falló sin detener el lote
+        if error is not None:
+            print(f"Error procesando {image_file}: {error}")
+            errores.append((image_file, error))
+            continue
 
         # Guardar el vector R en un archivo Excel
         save_r_vector_to_excel(r_vector, output_path, image_file, size)
@@ -112,6 +95,8 @@ def process_and_visualize_images(corpus_path, output_path, size=(4, 4)):
         # Visualizar el canal R en tonos de rojo
         visualize_r_channel(r_channel, image_file)
 
+    return errores
+
 # Función principal que orquesta todo- el flujo
 def main():
     corpus_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\curpus'
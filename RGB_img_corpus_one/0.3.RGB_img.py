@@ -3,28 +3,12 @@ import numpy as np
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
+from corpus_vectorizer import iter_r_vectors
+from vector_store import iter_r_matrices
+from corpus_statistics import calculate_corpus_statistics, STATISTICS_COLUMNS
 
 # ------------------------ Funciones de procesamiento de imágenes ------------------------
 
-# Función para convertir una imagen en el vector del canal R (Rojo)
-def image_to_r_vector(image_path, size=(4, 4)):
-    """
-    Convierte una imagen en un vector 1D del canal R.
-    
-    :param image_path: La ruta completa de la imagen.
-    :param size: Tamaño al que se redimensionará la imagen, por defecto 4x4.
-    :return: Un vector 1D del canal R y el canal R en 2D.
-    """
-    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-    if image is None:
-        raise ValueError(f"No se pudo leer la imagen en {image_path}")
-    
-    image_resized = cv2.resize(image, size)
-    _, _, r_channel = cv2.split(image_resized)
-    r_vector = r_channel.flatten()
-    
-    return r_vector, r_channel
-
 # Función para obtener todos los archivos de imagen en un directorio
 def get_image_files(corpus_path, extensions=('.png', '.jpg', '.jpeg')):
     """
@@ -69,7 +53,7 @@ def visualize_r_channel(r_channel, image_file):
     plt.show()
 
 # Función principal para procesar imágenes
-def process_and_visualize_images(corpus_path, output_path, size=(4, 4)):
+def process_and_visualize_images(corpus_path, output_path, size=(4, 4), workers=None, chunksize=16):
     """
     Procesa todas las imágenes en un directorio, convierte su canal R en un vector,
     guarda el resultado en archivos Excel y visualiza el canal R en tonos de rojo.
@@ -77,44 +61,27 @@ def process_and_visualize_images(corpus_path, output_path, size=(4, 4)):
     :param corpus_path: Ruta del directorio donde están las imágenes.
     :param output_path: Ruta donde se guardarán los archivos Excel.
     :param size: Tamaño al que se redimensionarán las imágenes.
+    :param workers: Número de procesos para decodificar (None = todos los núcleos, 1 = secuencial).
+    :param chunksize: Número de imágenes que se envían juntas a cada proceso.
+    :return: Lista de tuplas (archivo, error) con las imágenes que no se pudieron procesar.
     """
     image_files = get_image_files(corpus_path)
     
     if not os.path.exists(output_path):
         os.makedirs(output_path)
     
-    for image_file in image_files:
-        image_path = os.path.join(corpus_path, image_file)
-        r_vector, r_channel = image_to_r_vector(image_path, size)
+    errores = []
+    for image_file, r_vector, r_channel, error in iter_r_vectors(corpus_path, image_files, size, workers, chunksize):
+        if error is not None:
+            print(f"Error procesando {image_file}: {error}")
+            errores.append((image_file, error))
+            continue
         save_r_vector_to_excel(r_vector, output_path, image_file, size)
         visualize_r_channel(r_channel, image_file)
 
-# ------------------------ Funciones de cálculo de estadísticas ------------------------
+    return errores
 
-# Función para calcular estadísticas de un DataFrame
-def calculate_statistics(df):
-    """
-    Calcula varias estadísticas para cada fila de un DataFrame.
-    
-    :param df: DataFrame con los datos de entrada.
-    :return: Un DataFrame con las estadísticas calculadas.
-    """
-    resultados = {
-        'Suma': df.sum(axis=1),
-        'Media': df.mean(axis=1),
-        'Mediana': df.median(axis=1),
-        'Moda': df.mode(axis=1)[0],
-        'Varianza': df.var(axis=1),
-        'Desviación Estándar': df.std(axis=1),
-        'Rango': df.max(axis=1) - df.min(axis=1),
-        'Mínimo': df.min(axis=1),
-        'Máximo': df.max(axis=1),
-        'Cuartil 1': df.quantile(0.25, axis=1),
-        'Cuartil 2': df.quantile(0.5, axis=1),
-        'Cuartil 3': df.quantile(0.75, axis=1),
-    }
-    
-    return pd.DataFrame(resultados)
+# ------------------------ Funciones de cálculo de estadísticas ------------------------
 
 # Función para guardar un DataFrame de estadísticas en un archivo Excel
 def save_statistics_to_excel(estadisticas_df, output_file):
@@ -135,23 +102,19 @@ def process_r_vectors_and_calculate_statistics(input_path, output_path):
     :param input_path: Ruta donde se guardaron los archivos Excel de los vectores de imágenes.
     :param output_path: Ruta donde se guardarán los resultados estadísticos de cada archivo.
     """
-    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
-
     if not os.path.exists(output_path):
         os.makedirs(output_path)
     
-    for excel_file in excel_files:
-        excel_path = os.path.join(input_path, excel_file)
-        df = pd.read_excel(excel_path, header=None)
-
-        # Calcular estadísticas
-        estadisticas_df = calculate_statistics(df)
+    # Apilar las matrices de todos los archivos y calcular las estadísticas en un solo cálculo por lotes
+    for excel_files, stack in iter_r_matrices(input_path):
+        estadisticas_corpus = calculate_corpus_statistics(excel_files, stack)
 
-        # Crear la ruta de salida para el archivo de estadísticas
-        output_file = os.path.join(output_path, f"Estadisticas_{excel_file}")
+        for excel_file, estadisticas_df in estadisticas_corpus.groupby('Imagen', sort=False):
+            # Crear la ruta de salida para el archivo de estadísticas
+            output_file = os.path.join(output_path, f"Estadisticas_{excel_file}")
 
-        # Guardar el DataFrame de estadísticas en un archivo Excel
-        save_statistics_to_excel(estadisticas_df, output_file)
+            # Guardar el DataFrame de estadísticas en un archivo Excel
+            save_statistics_to_excel(estadisticas_df[STATISTICS_COLUMNS], output_file)
 
 # ------------------------ Función principal que orquesta todo el flujo ------------------------
 
@@ -1,33 +1,17 @@
 import cv2
 import numpy as np
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
-
-# Función para convertir una imagen en el vector del canal R (Rojo)
-def image_to_r_vector(image_path, size):
-    """
-    Convierte una imagen en un vector 1D del canal R.
-    
-    :param image_path: La ruta completa de la imagen.
-    :param size: Tamaño al que se redimensionará la imagen.
-    :return: Un vector 1D del canal R y el canal R en 2D.
-    """
-    # Leer la imagen en formato RGB
-    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-    if image is None:
-        raise ValueError(f"No se pudo leer la imagen en {image_path}")
-    
-    # Redimensionar la imagen a un tamaño fijo
-    image_resized = cv2.resize(image, size)
-    
-    # Separar la imagen en los tres canales B, G, R (OpenCV usa BGR por defecto)
-    _, _, r_channel = cv2.split(image_resized)
-    
-    # Aplanar el canal R en un vector 1D
-    r_vector = r_channel.flatten()
-    
-    return r_vector, r_channel
+from corpus_vectorizer import iter_r_vectors, resized_shape, REDUCTION_MARGIN
+from vector_store import (get_store_path, write_vector_store, iter_r_matrices, has_vector_store, read_vector_store,
+                          read_store_index)
+from corpus_statistics import calculate_corpus_statistics, STATISTICS_COLUMNS
+from vector_cache import VectorCache
+from incremental_corpus import (load_incremental_manifest, save_incremental_manifest, plan_incremental_run,
+                                load_partials, save_partials, summarize_partials)
+from streaming_statistics import ChannelAccumulator
 
 # Función para obtener todos los archivos de imagen en un directorio
 def get_image_files(corpus_path, extensions=('.png', '.jpg', '.jpeg')):
@@ -50,9 +34,8 @@ def save_r_vector_to_excel(r_vector, output_path, image_file, size):
     :param image_file: Nombre del archivo de imagen (se usará para nombrar el archivo Excel).
     :param size: Tamaño de la imagen (ancho y alto).
     """
-    # Calcular el número de filas y columnas según el tamaño de la imagen
-    height, width = size
-    df_r = pd.DataFrame(r_vector.reshape((height, width)))  # Cambiar el tamaño según la imagen
+    # Calcular el número de filas y columnas según el tamaño de la imagen (la misma forma que el almacén)
+    df_r = pd.DataFrame(r_vector.reshape(resized_shape(size)))
 
     # Crear el nombre del archivo Excel
     excel_file = os.path.join(output_path, f'{os.path.splitext(image_file)[0]}_RGB_Vector.xlsx')
@@ -89,14 +72,20 @@ def save_r_channel_image(r_channel, image_file, output_dir):
     print(f"Imagen guardada en: {output_image_file}")
 
 # Función principal para procesar todas las imágenes, guardar sus vectores R y visualizarlas
-def process_and_visualize_images(corpus_path, output_path, size):
+def process_and_visualize_images(corpus_path, output_path, size, workers=None, chunksize=16, export_excel=False, cache=None):
     """
     Procesa todas las imágenes en un directorio, convierte su canal R en un vector,
-    guarda el resultado en archivos Excel y guarda el canal R como imágenes.
+    guarda todos los vectores en un almacén binario del corpus y guarda el canal R como imágenes.
+    La decodificación se reparte entre varios procesos y el orden de salida se conserva.
     
     :param corpus_path: Ruta del directorio donde están las imágenes.
-    :param output_path: Ruta donde se guardarán los archivos Excel.
+    :param output_path: Ruta donde se guardará el almacén de vectores.
     :param size: Tamaño al que se redimensionarán las imágenes.
+    :param workers: Número de procesos (None = todos los núcleos, 1 = secuencial).
+    :param chunksize: Número de imágenes que se envían juntas a cada proceso.
+    :param export_excel: Si es True, también guarda cada vector en un archivo Excel como reporte.
+    :param cache: VectorCache opcional; las imágenes sin cambios no se vuelven a decodificar.
+    :return: Lista de tuplas (archivo, error) con las imágenes que no se pudieron procesar.
     """
     # Obtener todos los archivos de imagen en el directorio
     image_files = get_image_files(corpus_path)
@@ -110,43 +99,32 @@ def process_and_visualize_images(corpus_path, output_path, size):
     if not os.path.exists(r_channel_dir):
         os.makedirs(r_channel_dir)
 
-    # Iterar a través de cada archivo de imagen
-    for image_file in image_files:
-        image_path = os.path.join(corpus_path, image_file)  # Ruta completa de la imagen
-        r_vector, r_channel = image_to_r_vector(image_path, size)  # Convertir la imagen a vector R
+    errores = []
 
-        # Guardar el vector R en un archivo Excel
-        save_r_vector_to_excel(r_vector, output_path, image_file, size)
+    # Generador que recorre los resultados en el mismo orden que los archivos
+    def vectores_validos():
+        for image_file, r_vector, r_channel, error in iter_r_vectors(corpus_path, image_files, size, workers, chunksize, cache):
+            # Reportar la imagen que falló sin detener el lote
+            if error is not None:
+                print(f"Error procesando {image_file}: {error}")
+                errores.append((image_file, error))
+                continue
 
-        # Guardar el canal R como imagen
-        save_r_channel_image(r_channel, image_file, r_channel_dir)
+            # Guardar el vector R en un archivo Excel solo si se pidió el reporte
+            if export_excel:
+                save_r_vector_to_excel(r_vector, output_path, image_file, size)
 
-# ------------------------ Funciones de cálculo de estadísticas ------------------------
+            # Guardar el canal R como imagen
+            save_r_channel_image(r_channel, image_file, r_channel_dir)
 
-# Función para calcular estadísticas de un DataFrame
-def calculate_statistics(df):
-    """
-    Calcula varias estadísticas para cada fila de un DataFrame.
-    
-    :param df: DataFrame con los datos de entrada.
-    :return: Un DataFrame con las estadísticas calculadas.
-    """
-    resultados = {
-        'Suma': df.sum(axis=1),
-        'Media': df.mean(axis=1),
-        'Mediana': df.median(axis=1),
-        'Moda': df.mode(axis=1)[0],
-        'Varianza': df.var(axis=1),
-        'Desviación Estándar': df.std(axis=1),
-        'Rango': df.max(axis=1) - df.min(axis=1),
-        'Mínimo': df.min(axis=1),
-        'Máximo': df.max(axis=1),
-        'Cuartil 1': df.quantile(0.25, axis=1),
-        'Cuartil 2': df.quantile(0.5, axis=1),
-        'Cuartil 3': df.quantile(0.75, axis=1),
-    }
-    
-    return pd.DataFrame(resultados)
+            yield image_file, r_vector
+
+    # Guardar todos los vectores R en un solo almacén binario
+    write_vector_store(get_store_path(output_path), vectores_validos(), resized_shape(size))
+
+    return errores
+
+# ------------------------ Funciones de cálculo de estadísticas ------------------------
 
 # Función para guardar un DataFrame de estadísticas en un archivo Excel
 def save_statistics_to_excel(estadisticas_df, output_file):
@@ -159,36 +137,170 @@ def save_statistics_to_excel(estadisticas_df, output_file):
     estadisticas_df.to_excel(output_file, index=False)
     print(f"Archivo de estadísticas guardado en: {output_file}")
 
-# Función para procesar los archivos Excel de vectores R y calcular sus estadísticas
-def process_r_vectors_and_calculate_statistics(input_path, output_path):
+# Función para obtener el nombre del archivo de estadísticas de una imagen
+def get_statistics_file_name(name):
     """
-    Procesa todos los archivos Excel de vectores R, calcula sus estadísticas y guarda los resultados.
+    Devuelve el nombre del archivo de estadísticas de una imagen o de su archivo Excel de vector R.
     
-    :param input_path: Ruta donde se guardaron los archivos Excel de los vectores de imágenes.
-    :param output_path: Ruta donde se guardarán los resultados estadísticos de cada archivo.
+    :param name: Nombre de la imagen o del archivo *_RGB_Vector.xlsx.
+    :return: Nombre del archivo Estadisticas_*.xlsx.
     """
-    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
+    if name.endswith('.xlsx'):
+        return f"Estadisticas_{name}"
+    return f"Estadisticas_{os.path.splitext(name)[0]}_RGB_Vector.xlsx"
 
+# Función para procesar los vectores R y calcular sus estadísticas
+def process_r_vectors_and_calculate_statistics(input_path, output_path, per_image=True):
+    """
+    Calcula las estadísticas de todas las filas de todos los vectores R en un solo cálculo
+    por lotes (un histograma de 256 niveles por fila) y guarda los resultados.
+    
+    :param input_path: Ruta de la matriz .npy, del almacén de vectores o de los archivos Excel de los vectores.
+    :param output_path: Ruta donde se guardarán los resultados estadísticos.
+    :param per_image: Si es True, guarda un archivo Estadisticas_*.xlsx por imagen (formato que leen los
+                      scripts 0.5.x); si no, guarda una sola tabla Estadisticas_Corpus.xlsx.
+    :return: DataFrame ordenado con las estadísticas de cada fila de cada imagen.
+    """
     if not os.path.exists(output_path):
         os.makedirs(output_path)
-    
-    for excel_file in excel_files:
-        excel_path = os.path.join(input_path, excel_file)
-        df = pd.read_excel(excel_path, header=None)
 
-        # Calcular estadísticas
-        estadisticas_df = calculate_statistics(df)
+    # Calcular las estadísticas de cada bloque apilado de imágenes
+    tablas = [calculate_corpus_statistics(image_files, stack) for image_files, stack in iter_r_matrices(input_path)]
+    if tablas:
+        estadisticas_corpus = pd.concat(tablas, ignore_index=True)
+    else:
+        estadisticas_corpus = pd.DataFrame(columns=['Imagen', 'Fila'] + STATISTICS_COLUMNS)
+
+    if not per_image:
+        save_statistics_to_excel(estadisticas_corpus, os.path.join(output_path, "Estadisticas_Corpus.xlsx"))
+        return estadisticas_corpus
+
+    # Guardar un archivo de estadísticas por imagen
+    for image_file, estadisticas_df in estadisticas_corpus.groupby('Imagen', sort=False):
+        output_file = os.path.join(output_path, get_statistics_file_name(image_file))
+        save_statistics_to_excel(estadisticas_df[STATISTICS_COLUMNS], output_file)
+
+    return estadisticas_corpus
+
+# Función para eliminar un archivo de salida si existe
+def remove_if_exists(file_path):
+    if os.path.isfile(file_path):
+        os.remove(file_path)
+        print(f"Archivo eliminado: {file_path}")
+
+# Función para eliminar las salidas de una imagen (canal R, vector en Excel y estadísticas)
+def remove_image_outputs(image_file, output_path, r_channel_dir, stats_output_path):
+    base = os.path.splitext(image_file)[0]
+    remove_if_exists(os.path.join(r_channel_dir, f'{base}_R_Channel.png'))
+    remove_if_exists(os.path.join(output_path, f'{base}_RGB_Vector.xlsx'))
+    remove_if_exists(os.path.join(stats_output_path, get_statistics_file_name(image_file)))
+
+# Función para reprocesar solo las imágenes nuevas o modificadas del corpus
+def process_corpus_incremental(corpus_path, output_path, stats_output_path, size, workers=None, chunksize=16,
+                               export_excel=False, cache=None, reduced=True):
+    """
+    Modo incremental: compara el corpus con el manifiesto de la ejecución anterior (archivo, tamaño,
+    fecha de modificación y parámetros), vectoriza y calcula estadísticas solo de las imágenes nuevas
+    o modificadas, elimina las salidas de las imágenes borradas y recalcula el resumen del corpus
+    a partir de los acumuladores parciales de cada imagen.
+
+    :param corpus_path: Ruta del directorio donde están las imágenes.
+    :param output_path: Ruta donde se guardará el almacén de vectores.
+    :param stats_output_path: Ruta donde se guardarán los archivos de estadísticas.
+    :param size: Tamaño al que se redimensionarán las imágenes.
+    :param workers: Número de procesos (None = todos los núcleos, 1 = secuencial).
+    :param chunksize: Número de imágenes que se envían juntas a cada proceso.
+    :param export_excel: Si es True, también guarda cada vector nuevo en un archivo Excel.
+    :param cache: VectorCache opcional.
+    :param reduced: Si es True, los JPEG grandes se decodifican a resolución reducida.
+    :return: Tupla (imágenes procesadas, imágenes eliminadas, lista de errores).
+    """
+    for path in (output_path, stats_output_path):
+        if not os.path.exists(path):
+            os.makedirs(path)
+    r_channel_dir = os.path.join(output_path, "R_Channel_Images")
+    if not os.path.exists(r_channel_dir):
+        os.makedirs(r_channel_dir)
+
+    image_files = get_image_files(corpus_path)
+    # Un cambio de tamaño o de decodificación invalida todas las imágenes del manifiesto
+    params = {"size": list(size), "reduced": reduced, "reduction_margin": REDUCTION_MARGIN if reduced else None}
+    manifest = load_incremental_manifest(output_path)
+    pendientes, eliminadas, sin_cambios, firmas = plan_incremental_run(corpus_path, image_files, manifest, params)
+    print(f"Imágenes nuevas o modificadas: {len(pendientes)}, eliminadas: {len(eliminadas)}, "
+          f"sin cambios: {len(sin_cambios)}")
+
+    # Si nada cambió y el almacén anterior tiene todas las imágenes, no hay nada que reescribir
+    store_path = has_vector_store(output_path)
+    if (not pendientes and not eliminadas and store_path is not None
+            and read_store_index(store_path)['Imagen'].tolist() == sin_cambios):
+        return [], [], []
+
+    # Vectores de las imágenes sin cambios, tomados del almacén anterior
+    vectores = {}
+    if sin_cambios and store_path is not None:
+        names, data = read_vector_store(store_path)
+        conservar = set(sin_cambios)
+        vectores = {name: matrix.ravel() for name, matrix in zip(names, data) if name in conservar}
+    # Si el almacén anterior no tiene alguna imagen, se vuelve a procesar
+    pendientes += [image_file for image_file in sin_cambios if image_file not in vectores]
+
+    # Eliminar las salidas de las imágenes borradas del corpus
+    partials = load_partials(output_path)
+    for image_file in eliminadas:
+        remove_image_outputs(image_file, output_path, r_channel_dir, stats_output_path)
+        partials.pop(image_file, None)
 
-        # Crear la ruta de salida para el archivo de estadísticas
-        output_file = os.path.join(output_path, f"Estadisticas_{excel_file}")
+    # Vectorizar solo las imágenes pendientes
+    errores, procesadas = [], []
+    for image_file, r_vector, r_channel, error in iter_r_vectors(corpus_path, pendientes, size, workers, chunksize, cache,
+                                                                 reduced):
+        if error is not None:
+            print(f"Error procesando {image_file}: {error}")
+            errores.append((image_file, error))
+            # Una imagen modificada que ya no se puede leer no conserva las salidas de su versión anterior
+            remove_image_outputs(image_file, output_path, r_channel_dir, stats_output_path)
+            vectores.pop(image_file, None)
+            partials.pop(image_file, None)
+            continue
+        if export_excel:
+            save_r_vector_to_excel(r_vector, output_path, image_file, size)
+        save_r_channel_image(r_channel, image_file, r_channel_dir)
+        vectores[image_file] = r_vector
+        partials[image_file] = ChannelAccumulator().update(r_vector)
+        procesadas.append(image_file)
+
+    # Reescribir el almacén en el orden del directorio (copiar los vectores conservados es barato)
+    validas = [image_file for image_file in image_files if image_file in vectores]
+    write_vector_store(get_store_path(output_path), ((f, vectores[f]) for f in validas), resized_shape(size))
+
+    # Estadísticas por fila solo de las imágenes procesadas
+    if procesadas:
+        stack = np.stack([vectores[f].reshape(resized_shape(size)) for f in procesadas])
+        estadisticas = calculate_corpus_statistics(procesadas, stack)
+        for image_file, estadisticas_df in estadisticas.groupby('Imagen', sort=False):
+            output_file = os.path.join(stats_output_path, get_statistics_file_name(image_file))
+            save_statistics_to_excel(estadisticas_df[STATISTICS_COLUMNS], output_file)
+
+    # Resumen del corpus recalculado a partir de los parciales de cada imagen
+    resumen = pd.DataFrame(summarize_partials(validas, partials))
+    save_statistics_to_excel(resumen, os.path.join(stats_output_path, "Estadisticas_Resumen_Corpus.xlsx"))
+
+    # Las imágenes con error no entran al manifiesto y se reintentan en la siguiente ejecución
+    save_partials(output_path, {f: partials[f] for f in validas})
+    save_incremental_manifest(output_path, {"params": params, "images": {f: firmas[f] for f in validas}})
+
+    return procesadas, eliminadas, errores
 
-        # Guardar el DataFrame de estadísticas en un archivo Excel
-        save_statistics_to_excel(estadisticas_df, output_file)
         
  
 # ------------------------ Función principal que orquesta todo el flujo ------------------------       
 # Función principal que orquesta todo el flujo
-def main():
+def main(incremental=True):
+    """
+    :param incremental: Si es True solo se procesan las imágenes agregadas o modificadas desde la última
+                        ejecución; si es False se reconstruyen el almacén y todas las estadísticas.
+    """
     corpus_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\curpus'
     output_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus_one\0.2.dataImages'
     
@@ -202,17 +314,27 @@ def main():
         except ValueError:
             print("Por favor, ingrese números válidos para el ancho y la altura.")
 
-    # Procesar todas las imágenes, guardar sus vectores R y visualizarlas
-    process_and_visualize_images(corpus_path, output_path, image_size)
-    
-        
     # Direcion donde el archivo procesado de alamacenara 
     stats_output_path = r'E:\BUAP-MEXICO\DECIMO SEMESTRE\0.2.PROJECT\Imagenes\RGB_img_corpus_one\0.3.dataStadictist'
-    
-    #Almacena todos los valores estadisticos el archivo
-    process_r_vectors_and_calculate_statistics(output_path, stats_output_path)
 
+    # Caché de vectores: al repetir la ejecución solo se decodifican las imágenes nuevas o modificadas
+    cache = VectorCache(os.path.join(output_path, "vector_cache"))
+
+    try:
+        if incremental:
+            _, _, errores = process_corpus_incremental(corpus_path, output_path, stats_output_path, image_size, cache=cache)
+        else:
+            # Procesar todas las imágenes en paralelo, guardar sus vectores R y visualizarlas
+            errores = process_and_visualize_images(corpus_path, output_path, image_size, cache=cache)
+
+            #Almacena todos los valores estadisticos el archivo
+            process_r_vectors_and_calculate_statistics(output_path, stats_output_path)
+    finally:
+        cache.close()
+    if errores:
+        print(f"{len(errores)} imágenes no se pudieron procesar.")
 
 # Ejecutar la función principal
 if __name__ == "__main__":
-    main()
+    # Con --completo se reconstruye todo el corpus en lugar de procesar solo los cambios
+    main(incremental='--completo' not in sys.argv[1:])
@@ -5,19 +5,11 @@ import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
-
-
-# Función para convertir una imagen en el vector del canal R (Rojo)
-def image_to_r_vector(image_path, size):
-    image = cv2.imread(image_path, cv2.IMREAD_COLOR)
-    if image is None:
-        raise ValueError(f"No se pudo leer la imagen en {image_path}")
-    
-    image_resized = cv2.resize(image, size)
-    _, _, r_channel = cv2.split(image_resized)
-    r_vector = r_channel.flatten()
-    
-    return r_vector, r_channel
+from corpus_vectorizer import iter_r_vectors, resized_shape
+from vector_store import get_store_path, write_vector_store, iter_r_matrices
+from corpus_statistics import calculate_corpus_statistics, STATISTICS_COLUMNS
+from vector_cache import VectorCache
+from job_runner import create_job_runner
 
 
 def get_image_files(corpus_path, extensions=('.png', '.jpg', '.jpeg')):
@@ -25,8 +17,7 @@ def get_image_files(corpus_path, extensions=('.png', '.jpg', '.jpeg')):
 
 
 def save_r_vector_to_excel(r_vector, output_path, image_file, size):
-    height, width = size
-    df_r = pd.DataFrame(r_vector.reshape((height, width)))
+    df_r = pd.DataFrame(r_vector.reshape(resized_shape(size)))
     excel_file = os.path.join(output_path, f'{os.path.splitext(image_file)[0]}_RGB_Vector.xlsx')
     df_r.to_excel(excel_file, index=False, header=False)
     print(f"Archivo guardado en: {excel_file}")
@@ -41,8 +32,11 @@ def save_r_channel_image(r_channel, image_file, output_dir):
     print(f"Imagen guardada en: {output_image_file}")
 
 
-def process_and_visualize_images(corpus_path, output_path, size):
+def process_and_visualize_images(corpus_path, output_path, size, workers=None, chunksize=16, export_excel=False, cache=None,
+                                 progress=None):
     image_files = get_image_files(corpus_path)
+    if progress is not None:
+        progress.start(len(image_files), "Vectorizando")
     if not os.path.exists(output_path):
         os.makedirs(output_path)
 
@@ -50,40 +44,41 @@ def process_and_visualize_images(corpus_path, output_path, size):
     if not os.path.exists(r_channel_dir):
         os.makedirs(r_channel_dir)
 
-    for image_file in image_files:
-        image_path = os.path.join(corpus_path, image_file)
-        try:
-            r_vector, r_channel = image_to_r_vector(image_path, size)
-            save_r_vector_to_excel(r_vector, output_path, image_file, size)
-            save_r_channel_image(r_channel, image_file, r_channel_dir)
-        except Exception as e:
-            print(f"Error procesando {image_file}: {e}")
-
+    errores = []
+
+    # La decodificación se reparte entre procesos; los resultados llegan en orden
+    def vectores_validos():
+        for image_file, r_vector, r_channel, error in iter_r_vectors(corpus_path, image_files, size, workers, chunksize, cache):
+            # Avance de la interfaz; si se canceló el trabajo, aquí se detiene el lote
+            if progress is not None:
+                progress.advance()
+            try:
+                if error is not None:
+                    raise ValueError(error)
+                if export_excel:
+                    save_r_vector_to_excel(r_vector, output_path, image_file, size)
+                save_r_channel_image(r_channel, image_file, r_channel_dir)
+            except Exception as e:
+                print(f"Error procesando {image_file}: {e}")
+                errores.append((image_file, str(e)))
+                continue
+            yield image_file, r_vector
+
+    # Todos los vectores R del corpus van a un solo almacén binario
+    write_vector_store(get_store_path(output_path), vectores_validos(), resized_shape(size))
+
+    return errores
+
+
+# Función del trabajo de vectorización que se ejecuta en el hilo de fondo
+def vectorize_corpus_job(corpus_path, output_path, size, progress=None):
+    # La caché se abre dentro del hilo porque la conexión sqlite queda ligada al hilo que la crea
+    cache = VectorCache(os.path.join(output_path, "vector_cache"))
+    try:
+        return process_and_visualize_images(corpus_path, output_path, size, cache=cache, progress=progress)
+    finally:
+        cache.close()
 
-# Función para calcular estadísticas de un DataFrame
-def calculate_statistics(df):
-    """
-    Calcula varias estadísticas para cada fila de un DataFrame.
-    
-    :param df: DataFrame con los datos de entrada.
-    :return: Un DataFrame con las estadísticas calculadas.
-    """
-    resultados = {
-        'Suma': df.sum(axis=1),
-        'Media': df.mean(axis=1),
-        'Mediana': df.median(axis=1),
-        'Moda': df.mode(axis=1)[0],
-        'Varianza': df.var(axis=1),
-        'Desviación Estándar': df.std(axis=1),
-        'Rango': df.max(axis=1) - df.min(axis=1),
-        'Mínimo': df.min(axis=1),
-        'Máximo': df.max(axis=1),
-        'Cuartil 1': df.quantile(0.25, axis=1),
-        'Cuartil 2': df.quantile(0.5, axis=1),
-        'Cuartil 3': df.quantile(0.75, axis=1),
-    }
-
-    return pd.DataFrame(resultados)
 
 # Función para guardar un DataFrame de estadísticas en un archivo Excel
 def save_statistics_to_excel(estadisticas_df, output_file):
@@ -96,26 +91,35 @@ def save_statistics_to_excel(estadisticas_df, output_file):
     estadisticas_df.to_excel(output_file, index=False)
     print(f"Archivo de estadísticas guardado en: {output_file}")
     
-# Función para procesar los archivos Excel de vectores R y calcular sus estadísticas
-def process_r_vectors_and_calculate_statistics(input_path, output_path):
-    
-    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
-
+# Función para procesar los vectores R y calcular sus estadísticas en un solo cálculo por lotes
+def process_r_vectors_and_calculate_statistics(input_path, output_path, per_image=True, progress=None):
     if not os.path.exists(output_path):
         os.makedirs(output_path)
-        
-    for excel_file in excel_files:
-        excel_path = os.path.join(input_path, excel_file)
-        df = pd.read_excel(excel_path, header=None)
 
-        # Calcular estadísticas
-        estadisticas_df = calculate_statistics(df)
-
-        # Crear la ruta de salida para el archivo de estadísticas
-        output_file = os.path.join(output_path, f"Estadisticas_{excel_file}")
+    # Un histograma de 256 niveles por fila para todas las imágenes a la vez
+    tablas = [calculate_corpus_statistics(image_files, stack) for image_files, stack in iter_r_matrices(input_path)]
+    if tablas:
+        estadisticas_corpus = pd.concat(tablas, ignore_index=True)
+    else:
+        estadisticas_corpus = pd.DataFrame(columns=['Imagen', 'Fila'] + STATISTICS_COLUMNS)
+
+    if not per_image:
+        save_statistics_to_excel(estadisticas_corpus, os.path.join(output_path, "Estadisticas_Corpus.xlsx"))
+        return estadisticas_corpus
+
+    grupos = estadisticas_corpus.groupby('Imagen', sort=False)
+    if progress is not None:
+        progress.start(grupos.ngroups, "Guardando estadísticas")
+    for image_file, estadisticas_df in grupos:
+        if progress is not None:
+            progress.advance()
+        if image_file.endswith('.xlsx'):
+            output_file = os.path.join(output_path, f"Estadisticas_{image_file}")
+        else:
+            output_file = os.path.join(output_path, f"Estadisticas_{os.path.splitext(image_file)[0]}_RGB_Vector.xlsx")
+        save_statistics_to_excel(estadisticas_df[STATISTICS_COLUMNS], output_file)
 
-        # Guardar el DataFrame de estadísticas en un archivo Excel
-        save_statistics_to_excel(estadisticas_df, output_file)
+    return estadisticas_corpus
             
 
 # Interfaz gráfica con tkinter
@@ -126,6 +130,8 @@ class App:
         self.root.configure(bg='black')
         self.root.attributes('-fullscreen', True)
         self.images_processed = False  # Bandera para verificar si las imágenes han sido procesadas
+        # Los procesos largos corren en segundo plano para que la ventana no se congele
+        self.runner = create_job_runner(self.root)
         self.create_widgets()
 
     def create_widgets(self):
@@ -205,20 +211,28 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            process_and_visualize_images(self.corpus_path, output_path, image_size)
-            self.images_processed = True  # Marcar que las imágenes han sido procesadas
-            messagebox.showinfo("Éxito", "Imágenes procesadas correctamente.")
+            # Encolar el corpus; se pueden encolar varios corpus seguidos
+            self.runner.submit(f"Corpus {os.path.basename(self.corpus_path)}", vectorize_corpus_job,
+                               self.corpus_path, output_path, image_size, on_success=self.images_done)
         except ValueError:
             messagebox.showerror("Error", "Ancho y altura deben ser números válidos.")
         except Exception as e:
             messagebox.showerror("Error", str(e))
             
+    def images_done(self, errores):
+        self.images_processed = True  # Marcar que las imágenes han sido procesadas
+        if errores:
+            messagebox.showwarning("Aviso", f"{len(errores)} imágenes no se pudieron procesar.")
+        else:
+            messagebox.showinfo("Éxito", "Imágenes procesadas correctamente.")
+            
     def process_dataImages(self):
-        if self.images_processed:  # Solo permite procesar datos si las imágenes ya fueron procesadas
+        # Se permite encolar las estadísticas detrás de una vectorización que aún no termina
+        if self.images_processed or self.runner.pending:
             input_path = filedialog.askdirectory(title="Seleccionar carpeta de vectores R")
             output_path = filedialog.askdirectory(title="Seleccionar carpeta de salida para estadísticas")
-            process_r_vectors_and_calculate_statistics(input_path, output_path)
-            messagebox.showinfo("Éxito", "Estadísticas procesadas correctamente.")
+            self.runner.submit("Estadísticas", process_r_vectors_and_calculate_statistics, input_path, output_path,
+                               on_success=lambda _: messagebox.showinfo("Éxito", "Estadísticas procesadas correctamente."))
         else:
             messagebox.showwarning("Error", "Debes procesar las imágenes primero antes de calcular estadísticas.")
 
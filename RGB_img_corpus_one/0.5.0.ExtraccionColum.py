@@ -1,8 +1,8 @@
-import os
-import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
+from job_runner import create_job_runner
+from column_store import process_excel_files, parse_column_input
 from scipy import stats
 
 # Función para calcular la regresión lineal
@@ -16,46 +16,6 @@ def calcular_distancias(Y, linea_regresion):
     distancias = [yi - pred for yi, pred in zip(Y, linea_regresion)]
     return distancias  
 
-# Función para procesar los archivos Excel y obtener los datos
-def process_excel_files(input_path, output_path, column):
-    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
-
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
-
-    # Crear un dataframe vacío para almacenar los resultados
-    all_data = pd.DataFrame()
-
-    for excel_file in excel_files:
-        excel_path = os.path.join(input_path, excel_file)
-        df = pd.read_excel(excel_path)
-
-        # Verificar si la columna es válida
-        if isinstance(column, int):
-            if column >= len(df.columns):
-                continue
-        elif column not in df.columns:
-            continue
-
-        # Extraer la columna seleccionada y asegurarse de que los datos sean numéricos
-        if isinstance(column, int):
-            data = pd.to_numeric(df.iloc[:, column], errors='coerce').dropna()
-        else:
-            data = pd.to_numeric(df[column], errors='coerce').dropna()
-
-        # Evitar procesar si no hay datos válidos
-        if data.empty:
-            continue
-
-        # Almacenar la columna en el DataFrame
-        all_data[excel_file] = data  # Nombre del archivo como nombre de la columna
-
-    # Guardar los resultados en un archivo Excel
-    output_excel = os.path.join(output_path, 'Resultados_Columnas.xlsx')
-    all_data.to_excel(output_excel, index=False)
-
-    messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}.")
-
 # Interfaz gráfica con tkinter
 class App:
     def __init__(self, root):
@@ -63,6 +23,8 @@ class App:
         self.root.title("Proceso de selección de columnas de Excel")
         self.root.configure(bg='black')
         self.root.attributes('-fullscreen', True)
+        # Los procesos largos corren en segundo plano para que la ventana no se congele
+        self.runner = create_job_runner(self.root)
         self.create_widgets()
 
     def create_widgets(self):
@@ -85,10 +47,11 @@ class App:
     def process_files(self):
         try:
             column_input = self.colum_entry.get()  # Obtener el valor de la columna ingresada
-            if column_input.isdigit():
-                column = int(column_input)  # Convertir a entero si es un número
-            else:
-                column = column_input  # Usar el nombre de la columna
+            # Una o varias columnas separadas por comas (nombres o índices)
+            column = parse_column_input(column_input)
+            if not column:
+                messagebox.showwarning("Error", "No ingresaste ninguna columna.")
+                return
 
             input_path = filedialog.askdirectory(title="Seleccionar carpeta de entrada")
             output_path = filedialog.askdirectory(title="Seleccionar carpeta de salida")
@@ -96,7 +59,8 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            process_excel_files(input_path, output_path, column)
+            self.runner.submit("Extraer columna", process_excel_files, input_path, output_path, column,
+                               on_success=lambda _: messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
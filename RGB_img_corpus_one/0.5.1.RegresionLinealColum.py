@@ -3,86 +3,53 @@ import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
-from scipy import stats
+from job_runner import create_job_runner
+from column_store import process_excel_files, parse_column_input
+import numpy as np
+from vector_store import is_corpus_memmap, open_corpus_memmap
+from batch_regression import columnas_de_excel, ajustar_regresiones
 
-# Función para calcular la regresión lineal
-def calcular_regresion(X, Y):
-    slope, intercept, r_value, _, _ = stats.linregress(X, Y)
-    return slope, intercept, r_value
+# Función para recorrer las series de datos de un Excel o de la matriz del corpus en bloques
+def iterar_bloques_series(input_path, tamano_bloque=4096):
+    # Matriz del corpus mapeada en memoria: cada fila (imagen) es una serie completa, sin crear DataFrames
+    if is_corpus_memmap(input_path):
+        matrix, image_files, _ = open_corpus_memmap(input_path)
+        for inicio in range(0, len(image_files), tamano_bloque):
+            yield image_files[inicio:inicio + tamano_bloque], np.asarray(matrix[inicio:inicio + tamano_bloque]), None
 
-# Función para procesar los archivos Excel y obtener los datos
-def process_excel_files(input_path, output_path, column):
-    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
+        return
 
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
+    # Excel: cada columna es una serie; las de distinta longitud se ajustan con máscara
+    yield columnas_de_excel(input_path)
 
-    # Crear un dataframe vacío para almacenar los resultados
-    all_data = pd.DataFrame()
-
-    for excel_file in excel_files:
-        excel_path = os.path.join(input_path, excel_file)
-        df = pd.read_excel(excel_path)
-
-        # Verificar si la columna es válida
-        if isinstance(column, int):
-            if column >= len(df.columns):
-                continue
-        elif column not in df.columns:
-            continue
-
-        # Extraer la columna seleccionada y asegurarse de que los datos sean numéricos
-        if isinstance(column, int):
-            data = pd.to_numeric(df.iloc[:, column], errors='coerce').dropna()
-        else:
-            data = pd.to_numeric(df[column], errors='coerce').dropna()
-
-        # Evitar procesar si no hay datos válidos
-        if data.empty:
-            continue
-
-        # Almacenar la columna en el DataFrame
-        all_data[excel_file] = data  # Nombre del archivo como nombre de la columna
-
-    # Guardar los resultados en un archivo Excel
-    output_excel = os.path.join(output_path, 'Resultados_Columnas.xlsx')
-    all_data.to_excel(output_excel, index=False)
-
-    messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}.")
+# Nombres de las filas del archivo de resultados
+FILAS_REGRESION = ['Pendiente', 'Intersección', 'R^2']
 
 # Función para calcular la regresión lineal para cada columna
-def calcular_regresiones(input_excel_path, output_path):
-    df = pd.read_excel(input_excel_path)
-    
-    # Crear un DataFrame para almacenar los resultados de la regresión
-    regression_results = pd.DataFrame()
-
-    # Iterar sobre cada columna en el DataFrame
-    for column in df.columns:
-        data = pd.to_numeric(df[column], errors='coerce').dropna()
-        
-        # Evitar procesar si no hay datos válidos
-        if data.empty:
-            continue
-
-        X = list(range(1, len(data) + 1))
-        Y = data.tolist()
-
-        # Calcular la regresión lineal
-        slope, intercept, r_value = calcular_regresion(X, Y)
-
-        # Almacenar los resultados en el DataFrame
-        regression_results[column] = [slope, intercept, r_value**2]
-
-    # Renombrar las filas para claridad
-    regression_results.index = ['Pendiente', 'Intersección', 'R^2']
+def calcular_regresiones(input_excel_path, output_path, progress=None):
+    # Ajustar todas las series de cada bloque con una sola llamada vectorizada
+    tablas = []
+    if progress is not None:
+        progress.start(None, "Ajustando regresiones")
+    for columns, Y, mascara in iterar_bloques_series(input_excel_path):
+        resultados = ajustar_regresiones(Y, mascara, x_inicio=1)
+        if progress is not None:
+            progress.advance(len(columns))
+
+        # Evitar las series sin datos válidos
+        validas = resultados['n'] > 0
+        tablas.append(pd.DataFrame(
+            [resultados['Pendiente'][validas], resultados['Intersección'][validas], resultados['R^2'][validas]],
+            index=FILAS_REGRESION,
+            columns=[column for column, valida in zip(columns, validas) if valida],
+        ))
+
+    regression_results = pd.concat(tablas, axis=1) if tablas else pd.DataFrame(index=FILAS_REGRESION)
 
     # Guardar los resultados en un archivo Excel
     output_excel = os.path.join(output_path, 'Resultados_Regresiones.xlsx')
     regression_results.to_excel(output_excel)
 
-    messagebox.showinfo("Éxito", f"Resultados de la regresión guardados en {output_path}.")
-
 # Interfaz gráfica con tkinter
 class App:
     def __init__(self, root):
@@ -90,6 +57,8 @@ class App:
         self.root.title("Proceso de selección de columnas de Excel")
         self.root.configure(bg='black')
         self.root.attributes('-fullscreen', True)
+        # Los procesos largos corren en segundo plano para que la ventana no se congele
+        self.runner = create_job_runner(self.root)
         self.create_widgets()
 
     def create_widgets(self):
@@ -116,10 +85,11 @@ class App:
     def process_files(self):
         try:
             column_input = self.colum_entry.get()  # Obtener el valor de la columna ingresada
-            if column_input.isdigit():
-                column = int(column_input)  # Convertir a entero si es un número
-            else:
-                column = column_input  # Usar el nombre de la columna
+            # Una o varias columnas separadas por comas (nombres o índices)
+            column = parse_column_input(column_input)
+            if not column:
+                messagebox.showwarning("Error", "No ingresaste ninguna columna.")
+                return
 
             input_path = filedialog.askdirectory(title="Seleccionar carpeta de entrada")
             output_path = filedialog.askdirectory(title="Seleccionar carpeta de salida")
@@ -127,13 +97,14 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            process_excel_files(input_path, output_path, column)
+            self.runner.submit("Extraer columna", process_excel_files, input_path, output_path, column,
+                               on_success=lambda _: messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     def calculate_regressions(self):
         try:
-            input_excel_path = filedialog.askopenfilename(title="Seleccionar archivo Excel")
+            input_excel_path = filedialog.askopenfilename(title="Seleccionar archivo Excel o matriz .npy", filetypes=[("Excel o matriz", "*.xlsx *.npy")])
             if not input_excel_path:
                 messagebox.showwarning("Error", "No seleccionaste ningún archivo Excel.")
                 return
@@ -143,7 +114,8 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            calcular_regresiones(input_excel_path, output_path)
+            self.runner.submit("Regresiones", calcular_regresiones, input_excel_path, output_path,
+                               on_success=lambda _: messagebox.showinfo("Éxito", f"Resultados de la regresión guardados en {output_path}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
@@ -3,92 +3,40 @@ import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
+from job_runner import create_job_runner
+from column_store import process_excel_files, parse_column_input
 import numpy as np
-from scipy import stats
-
-# Función para calcular la regresión lineal
-def calcular_regresion(X, Y):
-    slope, intercept, r_value, _, _ = stats.linregress(X, Y)
-    return slope, intercept, r_value
-
-# Función para calcular la distancia de un punto a la línea de regresión
-def calcular_distancia(punto, slope, intercept):
-    # Ecuación de la línea de regresión: y = mx + b
-    # Distancia vertical desde el punto (x, y) a la línea
-    return abs(punto - (slope * punto.index + intercept))
-
-# Función para procesar los archivos Excel y obtener los datos
-def process_excel_files(input_path, output_path, column):
-    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
-
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
-
-    # Crear un dataframe vacío para almacenar los resultados
-    all_data = pd.DataFrame()
-
-    for excel_file in excel_files:
-        excel_path = os.path.join(input_path, excel_file)
-        df = pd.read_excel(excel_path)
-
-        # Verificar si la columna es válida
-        if isinstance(column, int):
-            if column >= len(df.columns):
-                continue
-        elif column not in df.columns:
-            continue
-
-        # Extraer la columna seleccionada y asegurarse de que los datos sean numéricos
-        if isinstance(column, int):
-            data = pd.to_numeric(df.iloc[:, column], errors='coerce').dropna()
-        else:
-            data = pd.to_numeric(df[column], errors='coerce').dropna()
-
-        # Evitar procesar si no hay datos válidos
-        if data.empty:
-            continue
-
-        # Almacenar la columna en el DataFrame
-        all_data[excel_file] = data  # Nombre del archivo como nombre de la columna
-
-    # Guardar los resultados en un archivo Excel
-    output_excel = os.path.join(output_path, 'Resultados_Columnas.xlsx')
-    all_data.to_excel(output_excel, index=False)
-
-    messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}.")
-    
-# Función para graficar los puntos y la línea de regresión para cada columna
-def graficar_regresiones(input_excel_path, output_path):
-    df = pd.read_excel(input_excel_path)
-
-    # Crear un DataFrame para almacenar las distancias
-    distance_results = pd.DataFrame()
-
-    # Iterar sobre cada columna en el DataFrame
-    for column in df.columns:
-        data = pd.to_numeric(df[column], errors='coerce').dropna()
-        
-        # Evitar procesar si no hay datos válidos
-        if data.empty:
-            continue
-
-        X = list(range(1, len(data) + 1))
-        Y = data.tolist()
-
-        # Calcular la regresión lineal
-        slope, intercept, _ = calcular_regresion(X, Y)
-
-        # Calcular las distancias
-        distancias = [float(calcular_distancia(pd.Series([y]), slope, intercept)) for y in Y]
-
-        # Almacenar los resultados en el DataFrame
-        distance_results[column] = distancias
-
-    # Guardar las distancias en un archivo Excel
+from batch_regression import columnas_de_excel, ajustar_regresiones, calcular_residuos, guardar_residuos
+
+# Función para calcular la distancia de cada punto a la línea de regresión de su columna
+def graficar_regresiones(input_excel_path, output_path, perpendicular=False, progress=None):
+    if progress is not None:
+        progress.start(2, "Calculando distancias")
+
+    # Ajustar todas las columnas a la vez; X es la posición del punto (1, 2, ..., n)
+    columnas, Y, mascara = columnas_de_excel(input_excel_path)
+    ajustes = ajustar_regresiones(Y, mascara, x_inicio=1)
+
+    # Distancias con signo y absolutas de todos los puntos en una sola operación
+    con_signo, absolutas = calcular_residuos(Y, mascara, ajustes, x_inicio=1, perpendicular=perpendicular)
+
+    # Evitar las columnas sin datos válidos
+    validas = ajustes['n'] > 0
+    nombres = [column for column, valida in zip(columnas, validas) if valida]
+    ajustes = {clave: valores[validas] for clave, valores in ajustes.items()}
+    con_signo, absolutas = con_signo[validas], absolutas[validas]
+    if progress is not None:
+        progress.advance()
+
+    # Guardar todas las distancias en binario (rápido de volver a cargar)
+    guardar_residuos(os.path.join(output_path, 'Resultados_Distancias.npz'), nombres, con_signo, ajustes, perpendicular)
+
+    # Guardar las distancias absolutas en un archivo Excel (una columna por serie)
+    distance_results = pd.DataFrame(absolutas.T, columns=nombres)
     output_excel = os.path.join(output_path, 'Resultados_Distancias.xlsx')
     distance_results.to_excel(output_excel, index=False)
-
-    messagebox.showinfo("Éxito", f"Distancias guardadas en {output_path}.")
+    if progress is not None:
+        progress.advance()
 
 # Interfaz gráfica con tkinter
 class App:
@@ -97,6 +45,8 @@ class App:
         self.root.title("Proceso de selección de columnas de Excel")
         self.root.configure(bg='black')
         self.root.attributes('-fullscreen', True)
+        # Los procesos largos corren en segundo plano para que la ventana no se congele
+        self.runner = create_job_runner(self.root)
         self.create_widgets()
 
     def create_widgets(self):
@@ -117,16 +67,22 @@ class App:
         distance_button = ttk.Button(self.root, text="Calcular distancias", style="TButton", command=self.calculate_distances)
         distance_button.pack(pady=10)
 
+        # Casilla para medir la distancia perpendicular a la recta en lugar de la vertical
+        self.perpendicular_var = tk.BooleanVar(value=False)
+        perpendicular_check = ttk.Checkbutton(self.root, text="Distancia perpendicular", variable=self.perpendicular_var)
+        perpendicular_check.pack(pady=10)
+
         # Botón para salir de pantalla completa con la tecla Escape
         self.root.bind("<Escape>", lambda e: self.root.attributes("-fullscreen", False))
 
     def process_files(self):
         try:
             column_input = self.colum_entry.get()  # Obtener el valor de la columna ingresada
-            if column_input.isdigit():
-                column = int(column_input)  # Convertir a entero si es un número
-            else:
-                column = column_input  # Usar el nombre de la columna
+            # Una o varias columnas separadas por comas (nombres o índices)
+            column = parse_column_input(column_input)
+            if not column:
+                messagebox.showwarning("Error", "No ingresaste ninguna columna.")
+                return
 
             input_path = filedialog.askdirectory(title="Seleccionar carpeta de entrada")
             output_path = filedialog.askdirectory(title="Seleccionar carpeta de salida")
@@ -134,7 +90,8 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            process_excel_files(input_path, output_path, column)
+            self.runner.submit("Extraer columna", process_excel_files, input_path, output_path, column,
+                               on_success=lambda _: messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
@@ -150,7 +107,9 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            graficar_regresiones(input_excel_path, output_path)
+            self.runner.submit("Distancias", graficar_regresiones, input_excel_path, output_path,
+                               perpendicular=self.perpendicular_var.get(),
+                               on_success=lambda _: messagebox.showinfo("Éxito", f"Distancias guardadas en {output_path}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
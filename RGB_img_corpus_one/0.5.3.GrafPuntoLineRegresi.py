@@ -1,89 +1,36 @@
 import os
-import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
-import matplotlib.pyplot as plt
-from scipy import stats
-
-# Función para calcular la regresión lineal
-def calcular_regresion(X, Y):
-    slope, intercept, r_value, _, _ = stats.linregress(X, Y)
-    return slope, intercept, r_value
-
-# Función para procesar los archivos Excel y obtener los datos
-def process_excel_files(input_path, output_path, column):
-    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
-
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
-
-    # Crear un dataframe vacío para almacenar los resultados
-    all_data = pd.DataFrame()
-
-    for excel_file in excel_files:
-        excel_path = os.path.join(input_path, excel_file)
-        df = pd.read_excel(excel_path)
-
-        # Verificar si la columna es válida
-        if isinstance(column, int):
-            if column >= len(df.columns):
-                continue
-        elif column not in df.columns:
-            continue
-
-        # Extraer la columna seleccionada y asegurarse de que los datos sean numéricos
-        if isinstance(column, int):
-            data = pd.to_numeric(df.iloc[:, column], errors='coerce').dropna()
-        else:
-            data = pd.to_numeric(df[column], errors='coerce').dropna()
-
-        # Evitar procesar si no hay datos válidos
-        if data.empty:
-            continue
-
-        # Almacenar la columna en el DataFrame
-        all_data[excel_file] = data  # Nombre del archivo como nombre de la columna
-
-    # Guardar los resultados en un archivo Excel
-    output_excel = os.path.join(output_path, 'Resultados_Columnas.xlsx')
-    all_data.to_excel(output_excel, index=False)
-
-    messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}.")
+from job_runner import create_job_runner
+from column_store import process_excel_files, parse_column_input
+from batch_charts import crear_tarea, renderizar_graficas
+from batch_regression import columnas_de_excel, ajustar_regresiones
 
 # Función para graficar los puntos y la línea de regresión para cada columna
-def graficar_regresiones(input_excel_path, output_path):
-    df = pd.read_excel(input_excel_path)
-
-    # Iterar sobre cada columna en el DataFrame
-    for column in df.columns:
-        data = pd.to_numeric(df[column], errors='coerce').dropna()
-        
-        # Evitar procesar si no hay datos válidos
-        if data.empty:
+def graficar_regresiones(input_excel_path, output_path, workers=None, omitir_sin_cambios=True, progress=None):
+    # Ajustar la regresión lineal de todas las columnas a la vez (X = 1, 2, ..., n)
+    columnas, Y_columnas, mascara = columnas_de_excel(input_excel_path)
+    ajustes = ajustar_regresiones(Y_columnas, mascara, x_inicio=1)
+
+    # Preparar una gráfica por columna con datos válidos
+    tareas = []
+    for i, column in enumerate(columnas):
+        n = int(ajustes['n'][i])
+        if n == 0:
             continue
 
-        X = list(range(1, len(data) + 1))
-        Y = data.tolist()
-
-        # Calcular la regresión lineal
-        slope, intercept, _ = calcular_regresion(X, Y)
-
-        # Crear la gráfica
-        plt.figure()
-        plt.scatter(X, Y, label='Datos', color='blue')  # Puntos de dispersión
-        plt.plot(X, [slope * xi + intercept for xi in X], color='red', label='Línea de regresión')  # Línea de regresión
-        plt.title(f'Gráfica de {column}')
-        plt.xlabel('Índice')
-        plt.ylabel(column)
-        plt.legend()
-        
-        # Guardar la gráfica en un archivo
         output_image_path = os.path.join(output_path, f'Grafica_{column}.png')
-        plt.savefig(output_image_path)
-        plt.close()
+        tareas.append(crear_tarea('regresion', output_image_path, column, Y_columnas[i, :n],
+                                  ajustes['Pendiente'][i], ajustes['Intersección'][i], x_inicio=1))
 
-    messagebox.showinfo("Éxito", f"Gráficas guardadas en {output_path}.")
+    # Dibujar todas las gráficas en paralelo con el backend Agg, omitiendo las que no cambiaron
+    _, _, errores = renderizar_graficas(tareas, output_path, workers=workers, omitir_sin_cambios=omitir_sin_cambios, progress=progress)
+    # Reportar las gráficas que no se pudieron generar sin detener el lote
+    for ruta, error in errores:
+        print(f"Error generando {ruta}: {error}")
+
+    return errores
 
 # Interfaz gráfica con tkinter
 class App:
@@ -92,6 +39,8 @@ class App:
         self.root.title("Proceso de selección de columnas de Excel")
         self.root.configure(bg='black')
         self.root.attributes('-fullscreen', True)
+        # Los procesos largos corren en segundo plano para que la ventana no se congele
+        self.runner = create_job_runner(self.root)
         self.create_widgets()
 
     def create_widgets(self):
@@ -118,10 +67,11 @@ class App:
     def process_files(self):
         try:
             column_input = self.colum_entry.get()  # Obtener el valor de la columna ingresada
-            if column_input.isdigit():
-                column = int(column_input)  # Convertir a entero si es un número
-            else:
-                column = column_input  # Usar el nombre de la columna
+            # Una o varias columnas separadas por comas (nombres o índices)
+            column = parse_column_input(column_input)
+            if not column:
+                messagebox.showwarning("Error", "No ingresaste ninguna columna.")
+                return
 
             input_path = filedialog.askdirectory(title="Seleccionar carpeta de entrada")
             output_path = filedialog.askdirectory(title="Seleccionar carpeta de salida")
@@ -129,7 +79,8 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            process_excel_files(input_path, output_path, column)
+            self.runner.submit("Extraer columna", process_excel_files, input_path, output_path, column,
+                               on_success=lambda _: messagebox.showinfo("Éxito", f"Datos procesados y guardados en {output_path}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
@@ -145,10 +96,17 @@ class App:
                 messagebox.showwarning("Error", "No seleccionaste ninguna carpeta de salida.")
                 return
 
-            graficar_regresiones(input_excel_path, output_path)
+            self.runner.submit("Gráficas", graficar_regresiones, input_excel_path, output_path,
+                               on_success=lambda errores: self.charts_done(errores, f"Gráficas guardadas en {output_path}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def charts_done(self, errores, mensaje):
+        if errores:
+            messagebox.showwarning("Aviso", f"{len(errores)} gráficas no se pudieron generar.")
+        else:
+            messagebox.showinfo("Éxito", mensaje)
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = App(root)
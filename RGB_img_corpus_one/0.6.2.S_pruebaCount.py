@@ -1,57 +1,42 @@
 # CONTRAR DENTRO DEL RANGO ESPECIFICO DE LOS PORCENTAJES
 import os
 import pandas as pd
-import numpy as np
 import tkinter as tk
 from tkinter import ttk
 from tkinter import filedialog, messagebox
-import matplotlib.pyplot as plt
-from scipy import stats
-
-# Función para calcular regresión y obtener desviación estándar de residuos
-def calcular_regresion_y_desviacion(X, Y):
-    slope, intercept, _, _, _ = stats.linregress(X, Y)
-    Y_pred = intercept + slope * X
-    residuos = Y - Y_pred
-    desviacion_estandar = np.std(residuos)
-    return slope, intercept, desviacion_estandar
+from job_runner import create_job_runner
+from batch_charts import crear_tarea, renderizar_graficas
+from batch_regression import columnas_de_excel, ajustar_regresiones, clasificar_bandas
 
 # Función para procesar y graficar cada columna con sus líneas de confianza
-def procesar_y_graficar(input_excel, output_dir):
-    df = pd.read_excel(input_excel)
-
+def procesar_y_graficar(input_excel, output_dir, workers=None, omitir_sin_cambios=True, progress=None):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
     resultados = []
 
-    for column in df.columns:
-        # Convertir la columna a datos numéricos
-        data = pd.to_numeric(df[column], errors='coerce').dropna()
-        
+    # Ajustar la regresión y la desviación estándar de los residuos de todas las columnas a la vez
+    columnas, Y_columnas, mascara = columnas_de_excel(input_excel)
+    ajustes = ajustar_regresiones(Y_columnas, mascara, x_inicio=0)
+
+    # Clasificar todos los puntos de todas las columnas en los anillos de ±1σ, ±2σ y ±3σ en una sola pasada
+    bandas = clasificar_bandas(Y_columnas, mascara, ajustes, x_inicio=0, k_sigmas=(1, 2, 3))
+
+    tareas = []
+    for i, column in enumerate(columnas):
+        n = int(ajustes['n'][i])
+
         # Evitar procesar si la columna no tiene datos válidos
-        if data.empty:
+        if n == 0:
             continue
         
-        X = np.arange(len(data))  # Eje X es el índice de los datos
-        Y = data.values  # Valores Y de la columna
-
-        # Calcular regresión y desviación estándar
-        slope, intercept, sigma_e = calcular_regresion_y_desviacion(X, Y)
-
-        # Calcular las líneas de confianza
-        y_reg = intercept + slope * X
-        y_upper_68 = (intercept + sigma_e) + slope * X
-        y_lower_68 = (intercept - sigma_e) + slope * X
-        y_upper_95 = (intercept + 2 * sigma_e) + slope * X
-        y_lower_95 = (intercept - 2 * sigma_e) + slope * X
-        y_upper_997 = (intercept + 3 * sigma_e) + slope * X
-        y_lower_997 = (intercept - 3 * sigma_e) + slope * X
-
-        # Contar puntos en cada intervalo específico
-        dentro_0_68 = np.sum((Y >= y_reg) & (Y <= y_upper_68)) + np.sum((Y <= y_reg) & (Y >= y_lower_68))
-        dentro_68_95 = np.sum((Y > y_upper_68) & (Y <= y_upper_95)) + np.sum((Y < y_lower_68) & (Y >= y_lower_95))
-        dentro_95_997 = np.sum((Y > y_upper_95) & (Y <= y_upper_997)) + np.sum((Y < y_lower_95) & (Y >= y_lower_997))
+        Y = Y_columnas[i, :n]  # Valores Y de la columna
+
+        # Regresión y desviación estándar de los residuos ya calculadas
+        slope, intercept, sigma_e = ajustes['Pendiente'][i], ajustes['Intersección'][i], ajustes['Sigma'][i]
+
+        # Puntos en cada intervalo específico (ya clasificados)
+        dentro_0_68, dentro_68_95, dentro_95_997 = bandas['exclusivos'][i]
 
         # Guardar resultados en la lista
         resultados.append({
@@ -61,34 +46,22 @@ def procesar_y_graficar(input_excel, output_dir):
             "Dentro de 95-99.7% (±2σ a ±3σ)": dentro_95_997
         })
 
-        # Crear la gráfica
-        plt.figure(figsize=(10, 6))
-        plt.plot(X, Y, 'o', label='Datos', markersize=5)
-        plt.plot(X, y_reg, 'r-', label=f'Regresión: y = {intercept:.2f} + {slope:.2f}x')
-        plt.plot(X, y_upper_68, 'g--', label='68% (+1σ)')
-        plt.plot(X, y_lower_68, 'g--', label='68% (-1σ)')
-        plt.plot(X, y_upper_95, 'b--', label='95% (+2σ)')
-        plt.plot(X, y_lower_95, 'b--', label='95% (-2σ)')
-        plt.plot(X, y_upper_997, 'y--', label='99.7% (+3σ)')
-        plt.plot(X, y_lower_997, 'y--', label='99.7% (-3σ)')
-        
-        # Etiquetas y título
-        plt.title(f'Columna: {column}')
-        plt.xlabel('Índice')
-        plt.ylabel('Valor')
-        plt.legend()
-        
-        # Guardar la gráfica
-        output_path = os.path.join(output_dir, f'Grafico_{column}.png')
-        plt.savefig(output_path)
-        plt.close()
+        # Preparar la gráfica (eje X = índice de los datos); se dibujan todas juntas al final
+        tareas.append(crear_tarea('bandas', os.path.join(output_dir, f'Grafico_{column}.png'),
+                                  column, Y, slope, intercept, sigma_e, x_inicio=0))
+
+    # Dibujar todas las gráficas en paralelo con el backend Agg, omitiendo las que no cambiaron
+    _, _, errores = renderizar_graficas(tareas, output_dir, workers=workers, omitir_sin_cambios=omitir_sin_cambios, progress=progress)
+    # Reportar las gráficas que no se pudieron generar sin detener el lote
+    for ruta, error in errores:
+        print(f"Error generando {ruta}: {error}")
 
     # Crear un DataFrame con los resultados y guardarlo en un archivo Excel
     df_resultados = pd.DataFrame(resultados)
     output_excel = os.path.join(output_dir, 'Resultados_intervalos_confianza.xlsx')
     df_resultados.to_excel(output_excel, index=False)
 
-    messagebox.showinfo("Éxito", f"Gráficas y resultados generados y guardados en {output_dir}.")
+    return errores
 
 # Interfaz gráfica con tkinter
 class App:
@@ -97,6 +70,8 @@ class App:
         self.root.title("Proceso de selección de columnas de Excel")
         self.root.configure(bg='black')
         self.root.attributes('-fullscreen', True)
+        # Los procesos largos corren en segundo plano para que la ventana no se congele
+        self.runner = create_job_runner(self.root)
         self.create_widgets()
 
     def create_widgets(self):
@@ -141,10 +116,18 @@ class App:
             messagebox.showwarning("Error", "Selecciona una carpeta de salida.")
             return
         try:
-            procesar_y_graficar(self.input_file, self.output_folder)
+            output_dir = self.output_folder
+            self.runner.submit("Gráficas", procesar_y_graficar, self.input_file, output_dir,
+                               on_success=lambda errores: self.charts_done(errores, f"Gráficas y resultados generados y guardados en {output_dir}."))
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
+    def charts_done(self, errores, mensaje):
+        if errores:
+            messagebox.showwarning("Aviso", f"{len(errores)} gráficas no se pudieron generar.")
+        else:
+            messagebox.showinfo("Éxito", mensaje)
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = App(root)
@@ -0,0 +1,185 @@
+import os
+import json
+import hashlib
+import numpy as np
+from multiprocessing import Pool
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+# Archivo con la huella de cada gráfica generada, dentro de la carpeta de salida
+MANIFEST_NAME = "graficas_manifest.json"
+
+# Versión del estilo de las gráficas: cambiarla obliga a regenerarlas todas
+ESTILO_VERSION = 1
+
+# Figuras reutilizadas por cada proceso (una por tipo de gráfica)
+_FIGURAS = {}
+
+# Función para crear la figura de puntos y línea de regresión (scripts 0.5.x)
+def _crear_figura_regresion():
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    # Marcadores del mismo tamaño que plt.scatter, pero como línea para poder usar set_data y relim
+    artistas = {
+        'puntos': ax.plot([], [], 'o', color='blue', markersize=6, label='Datos')[0],
+        'regresion': ax.plot([], [], color='red', label='Línea de regresión')[0],
+    }
+    ax.set_xlabel('Índice')
+    return fig, ax, artistas
+
+# Función para crear la figura con las bandas de ±1σ, ±2σ y ±3σ (scripts 0.6.x)
+def _crear_figura_bandas():
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    artistas = {
+        'puntos': ax.plot([], [], 'o', label='Datos', markersize=5)[0],
+        'regresion': ax.plot([], [], 'r-')[0],
+    }
+    for k, estilo, porcentaje in ((1, 'g--', '68%'), (2, 'b--', '95%'), (3, 'y--', '99.7%')):
+        artistas[k] = ax.plot([], [], estilo, label=f'{porcentaje} (+{k}σ)')[0]
+        artistas[-k] = ax.plot([], [], estilo, label=f'{porcentaje} (-{k}σ)')[0]
+    ax.set_xlabel('Índice')
+    ax.set_ylabel('Valor')
+    return fig, ax, artistas
+
+# Función para obtener la figura reutilizable de un tipo de gráfica
+def _obtener_figura(tipo):
+    if tipo not in _FIGURAS:
+        _FIGURAS[tipo] = _crear_figura_regresion() if tipo == 'regresion' else _crear_figura_bandas()
+    return _FIGURAS[tipo]
+
+# Función para dibujar una gráfica actualizando los datos de la figura reutilizada
+def _dibujar(tarea):
+    """
+    Dibuja y guarda una gráfica sin crear figuras nuevas: solo cambia los datos de los artistas.
+
+    :param tarea: Diccionario de crear_tarea.
+    :return: Tupla (archivo, mensaje de error o None).
+    """
+    try:
+        fig, ax, artistas = _obtener_figura(tarea['tipo'])
+        Y = tarea['Y']
+        X = tarea['x_inicio'] + np.arange(len(Y))
+        pendiente, interseccion = tarea['pendiente'], tarea['interseccion']
+        y_reg = interseccion + pendiente * X
+
+        artistas['puntos'].set_data(X, Y)
+        artistas['regresion'].set_data(X, y_reg)
+
+        if tarea['tipo'] == 'regresion':
+            ax.set_title(f"Gráfica de {tarea['columna']}")
+            ax.set_ylabel(str(tarea['columna']))
+        else:
+            artistas['regresion'].set_label(f'Regresión: y = {interseccion:.2f} + {pendiente:.2f}x')
+            for k in (1, 2, 3):
+                artistas[k].set_data(X, (interseccion + k * tarea['sigma']) + pendiente * X)
+                artistas[-k].set_data(X, (interseccion - k * tarea['sigma']) + pendiente * X)
+            ax.set_title(f"Columna: {tarea['columna']}")
+
+        # Recalcular los límites con los datos nuevos
+        ax.relim()
+        ax.autoscale_view()
+        ax.legend()
+
+        fig.savefig(tarea['ruta'])
+        return tarea['ruta'], None
+    except Exception as e:
+        return tarea['ruta'], str(e)
+
+# Función para crear la tarea de una gráfica
+def crear_tarea(tipo, ruta, columna, Y, pendiente, interseccion, sigma=0.0, x_inicio=1):
+    """
+    Reúne los datos que necesita un proceso para dibujar una gráfica.
+
+    :param tipo: 'regresion' (puntos y recta, 0.5.x) o 'bandas' (recta con ±1σ, ±2σ y ±3σ, 0.6.x).
+    :param ruta: Ruta del archivo PNG.
+    :param columna: Nombre de la columna (se usa en el título).
+    :param Y: Valores válidos de la columna.
+    :param pendiente: Pendiente de la recta.
+    :param interseccion: Intersección de la recta.
+    :param sigma: Desviación estándar de los residuos (solo para 'bandas').
+    :param x_inicio: Primer valor de X.
+    :return: Diccionario con la tarea.
+    """
+    return {
+        'tipo': tipo, 'ruta': ruta, 'columna': columna, 'Y': np.asarray(Y, dtype=np.float64),
+        'pendiente': float(pendiente), 'interseccion': float(interseccion),
+        'sigma': float(sigma), 'x_inicio': x_inicio,
+    }
+
+# Función para calcular la huella de una gráfica (cambia si cambian sus datos o su estilo)
+def huella_tarea(tarea):
+    digest = hashlib.sha1()
+    encabezado = [ESTILO_VERSION, tarea['tipo'], str(tarea['columna']), tarea['x_inicio'],
+                  tarea['pendiente'], tarea['interseccion'], tarea['sigma']]
+    digest.update(json.dumps(encabezado).encode('utf-8'))
+    digest.update(tarea['Y'].tobytes())
+    return digest.hexdigest()
+
+# Función para leer las huellas de las gráficas generadas en la ejecución anterior
+def _leer_manifiesto(output_dir):
+    ruta = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.isfile(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+# Función para generar muchas gráficas en paralelo, sin interfaz gráfica
+def renderizar_graficas(tareas, output_dir, workers=None, omitir_sin_cambios=True, chunksize=8, progress=None):
+    """
+    Genera las gráficas con el backend Agg repartiéndolas entre varios procesos.
+    Cada proceso reutiliza una sola figura por tipo de gráfica y solo actualiza sus datos.
+
+    :param tareas: Lista de tareas de crear_tarea.
+    :param output_dir: Carpeta de salida (donde se guarda el manifiesto de huellas).
+    :param workers: Número de procesos (None = todos los núcleos, 1 = secuencial sin pool).
+    :param omitir_sin_cambios: Si es True, no se vuelven a dibujar las gráficas cuyos datos
+                               no cambiaron desde la última ejecución y cuyo archivo existe.
+    :param chunksize: Número de gráficas que se envían juntas a cada proceso.
+    :param progress: JobProgress opcional para informar el avance y permitir cancelar.
+    :return: Tupla (número de gráficas generadas, número de omitidas, lista de (archivo, error)).
+    """
+    manifiesto = _leer_manifiesto(output_dir)
+    huellas = {tarea['ruta']: huella_tarea(tarea) for tarea in tareas}
+
+    pendientes = [
+        tarea for tarea in tareas
+        if not (omitir_sin_cambios and os.path.isfile(tarea['ruta'])
+                and manifiesto.get(os.path.basename(tarea['ruta'])) == huellas[tarea['ruta']])
+    ]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if progress is not None:
+        progress.start(len(pendientes), "Graficando")
+
+    resultados = []
+    if workers <= 1 or len(pendientes) <= 1:
+        for tarea in pendientes:
+            resultados.append(_dibujar(tarea))
+            if progress is not None:
+                progress.advance()
+    else:
+        # Si se cancela el trabajo, al salir del bloque with se terminan los procesos
+        with Pool(processes=min(workers, len(pendientes))) as pool:
+            for resultado in pool.imap_unordered(_dibujar, pendientes, chunksize=max(1, chunksize)):
+                resultados.append(resultado)
+                if progress is not None:
+                    progress.advance()
+
+    errores = [(ruta, error) for ruta, error in resultados if error is not None]
+    fallidas = {ruta for ruta, _ in errores}
+
+    # Guardar la huella de todas las gráficas que quedaron al día
+    for ruta, huella in huellas.items():
+        if ruta in fallidas:
+            manifiesto.pop(os.path.basename(ruta), None)
+        else:
+            manifiesto[os.path.basename(ruta)] = huella
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=1)
+
+    return len(pendientes) - len(errores), len(tareas) - len(pendientes), errores
@@ -0,0 +1,192 @@
+import numpy as np
+import pandas as pd
+from excel_reader import read_workbook
+
+# Función para compactar columnas de distinta longitud en una matriz con máscara
+def compactar_columnas(valores):
+    """
+    Recorre los valores válidos de cada serie al inicio de su fila, igual que dropna(),
+    para que todas las series se puedan ajustar juntas.
+
+    :param valores: Arreglo 2D (n_series, n_puntos) con NaN en los datos faltantes.
+    :return: Tupla (Y, máscara): Y float64 con ceros en el relleno y máscara booleana de datos válidos.
+    """
+    valores = np.asarray(valores, dtype=np.float64)
+    validos = ~np.isnan(valores)
+
+    # Orden estable: los datos válidos quedan primero y conservan su orden original
+    orden = np.argsort(~validos, axis=1, kind='stable')
+    Y = np.take_along_axis(valores, orden, axis=1)
+    mascara = np.take_along_axis(validos, orden, axis=1)
+    Y[~mascara] = 0.0
+    return Y, mascara
+
+# Función para convertir las columnas de un DataFrame en series listas para ajustar
+def columnas_de_dataframe(df):
+    """
+    Convierte cada columna a números (los valores no numéricos se descartan, como con
+    pd.to_numeric(errors='coerce').dropna()) y las compacta en una matriz con máscara.
+
+    :param df: DataFrame con una serie por columna.
+    :return: Tupla (nombres, Y, máscara) con una fila por columna del DataFrame.
+    """
+    numerico = df.apply(pd.to_numeric, errors='coerce')
+    Y, mascara = compactar_columnas(numerico.to_numpy(dtype=np.float64).T)
+    return list(df.columns), Y, mascara
+
+# Función para leer las series de un archivo Excel directamente como matriz con máscara
+def columnas_de_excel(excel_path, engine=None):
+    """
+    Igual que columnas_de_dataframe(pd.read_excel(excel_path)), pero el libro se lee con el
+    lector de excel_reader y llega como arreglo, sin crear el DataFrame.
+
+    :param excel_path: Ruta del archivo Excel con una serie por columna.
+    :param engine: Lector de excel_reader (None = el más rápido disponible).
+    :return: Tupla (nombres, Y, máscara) con una fila por columna del libro.
+    """
+    columnas, valores = read_workbook(excel_path, header=True, engine=engine)
+    Y, mascara = compactar_columnas(valores.T)
+    return columnas, Y, mascara
+
+# Función para ajustar la regresión lineal de todas las series en una sola pasada
+def ajustar_regresiones(Y, mascara=None, x_inicio=1):
+    """
+    Ajusta y = intersección + pendiente * x para cada fila de Y con fórmulas cerradas.
+    Como X siempre es x_inicio, x_inicio + 1, ..., sus sumas se conocen de antemano y
+    solo hace falta recorrer Y una vez. Da los mismos resultados que stats.linregress.
+
+    :param Y: Arreglo 2D (n_series, n_puntos); cada serie ocupa el inicio de su fila.
+    :param mascara: Arreglo booleano con los datos válidos (None = todas las filas completas).
+    :param x_inicio: Primer valor de X (1 en los scripts 0.5.x, 0 en los scripts 0.6.x).
+    :return: Diccionario de arreglos con Pendiente, Intersección, r, R^2, Sigma
+             (desviación estándar poblacional de los residuos) y n (puntos de cada serie).
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    if mascara is None:
+        mascara = np.ones(Y.shape, dtype=bool)
+    pesos = mascara.astype(np.float64)
+
+    n = mascara.sum(axis=1)
+    X = x_inicio + np.arange(Y.shape[1], dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Medias de X (conocida en forma cerrada) y de Y
+        media_x = x_inicio + (n - 1) / 2.0
+        media_y = (Y * pesos).sum(axis=1) / n
+
+        # Sumas centradas: la de X sale de la fórmula n(n²-1)/12
+        dx = (X[None, :] - media_x[:, None]) * pesos
+        dy = (Y - media_y[:, None]) * pesos
+        sxx = n * (n * n - 1) / 12.0
+        sxy = (dx * dy).sum(axis=1)
+        syy = (dy * dy).sum(axis=1)
+
+        pendiente = sxy / sxx
+        interseccion = media_y - pendiente * media_x
+
+        # Igual que linregress: r = 0 si X o Y no varían
+        r = np.where((sxx > 0) & (syy > 0), sxy / np.sqrt(sxx * syy), 0.0)
+        r = np.clip(r, -1.0, 1.0)
+
+        # Desviación estándar poblacional de los residuos (la misma que np.std)
+        residuos = (Y - (interseccion[:, None] + pendiente[:, None] * X[None, :])) * pesos
+        media_residuos = residuos.sum(axis=1) / n
+        sigma = np.sqrt((((residuos - media_residuos[:, None]) * pesos) ** 2).sum(axis=1) / n)
+
+    return {
+        'Pendiente': pendiente,
+        'Intersección': interseccion,
+        'r': r,
+        'R^2': r * r,
+        'Sigma': sigma,
+        'n': n,
+    }
+
+# Función para calcular las distancias de todos los puntos a su línea de regresión
+def calcular_residuos(Y, mascara, ajustes, x_inicio=1, perpendicular=False):
+    """
+    Calcula la distancia con signo de cada punto (x, y) a la recta de su serie, con x igual
+    a la posición del punto (x_inicio, x_inicio + 1, ...).
+
+    :param Y: Arreglo 2D (n_series, n_puntos) con cada serie al inicio de su fila.
+    :param mascara: Arreglo booleano con los datos válidos (None = todas las filas completas).
+    :param ajustes: Resultado de ajustar_regresiones para las mismas series.
+    :param x_inicio: Primer valor de X, el mismo usado en el ajuste.
+    :param perpendicular: Si es True, la distancia es ortogonal a la recta (residuo / sqrt(1 + m²));
+                          si no, es la distancia vertical y - (m x + b).
+    :return: Tupla (distancias con signo, distancias absolutas), float64 con NaN en el relleno.
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    if mascara is None:
+        mascara = np.ones(Y.shape, dtype=bool)
+
+    pendiente = ajustes['Pendiente'][:, None]
+    X = x_inicio + np.arange(Y.shape[1], dtype=np.float64)
+
+    con_signo = Y - (ajustes['Intersección'][:, None] + pendiente * X[None, :])
+    if perpendicular:
+        con_signo /= np.sqrt(1.0 + pendiente * pendiente)
+    con_signo[~mascara] = np.nan
+
+    return con_signo, np.abs(con_signo)
+
+# Función para guardar las distancias en formato binario
+def guardar_residuos(ruta_npz, nombres, con_signo, ajustes, perpendicular=False):
+    """
+    Guarda las distancias y los parámetros de cada recta en un archivo .npz comprimido.
+
+    :param ruta_npz: Ruta del archivo .npz.
+    :param nombres: Nombre de cada serie (una por fila).
+    :param con_signo: Distancias con signo de calcular_residuos.
+    :param ajustes: Resultado de ajustar_regresiones.
+    :param perpendicular: Tipo de distancia guardada.
+    """
+    np.savez_compressed(
+        ruta_npz,
+        nombres=np.array([str(nombre) for nombre in nombres], dtype=str),
+        distancias=con_signo,
+        n=ajustes['n'],
+        pendiente=ajustes['Pendiente'],
+        interseccion=ajustes['Intersección'],
+        perpendicular=np.array(perpendicular),
+    )
+
+# Función para clasificar todos los puntos en anillos de k sigmas alrededor de su recta
+def clasificar_bandas(Y, mascara, ajustes, x_inicio=0, k_sigmas=(1, 2, 3)):
+    """
+    Calcula |residuo| / sigma una sola vez y asigna cada punto de cada serie al primer
+    anillo k_sigmas[i] que lo contiene (límites inclusivos, igual que Y <= y_upper).
+    Si sigma es 0, todos los puntos quedan en el primer anillo.
+
+    :param Y: Arreglo 2D (n_series, n_puntos) con cada serie al inicio de su fila.
+    :param mascara: Arreglo booleano con los datos válidos (None = todas las filas completas).
+    :param ajustes: Resultado de ajustar_regresiones (se usan Pendiente, Intersección y Sigma).
+    :param x_inicio: Primer valor de X, el mismo usado en el ajuste.
+    :param k_sigmas: Límites de los anillos en múltiplos de sigma, en orden creciente.
+    :return: Diccionario con 'acumulados' (puntos dentro de ±k sigma), 'exclusivos' (puntos de cada
+             anillo, de forma (n_series, len(k_sigmas))) y 'fuera' (puntos más allá del último límite).
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    if mascara is None:
+        mascara = np.ones(Y.shape, dtype=bool)
+    k_sigmas = np.asarray(k_sigmas, dtype=np.float64)
+    n_anillos = len(k_sigmas)
+
+    _, absolutas = calcular_residuos(Y, mascara, ajustes, x_inicio)
+    sigma = ajustes['Sigma'][:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        razon = np.where(sigma > 0, absolutas / sigma, 0.0)
+
+    # Índice del anillo de cada punto: k[i-1] < razón <= k[i]; n_anillos significa "fuera"
+    anillo = np.searchsorted(k_sigmas, razon[mascara], side='left')
+
+    # Un solo bincount para todas las series, desplazando cada serie a su propio rango
+    serie = np.nonzero(mascara)[0]
+    conteos = np.bincount(serie * (n_anillos + 1) + anillo, minlength=Y.shape[0] * (n_anillos + 1))
+    conteos = conteos.reshape(Y.shape[0], n_anillos + 1)
+
+    return {
+        'acumulados': np.cumsum(conteos[:, :n_anillos], axis=1),
+        'exclusivos': conteos[:, :n_anillos],
+        'fuera': conteos[:, n_anillos],
+    }
@@ -0,0 +1,96 @@
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from image_channels import extract_channel, extract_channels
+
+# Tamaños finales que usan los scripts del pipeline
+SIZES = [(8, 8), (100, 100), (512, 512)]
+
+# Forma anterior: cv2.split reserva tres planos y flatten() copia cada uno otra vez
+def r_vector_split(image, out=None):
+    _, _, r_channel = cv2.split(image)
+    r_vector = r_channel.flatten()
+    if out is not None:
+        out[:] = r_vector
+    return r_vector
+
+def rgb_vectors_split(image, out=None):
+    B, G, R = cv2.split(image)
+    vectors = R.flatten(), G.flatten(), B.flatten()
+    if out is not None:
+        for row, vector in zip(out.reshape(3, -1), vectors):
+            row[:] = vector
+    return vectors
+
+# Forma nueva: una sola copia del canal, o ninguna reserva si se escribe en la fila de salida
+def r_vector_view(image, out=None):
+    return extract_channel(image, 'R', out).reshape(-1)
+
+def rgb_vectors_view(image, out=None):
+    return extract_channels(image, 'RGB', out)
+
+# Función para medir la memoria que reserva una función de extracción
+def measure_allocations(extract, image, out=None):
+    """
+    Ejecuta la extracción una vez con tracemalloc activo (numpy registra ahí sus arreglos).
+
+    :param extract: Función de extracción.
+    :param image: Imagen BGR redimensionada.
+    :param out: Fila de salida preasignada opcional.
+    :return: Tupla (bytes en el pico, número de planos alto*ancho que equivalen a ese pico).
+    """
+    tracemalloc.start()
+    result = extract(image, out)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, peak // (image.shape[0] * image.shape[1])
+
+# Función para medir el mejor tiempo de varias repeticiones
+def best_time(extract, image, out, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        extract(image, out)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+# Función principal del benchmark
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rng = np.random.default_rng(0)
+
+    casos = [
+        ("R, cv2.split + flatten", r_vector_split, 1),
+        ("R, extract_channel", r_vector_view, 1),
+        ("RGB, cv2.split + flatten", rgb_vectors_split, 3),
+        ("RGB, extract_channels", rgb_vectors_view, 3),
+    ]
+
+    fallos = 0
+    for width, height in SIZES:
+        image = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        print(f"{width}x{height}:")
+        for nombre, extract, n_canales in casos:
+            # Sin salida (se devuelve un arreglo nuevo) y escribiendo en una fila preasignada del corpus
+            fila = np.empty(n_canales * width * height, dtype=np.uint8)
+            pico, planos = measure_allocations(extract, image)
+            pico_fila, planos_fila = measure_allocations(extract, image, fila)
+            tiempo = best_time(extract, image, fila, repeats)
+
+            # Los resultados deben ser idénticos a los de cv2.split
+            esperado = cv2.split(image)[::-1][:n_canales]
+            if not np.array_equal(fila.reshape(n_canales, -1), np.stack([c.reshape(-1) for c in esperado])):
+                print(f"  {nombre}: resultado distinto de cv2.split [FALLA]")
+                fallos += 1
+
+            print(f"  {nombre}: pico {pico} bytes (~{planos} planos), "
+                  f"en fila preasignada {pico_fila} bytes (~{planos_fila} planos), {tiempo * 1e6:.1f} µs")
+
+    # Código de salida distinto de cero si algún resultado no coincide
+    return 1 if fallos else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
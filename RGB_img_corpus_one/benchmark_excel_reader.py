@@ -0,0 +1,56 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from excel_reader import available_engines, read_workbook, read_workbooks
+
+# Función para leer la carpeta como lo hacía el pipeline: pd.read_excel por archivo, uno tras otro
+def read_with_pandas(excel_paths):
+    return [pd.read_excel(path, header=None).to_numpy() for path in excel_paths]
+
+# Función para medir el mejor tiempo de varias repeticiones
+def best_time(function, repeats):
+    """
+    :param function: Función sin argumentos que lee todos los libros.
+    :param repeats: Número de repeticiones.
+    :return: Tupla (mejor tiempo en segundos, resultado de la última repetición).
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        resultado = function()
+        best = min(best, time.perf_counter() - start)
+    return best, resultado
+
+# Función principal del benchmark
+def main():
+    input_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), '0.2.dataImages')
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    excel_paths = [os.path.join(input_path, f) for f in sorted(os.listdir(input_path)) if f.endswith('.xlsx')]
+    if not excel_paths:
+        print(f"No se encontraron archivos Excel en la carpeta {input_path}.")
+        return 1
+
+    print(f"Carpeta: {input_path} ({len(excel_paths)} libros, {repeats} repeticiones)")
+    t_base, base = best_time(lambda: read_with_pandas(excel_paths), repeats)
+    print(f"pd.read_excel secuencial (ruta actual): {t_base * 1000:.1f} ms")
+
+    fallos = 0
+    for engine in available_engines():
+        t_seq, _ = best_time(lambda engine=engine: [read_workbook(path, False, engine) for path in excel_paths], repeats)
+        t_hilos, libros = best_time(lambda engine=engine: read_workbooks(excel_paths, False, engine), repeats)
+
+        # Los arreglos deben ser idénticos a los de la ruta actual
+        iguales = all(np.array_equal(matriz, esperado.astype(np.float64), equal_nan=True)
+                      for (_, matriz), esperado in zip(libros, base))
+        estado = "OK" if iguales else "DIFERENTE"
+        fallos += not iguales
+        print(f"{engine}: secuencial {t_seq * 1000:.1f} ms ({t_base / t_seq:.2f}x), "
+              f"hilos {t_hilos * 1000:.1f} ms ({t_base / t_hilos:.2f}x) [{estado}]")
+
+    return 1 if fallos else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
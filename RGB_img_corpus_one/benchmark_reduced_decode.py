@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+import cv2
+import numpy as np
+from corpus_vectorizer import image_to_r_vector, choose_reduction_factor
+
+# Diferencias absolutas permitidas (niveles de 0 a 255) entre la ruta reducida y la actual:
+# la media, el percentil 99 y la máxima de todos los píxeles del corpus
+MAX_MEAN_DIFFERENCE = 4.0
+MAX_P99_DIFFERENCE = 16.0
+MAX_DIFFERENCE = 32
+
+# Tamaños finales que usan los scripts del pipeline
+SIZES = [(4, 4), (8, 8), (10, 10), (100, 100)]
+
+# Función para medir el tiempo de vectorizar todo el corpus con o sin decodificación reducida
+def time_corpus(image_paths, size, reduced, repeats):
+    """
+    Mide el mejor tiempo de varias repeticiones al vectorizar todas las imágenes.
+
+    :param image_paths: Rutas de las imágenes del corpus.
+    :param size: Tamaño final (ancho, alto).
+    :param reduced: Si es True se usa la decodificación reducida.
+    :param repeats: Número de repeticiones.
+    :return: Tupla (mejor tiempo en segundos, lista de canales R).
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        channels = [image_to_r_vector(path, size, reduced)[1] for path in image_paths]
+        best = min(best, time.perf_counter() - start)
+    return best, channels
+
+# Función para comparar píxel por píxel la decodificación reducida con la completa
+def reduced_decode_differences(channels_full, channels_reduced):
+    """
+    :param channels_full: Canales R obtenidos con la decodificación completa.
+    :param channels_reduced: Canales R obtenidos con la decodificación reducida.
+    :return: Tupla (diferencia media, percentil 99, diferencia máxima).
+    """
+    diferencias = np.concatenate([np.abs(a.astype(np.int16) - b.astype(np.int16)).ravel()
+                                  for a, b in zip(channels_full, channels_reduced)])
+    return float(diferencias.mean()), float(np.percentile(diferencias, 99)), int(diferencias.max())
+
+# Función para saber si las diferencias están dentro de los límites
+def within_bounds(media, p99, maxima):
+    return media <= MAX_MEAN_DIFFERENCE and p99 <= MAX_P99_DIFFERENCE and maxima <= MAX_DIFFERENCE
+
+# Función principal del benchmark
+def main():
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'curpus')
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    image_paths = [os.path.join(corpus_path, f) for f in sorted(os.listdir(corpus_path)) if f.endswith(('.png', '.jpg', '.jpeg'))]
+    if not image_paths:
+        print(f"No se encontraron imágenes en la carpeta {corpus_path}.")
+        return 1
+
+    # Evitar que los hilos de OpenCV distorsionen la comparación
+    cv2.setNumThreads(1)
+
+    fallos = 0
+    print(f"Corpus: {corpus_path} ({len(image_paths)} imágenes, {repeats} repeticiones)")
+    for size in SIZES:
+        factores = [choose_reduction_factor(path, size) for path in image_paths]
+        t_full, full = time_corpus(image_paths, size, False, repeats)
+        t_reduced, reduced = time_corpus(image_paths, size, True, repeats)
+
+        # Diferencia por píxel respecto a la ruta actual (decodificación completa)
+        media, p99, maxima = reduced_decode_differences(full, reduced)
+
+        estado = "OK" if within_bounds(media, p99, maxima) else "FALLA"
+        fallos += estado == "FALLA"
+        print(f"{size[0]}x{size[1]}: completa {t_full * 1000:.2f} ms, reducida {t_reduced * 1000:.2f} ms, "
+              f"aceleración {t_full / t_reduced:.2f}x, factores {sorted(set(factores))}, "
+              f"diferencia media {media:.2f}, percentil 99 {p99:.1f}, máxima {maxima} [{estado}]")
+
+    # Código de salida distinto de cero si alguna diferencia supera el límite
+    return 1 if fallos else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from channel_store import ChannelVectorBuilder
+
+# Tamaños del corpus (número de imágenes) que se comparan
+CORPUS_SIZES = [1000, 10000, 100000]
+
+# Forma anterior: un DataFrame por imagen y pd.concat sobre todo lo acumulado
+def build_with_concat(images):
+    all_vectors_df = pd.DataFrame()
+    for i, image in enumerate(images):
+        vector_df = pd.DataFrame({
+            'Imagen': f"imagen_{i}.jpg",
+            'R': [image[..., 2].flatten().tolist()],
+            'G': [image[..., 1].flatten().tolist()],
+            'B': [image[..., 0].flatten().tolist()]
+        })
+        all_vectors_df = pd.concat([all_vectors_df, vector_df], ignore_index=True)
+    return all_vectors_df
+
+# Forma nueva: cada imagen se copia a la siguiente fila del arreglo preasignado
+def build_with_builder(images):
+    builder = ChannelVectorBuilder(images.shape[1:3], channels='RGB', capacity=1024)
+    for i, image in enumerate(images):
+        builder.add_image(f"imagen_{i}.jpg", image)
+    return builder
+
+# Función para medir el tiempo de construir la tabla
+def timed(build, images):
+    start = time.perf_counter()
+    result = build(images)
+    return time.perf_counter() - start, result
+
+# Función principal del benchmark
+def main():
+    # pd.concat es cuadrático: por defecto solo se mide hasta 10 000 imágenes
+    max_concat = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    rng = np.random.default_rng(0)
+
+    fallos = 0
+    anterior = None
+    for n in CORPUS_SIZES:
+        images = rng.integers(0, 256, (n, 8, 8, 3), dtype=np.uint8)
+        t_builder, builder = timed(build_with_builder, images)
+        linea = f"{n} imágenes: preasignado {t_builder:.3f} s ({t_builder / n * 1e6:.1f} µs/imagen)"
+
+        # La escala debe ser lineal: 10 veces más imágenes no debe costar mucho más de 10 veces el tiempo
+        if anterior is not None:
+            factor = t_builder / anterior[1] / (n / anterior[0])
+            linea += f", crecimiento relativo {factor:.2f}"
+        anterior = (n, t_builder)
+
+        if n <= max_concat:
+            t_concat, df = timed(build_with_concat, images)
+            linea += f"; pd.concat {t_concat:.3f} s ({t_concat / n * 1e6:.1f} µs/imagen), aceleración {t_concat / t_builder:.1f}x"
+
+            # La tabla debe ser la misma que la del bucle con pd.concat
+            nueva = builder.to_frame()
+            iguales = df['Imagen'].tolist() == nueva['Imagen'].tolist() and all(
+                df[c].tolist() == [v.tolist() for v in nueva[c]] for c in 'RGB')
+            if not iguales:
+                linea += " [FALLA: tablas distintas]"
+                fallos += 1
+        print(linea)
+
+    # Código de salida distinto de cero si alguna tabla no coincide
+    return 1 if fallos else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
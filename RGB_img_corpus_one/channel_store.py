@@ -0,0 +1,198 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from image_channels import extract_channels
+
+# Canales que se guardan, en el orden de las columnas del antiguo 0.1.all_image_vectors.xlsx
+CHANNELS = ('R', 'G', 'B')
+
+# Función para obtener la ruta .npz equivalente a un archivo Excel de vectores
+def get_channel_store_path(excel_path):
+    return os.path.splitext(excel_path)[0] + ".npz"
+
+# Función para guardar los vectores de cada canal en formato binario
+def save_channel_vectors(npz_path, image_files, channels, shape=None):
+    """
+    Guarda un arreglo uint8 (n_imágenes, largo del vector) por canal más el índice de imágenes.
+    Se lee de vuelta como bloques de NumPy, sin convertir texto.
+
+    :param npz_path: Ruta del archivo .npz.
+    :param image_files: Nombres de las imágenes, uno por fila.
+    :param channels: Diccionario {canal: arreglo 2D} con los canales a guardar.
+    :param shape: Forma (alto, ancho) de la matriz de cada imagen (opcional).
+    """
+    arrays = {}
+    for channel, vectors in channels.items():
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(image_files):
+            raise ValueError(f"El canal {channel} debe tener una fila por imagen.")
+        arrays[channel] = vectors.astype(np.uint8, copy=False)
+
+    np.savez(
+        npz_path,
+        Imagen=np.array([str(f) for f in image_files], dtype=str),
+        shape=np.array(shape if shape is not None else (), dtype=np.int64),
+        **arrays,
+    )
+
+# Función para leer los vectores de cada canal
+def load_channel_vectors(npz_path, channels=None):
+    """
+    Lee los vectores guardados con save_channel_vectors.
+
+    :param npz_path: Ruta del archivo .npz.
+    :param channels: Canales a leer (None = todos los guardados).
+    :return: Tupla (lista de imágenes, diccionario {canal: arreglo uint8 (n_imágenes, largo)}).
+    """
+    with np.load(npz_path, allow_pickle=False) as data:
+        if channels is None:
+            channels = [name for name in data.files if name not in ('Imagen', 'shape')]
+        return data['Imagen'].tolist(), {channel: data[channel] for channel in channels}
+
+# Función para leer los canales guardados como un solo bloque 4D
+def load_channel_block(npz_path, channels=None):
+    """
+    :param npz_path: Ruta del archivo .npz guardado con la forma de las matrices.
+    :param channels: Canales a leer (None = todos los guardados).
+    :return: Tupla (lista de imágenes, tupla de canales, arreglo uint8 (n_imágenes, n_canales, alto, ancho)).
+    """
+    with np.load(npz_path, allow_pickle=False) as data:
+        shape = tuple(int(d) for d in data['shape'])
+    if len(shape) != 2:
+        raise ValueError(f"{npz_path} no guarda la forma (alto, ancho) de las matrices.")
+
+    image_files, arrays = load_channel_vectors(npz_path, channels)
+    channels = tuple(arrays)
+    block = np.stack([arrays[channel] for channel in channels], axis=1) if channels else np.empty((len(image_files), 0, 0))
+    return image_files, channels, block.reshape((len(image_files), len(channels)) + shape)
+
+# Constructor de los vectores del corpus en bloques preasignados
+class ChannelVectorBuilder:
+    """
+    Acumula los canales de cada imagen escribiéndolos directamente en un arreglo uint8
+    preasignado de forma (capacidad, canales, largo). Cuando se llena, la capacidad se duplica,
+    así que agregar n imágenes cuesta O(n) en total (pd.concat por imagen cuesta O(n²)).
+    """
+
+    def __init__(self, shape, channels=CHANNELS, capacity=1024):
+        """
+        :param shape: Forma (alto, ancho) de la matriz de cada imagen.
+        :param channels: Canales a guardar, en el orden de extract_channels.
+        :param capacity: Número inicial de imágenes preasignadas (por ejemplo, len(image_files)).
+        """
+        self.shape = tuple(int(d) for d in shape)
+        self.channels = tuple(channels)
+        self.image_files = []
+        self._data = np.empty((max(1, capacity), len(self.channels), self.shape[0] * self.shape[1]), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.image_files)
+
+    def _next_row(self):
+        # Duplicar la capacidad cuando se llena (copia amortizada)
+        if len(self.image_files) == len(self._data):
+            data = np.empty((2 * len(self._data),) + self._data.shape[1:], dtype=np.uint8)
+            data[:len(self._data)] = self._data
+            self._data = data
+        return self._data[len(self.image_files)]
+
+    def add_image(self, image_file, image):
+        """
+        Agrega una imagen BGR redimensionada; sus canales se copian directamente a la siguiente fila.
+
+        :param image_file: Nombre de la imagen.
+        :param image: Imagen BGR de forma (alto, ancho, 3).
+        """
+        if image.shape[:2] != self.shape:
+            raise ValueError(f"La imagen {image_file} tiene forma {image.shape[:2]} y se esperaba {self.shape}.")
+        extract_channels(image, self.channels, out=self._next_row())
+        self.image_files.append(image_file)
+
+    def add_vectors(self, image_file, *vectors):
+        """
+        Agrega los vectores ya separados de una imagen, uno por canal.
+
+        :param image_file: Nombre de la imagen.
+        :param vectors: Un vector 1D por canal, en el orden de self.channels.
+        """
+        self._next_row()[:] = vectors
+        self.image_files.append(image_file)
+
+    def to_arrays(self):
+        """
+        :return: Diccionario {canal: arreglo uint8 (n_imágenes, largo)} con las imágenes agregadas.
+        """
+        data = self._data[:len(self.image_files)]
+        return {channel: np.ascontiguousarray(data[:, k]) for k, channel in enumerate(self.channels)}
+
+    def to_frame(self):
+        """
+        Devuelve la tabla de vectores (Imagen más una columna por canal con el vector de cada imagen),
+        la misma que armaba el bucle con pd.concat, construida una sola vez al final.
+
+        :return: DataFrame con una fila por imagen.
+        """
+        arrays = self.to_arrays()
+        columnas = {'Imagen': self.image_files}
+        columnas.update({channel: list(arrays[channel]) for channel in self.channels})
+        return pd.DataFrame(columnas)
+
+    def save(self, npz_path):
+        """
+        Guarda los vectores con save_channel_vectors.
+
+        :param npz_path: Ruta del archivo .npz.
+        """
+        save_channel_vectors(npz_path, self.image_files, self.to_arrays(), self.shape)
+
+# Función para convertir una celda con una lista en texto ("[1, 2, 3]") en un vector uint8
+def parse_vector_cell(cell):
+    """
+    Convierte el texto de una lista de enteros en un arreglo, sin evaluar código Python.
+
+    :param cell: Texto de la celda (o una lista ya convertida).
+    :return: Arreglo 1D uint8.
+    """
+    if not isinstance(cell, str):
+        return np.asarray(cell, dtype=np.uint8)
+    texto = cell.strip().strip('[]')
+    if not texto:
+        return np.empty(0, dtype=np.uint8)
+    return np.array(texto.split(','), dtype=np.int64).astype(np.uint8)
+
+# Función para convertir un 0.1.all_image_vectors.xlsx existente al formato binario
+def convert_vectors_excel(excel_path, npz_path=None):
+    """
+    Lee un Excel con una fila por imagen y una lista en texto por canal (columnas Imagen, R, G, B)
+    y lo guarda como un arreglo uint8 por canal.
+
+    :param excel_path: Ruta del archivo Excel.
+    :param npz_path: Ruta del archivo .npz (por defecto, la misma ruta con extensión .npz).
+    :return: Ruta del archivo .npz guardado.
+    """
+    if npz_path is None:
+        npz_path = get_channel_store_path(excel_path)
+
+    df = pd.read_excel(excel_path)
+    faltantes = [col for col in ('Imagen',) + CHANNELS if col not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan las columnas {', '.join(faltantes)} en {excel_path}.")
+
+    channels = {}
+    for channel in CHANNELS:
+        vectors = [parse_vector_cell(cell) for cell in df[channel]]
+        if len({len(vector) for vector in vectors}) > 1:
+            raise ValueError(f"Los vectores del canal {channel} no tienen todos el mismo largo.")
+        channels[channel] = np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.uint8)
+
+    save_channel_vectors(npz_path, df['Imagen'].tolist(), channels)
+    return npz_path
+
+# Convertir desde la línea de comandos: python channel_store.py entrada.xlsx [salida.npz]
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python channel_store.py 0.1.all_image_vectors.xlsx [salida.npz]")
+        sys.exit(1)
+    ruta = convert_vectors_excel(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Vectores guardados en: {ruta}")
@@ -0,0 +1,199 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import pandas as pd
+from incremental_corpus import file_signature
+from batch_regression import compactar_columnas
+from excel_reader import read_workbooks
+from report_writer import ReportWriter
+
+# Carpeta de la caché dentro de la carpeta raíz de la caché (por defecto, la carpeta de salida);
+# la carpeta de entrada no se modifica, puede ser de solo lectura
+CACHE_DIRNAME = ".column_cache"
+CACHE_MANIFEST = "manifest.json"
+
+# Almacenes abiertos en este proceso, uno por carpeta de entrada y carpeta de caché
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+# Almacén de las columnas de todos los libros de una carpeta
+class ColumnStore:
+    """
+    Guarda en caché (memoria y disco) las columnas numéricas de cada libro .xlsx de una carpeta.
+    Cada libro se lee una sola vez (con excel_reader); solo se vuelve a leer si cambia su tamaño
+    o su fecha de modificación. Las selecciones de columnas se sirven desde la caché.
+    """
+
+    def __init__(self, input_path, cache_root):
+        """
+        :param input_path: Carpeta con los archivos Excel (por ejemplo, 0.3.dataStadictist).
+        :param cache_root: Carpeta donde se guarda la caché; cada carpeta de entrada tiene su propia
+                           subcarpeta dentro de cache_root/.column_cache.
+        """
+        self.input_path = input_path
+        self.cache_path = get_cache_path(input_path, cache_root)
+        self.workbooks = {}
+        self._signatures = {}
+        self._load_manifest()
+
+    def _entry_path(self, excel_file):
+        return os.path.join(self.cache_path, os.path.splitext(excel_file)[0] + ".npz")
+
+    def _load_manifest(self):
+        manifest_file = os.path.join(self.cache_path, CACHE_MANIFEST)
+        if os.path.isfile(manifest_file):
+            with open(manifest_file, encoding='utf-8') as f:
+                self._signatures = json.load(f)
+
+    def _save_manifest(self):
+        with open(os.path.join(self.cache_path, CACHE_MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(self._signatures, f, indent=1)
+
+    def refresh(self, progress=None):
+        """
+        Sincroniza la caché con la carpeta: lee los libros nuevos o modificados, carga de disco
+        los que no cambiaron y olvida los eliminados.
+
+        :param progress: JobProgress opcional para informar el avance y permitir cancelar.
+        :return: Número de libros leídos de nuevo.
+        """
+        if not os.path.exists(self.cache_path):
+            os.makedirs(self.cache_path)
+
+        excel_files = sorted(f for f in os.listdir(self.input_path) if f.endswith('.xlsx') and not f.startswith('~$'))
+        if progress is not None:
+            progress.start(len(excel_files), "Leyendo libros")
+
+        pendientes = {}
+        for excel_file in excel_files:
+            signature = file_signature(os.path.join(self.input_path, excel_file))
+            al_dia = self._signatures.get(excel_file) == signature
+
+            if al_dia and excel_file not in self.workbooks and os.path.isfile(self._entry_path(excel_file)):
+                with np.load(self._entry_path(excel_file), allow_pickle=False) as data:
+                    self.workbooks[excel_file] = (data['columnas'].tolist(), data['valores'])
+            elif not al_dia or excel_file not in self.workbooks:
+                pendientes[excel_file] = signature
+                continue
+
+            if progress is not None:
+                progress.advance()
+
+        # Los libros nuevos o modificados se leen juntos en un grupo de hilos
+        libros = read_workbooks([os.path.join(self.input_path, f) for f in pendientes], header=True)
+        for (excel_file, signature), (columnas, valores) in zip(pendientes.items(), libros):
+            columnas = [str(c) for c in columnas]
+            np.savez(self._entry_path(excel_file), columnas=np.array(columnas, dtype=str), valores=valores)
+            self.workbooks[excel_file] = (columnas, valores)
+            self._signatures[excel_file] = signature
+            if progress is not None:
+                progress.advance()
+
+        # Olvidar los libros que ya no están en la carpeta
+        for excel_file in set(self.workbooks) - set(excel_files):
+            del self.workbooks[excel_file]
+        for excel_file in set(self._signatures) - set(excel_files):
+            del self._signatures[excel_file]
+            if os.path.isfile(self._entry_path(excel_file)):
+                os.remove(self._entry_path(excel_file))
+
+        self._save_manifest()
+        return len(pendientes)
+
+    def select(self, columns):
+        """
+        Devuelve varias columnas de todos los libros como una sola matriz alineada.
+        Cada serie queda al inicio de su fila (sin los valores no numéricos, como con dropna())
+        y la máscara indica cuántos datos válidos tiene; un libro sin esa columna tiene la fila vacía.
+
+        :param columns: Lista de columnas (índice entero o nombre) o una sola columna.
+        :return: Diccionario con 'archivos', 'columnas', 'Y' float64 (n_columnas, n_archivos, largo)
+                 con ceros en el relleno y 'mascara' booleana de la misma forma.
+        """
+        if not isinstance(columns, (list, tuple)):
+            columns = [columns]
+        archivos = sorted(self.workbooks)
+        largo = max((len(valores) for _, valores in self.workbooks.values()), default=0)
+
+        crudo = np.full((len(columns), len(archivos), largo), np.nan)
+        for j, excel_file in enumerate(archivos):
+            nombres, valores = self.workbooks[excel_file]
+            for i, column in enumerate(columns):
+                if isinstance(column, int):
+                    indice = column if column < len(nombres) else None
+                else:
+                    indice = nombres.index(str(column)) if str(column) in nombres else None
+                if indice is not None:
+                    crudo[i, j, :len(valores)] = valores[:, indice]
+
+        Y, mascara = compactar_columnas(crudo.reshape(-1, largo))
+        return {
+            'archivos': archivos,
+            'columnas': list(columns),
+            'Y': Y.reshape(crudo.shape),
+            'mascara': mascara.reshape(crudo.shape),
+        }
+
+# Función para obtener la carpeta de caché de una carpeta de entrada
+def get_cache_path(input_path, cache_root):
+    # El nombre sale de la ruta absoluta de la entrada: varias carpetas pueden compartir la misma raíz
+    clave = hashlib.sha1(os.path.abspath(input_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_root, CACHE_DIRNAME, clave)
+
+# Función para obtener el almacén de una carpeta (compartido entre trabajos del mismo proceso)
+def get_column_store(input_path, cache_root):
+    with _STORES_LOCK:
+        clave = (os.path.abspath(input_path), os.path.abspath(cache_root))
+        if clave not in _STORES:
+            _STORES[clave] = ColumnStore(input_path, cache_root)
+        return _STORES[clave]
+
+# Función para convertir una columna de una selección en la tabla de Resultados_Columnas.xlsx
+def selection_to_frame(seleccion, i=0):
+    """
+    Una columna por archivo (solo los que tienen datos válidos), con NaN al final de las series más cortas.
+
+    :param seleccion: Resultado de ColumnStore.select.
+    :param i: Posición de la columna dentro de la selección.
+    :return: DataFrame.
+    """
+    Y, mascara = seleccion['Y'][i], seleccion['mascara'][i]
+    validos = mascara.any(axis=1)
+    largo = int(mascara.sum(axis=1).max()) if validos.any() else 0
+    valores = np.where(mascara, Y, np.nan)[validos, :largo]
+    return pd.DataFrame(valores.T, columns=[a for a, v in zip(seleccion['archivos'], validos) if v])
+
+# Función para extraer una o varias columnas de todos los libros de una carpeta
+def process_excel_files(input_path, output_path, column, progress=None, cache_root=None):
+    """
+    Extrae las columnas elegidas de todos los archivos Excel de la carpeta y guarda
+    Resultados_Columnas.xlsx (una columna por archivo). Si se piden varias columnas, la primera
+    va en la primera hoja (la que leen los scripts siguientes) y cada una de las demás en otra hoja.
+    Los libros se leen una sola vez y se guardan en caché para las siguientes extracciones.
+
+    :param input_path: Carpeta con los archivos Excel.
+    :param output_path: Carpeta de salida.
+    :param column: Índice o nombre de la columna, o una lista de ellos.
+    :param progress: JobProgress opcional para informar el avance y permitir cancelar.
+    :param cache_root: Carpeta de la caché de libros (None = la carpeta de salida).
+    :return: Resultado de ColumnStore.select.
+    """
+    if not os.path.exists(output_path):
+        os.makedirs(output_path)
+
+    store = get_column_store(input_path, cache_root or output_path)
+    store.refresh(progress)
+    seleccion = store.select(column)
+
+    # Guardar los resultados en un solo libro (nombres de hoja únicos de máximo 31 caracteres)
+    with ReportWriter(os.path.join(output_path, 'Resultados_Columnas.xlsx')) as reporte:
+        for i, columna in enumerate(seleccion['columnas']):
+            reporte.add_sheet_async('Sheet1' if i == 0 else columna, selection_to_frame, seleccion, i)
+    return seleccion
+
+# Función para convertir el texto del campo de columnas en una lista ("Media, 3" -> ['Media', 3])
+def parse_column_input(column_input):
+    columns = [c.strip() for c in column_input.split(',') if c.strip()]
+    return [int(c) if c.isdigit() else c for c in columns]
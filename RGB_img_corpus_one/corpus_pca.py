@@ -0,0 +1,172 @@
+import os
+import sys
+import argparse
+import numpy as np
+from corpus_vectorizer import image_to_corpus_vector
+from vector_store import open_corpus_matrix
+
+# Función para fijar el signo de cada componente (el de su coordenada de mayor valor absoluto es positivo)
+def _fix_signs(componentes):
+    columnas = np.argmax(np.abs(componentes), axis=1)
+    signos = np.sign(componentes[np.arange(len(componentes)), columnas])
+    signos[signos == 0] = 1.0
+    return componentes * signos[:, None]
+
+# Función para ajustar un PCA incremental sobre la matriz del corpus, por mini-lotes
+def fit_incremental_pca(matrix, n_components=128, batch_size=None, vector_shape=None):
+    """
+    Ajusta el PCA leyendo batch_size filas a la vez: en cada lote se combina la base actual
+    (componentes escaladas por sus valores singulares) con el lote centrado y una fila de
+    corrección por el cambio de media, y se hace la SVD de esa matriz pequeña.
+    Así la matriz del corpus (por ejemplo 100x100x3 = 30 000 columnas) nunca se carga completa.
+
+    :param matrix: Arreglo 2D (n, d) del corpus, puede estar mapeado en memoria.
+    :param n_components: Número de componentes (dimensión de los embeddings).
+    :param batch_size: Filas por lote (None = 4 veces n_components); debe ser >= n_components.
+    :param vector_shape: Forma de la matriz de cada imagen, se guarda para vectorizar imágenes nuevas.
+    :return: Diccionario con media, componentes, valores singulares, varianza explicada,
+             varianza total, n y forma del vector.
+    """
+    n_total, d = matrix.shape
+    n_components = min(n_components, d, n_total)
+    batch_size = max(batch_size or 4 * n_components, n_components)
+
+    media = np.zeros(d)
+    componentes = np.empty((0, d))
+    singulares = np.empty(0)
+    n = 0
+    m2_total = 0.0
+
+    for start in range(0, n_total, batch_size):
+        lote = np.asarray(matrix[start:start + batch_size], dtype=np.float64)
+        b = len(lote)
+        media_lote = lote.mean(axis=0)
+        centrado = lote - media_lote
+        n_nuevo = n + b
+
+        # Suma de cuadrados total para la proporción de varianza explicada
+        diferencia = media - media_lote
+        m2_total += float((centrado * centrado).sum()) + n * b / n_nuevo * float(diferencia @ diferencia)
+
+        if n == 0:
+            apilada = centrado
+        else:
+            correccion = np.sqrt(n * b / n_nuevo) * diferencia
+            apilada = np.vstack([singulares[:, None] * componentes, centrado, correccion])
+
+        _, s, vt = np.linalg.svd(apilada, full_matrices=False)
+        componentes = _fix_signs(vt[:n_components])
+        singulares = s[:n_components]
+        media = media + (media_lote - media) * (b / n_nuevo)
+        n = n_nuevo
+
+    return {
+        'media': media,
+        'componentes': componentes,
+        'valores_singulares': singulares,
+        'varianza_explicada': singulares ** 2 / max(n - 1, 1),
+        'varianza_total': np.array(m2_total / max(n - 1, 1)),
+        'n': np.array(n),
+        'vector_shape': np.array(vector_shape if vector_shape is not None else (), dtype=np.int64),
+    }
+
+# Función para proyectar vectores en los componentes del PCA
+def transform_pca(pca, vectors, batch_size=1024):
+    """
+    :param pca: Diccionario de fit_incremental_pca o load_pca.
+    :param vectors: Arreglo 2D (n, d) o 1D (d,) de vectores uint8.
+    :param batch_size: Filas que se convierten a float a la vez.
+    :return: Embeddings float32 (n, n_componentes).
+    """
+    vectors = np.atleast_2d(vectors)
+    componentes = pca['componentes']
+    embeddings = np.empty((len(vectors), len(componentes)), dtype=np.float32)
+    for start in range(0, len(vectors), batch_size):
+        lote = np.asarray(vectors[start:start + batch_size], dtype=np.float64) - pca['media']
+        embeddings[start:start + len(lote)] = lote @ componentes.T
+    return embeddings
+
+# Función para reconstruir vectores a partir de sus embeddings
+def inverse_transform_pca(pca, embeddings):
+    """
+    :param pca: Diccionario del PCA.
+    :param embeddings: Arreglo 2D (n, n_componentes).
+    :return: Vectores reconstruidos float64 (n, d), sin redondear ni recortar a 0-255.
+    """
+    return np.asarray(embeddings, dtype=np.float64) @ pca['componentes'] + pca['media']
+
+# Función para medir lo que se pierde al reducir la dimensión
+def reconstruction_error(pca, matrix, batch_size=1024):
+    """
+    Proyecta y reconstruye cada vector del corpus y mide el error por imagen.
+
+    :param pca: Diccionario del PCA.
+    :param matrix: Arreglo 2D (n, d) del corpus.
+    :param batch_size: Filas por lote.
+    :return: Tupla (RMSE por imagen en niveles de 0 a 255, proporción de varianza explicada por los componentes).
+    """
+    rmse = np.empty(len(matrix))
+    for start in range(0, len(matrix), batch_size):
+        lote = np.asarray(matrix[start:start + batch_size], dtype=np.float64)
+        reconstruido = inverse_transform_pca(pca, transform_pca(pca, lote))
+        rmse[start:start + len(lote)] = np.sqrt(((lote - reconstruido) ** 2).mean(axis=1))
+
+    total = float(pca['varianza_total'])
+    proporcion = float(pca['varianza_explicada'].sum() / total) if total > 0 else 1.0
+    return rmse, proporcion
+
+# Función para guardar el PCA
+def save_pca(npz_path, pca):
+    np.savez(npz_path, **pca)
+
+# Función para leer el PCA
+def load_pca(npz_path):
+    with np.load(npz_path) as data:
+        return {clave: data[clave] for clave in data.files}
+
+# Función para calcular el embedding de imágenes nuevas
+def embed_images(pca, image_paths):
+    """
+    Vectoriza las imágenes con el mismo tamaño y canal que el corpus y las proyecta.
+
+    :param pca: Diccionario del PCA (debe incluir vector_shape).
+    :param image_paths: Rutas de las imágenes.
+    :return: Embeddings float32 (n_imágenes, n_componentes).
+    """
+    vector_shape = tuple(int(d) for d in pca['vector_shape'])
+    if not vector_shape:
+        raise ValueError("El PCA no guarda la forma de los vectores del corpus.")
+    return transform_pca(pca, np.stack([image_to_corpus_vector(path, vector_shape) for path in image_paths]))
+
+# Función principal: ajustar el PCA del corpus, guardar los embeddings y reportar el error de reconstrucción
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reduce los vectores del corpus con un PCA incremental.")
+    parser.add_argument('input_path', help="Matriz .npy del corpus (con su manifiesto) o carpeta del almacén de vectores.")
+    parser.add_argument('output_npz', help="Archivo .npz donde se guarda el PCA.")
+    parser.add_argument('--components', type=int, default=128, help="Dimensión de los embeddings (por defecto 128).")
+    parser.add_argument('--batch', type=int, default=None, help="Filas por mini-lote (por defecto 4 x componentes).")
+    parser.add_argument('--images', nargs='*', default=[], help="Imágenes nuevas a proyectar con el PCA ajustado.")
+    args = parser.parse_args(argv)
+
+    matrix, image_files, vector_shape = open_corpus_matrix(args.input_path)
+    pca = fit_incremental_pca(matrix, args.components, args.batch, vector_shape)
+    save_pca(args.output_npz, pca)
+
+    # Embeddings float32 del corpus, junto al PCA
+    embeddings_path = os.path.splitext(args.output_npz)[0] + "_embeddings.npz"
+    np.savez(embeddings_path, nombres=np.array(image_files, dtype=str), embeddings=transform_pca(pca, matrix))
+
+    rmse, proporcion = reconstruction_error(pca, matrix)
+    print(f"PCA: {matrix.shape[1]} -> {len(pca['componentes'])} dimensiones con {len(image_files)} imágenes.")
+    print(f"Varianza explicada: {proporcion:.2%}")
+    print(f"Error de reconstrucción (RMSE, niveles 0-255): medio {rmse.mean():.2f}, máximo {rmse.max():.2f}"
+          f" ({image_files[int(np.argmax(rmse))]})")
+    print(f"PCA guardado en: {args.output_npz}; embeddings en: {embeddings_path}")
+
+    if args.images:
+        for image_path, embedding in zip(args.images, embed_images(pca, args.images)):
+            print(f"{image_path}: {np.array2string(embedding[:8], precision=2)}...")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+# Columnas de estadísticas, en el mismo orden que calculate_statistics
+STATISTICS_COLUMNS = [
+    'Suma', 'Media', 'Mediana', 'Moda', 'Varianza', 'Desviación Estándar',
+    'Rango', 'Mínimo', 'Máximo', 'Cuartil 1', 'Cuartil 2', 'Cuartil 3',
+]
+
+# Número de niveles posibles de un canal uint8
+LEVELS = 256
+
+# Función para validar y convertir los datos a uint8
+def as_uint8(values):
+    """
+    Convierte los valores a uint8 verificando que sean enteros entre 0 y 255.
+
+    :param values: Arreglo de valores de píxeles.
+    :return: Arreglo uint8 (sin copia si ya lo era).
+    """
+    values = np.asarray(values)
+    if values.dtype == np.uint8:
+        return values
+
+    if values.size and (not np.all(np.isfinite(values)) or values.min() < 0 or values.max() > 255
+                        or np.any(values != np.round(values))):
+        raise ValueError("Los valores deben ser enteros entre 0 y 255 para usar histogramas de 256 niveles.")
+    return values.astype(np.uint8)
+
+# Función para construir el histograma de 256 niveles de cada fila
+def row_histograms(rows):
+    """
+    Cuenta cuántas veces aparece cada nivel (0-255) en cada fila con un solo np.bincount.
+
+    :param rows: Arreglo 2D (n_filas, n_columnas) de valores uint8.
+    :return: Arreglo int64 de forma (n_filas, 256).
+    """
+    rows = as_uint8(rows)
+    n_rows = rows.shape[0]
+    # Desplazar cada fila a su propio rango de 256 niveles
+    offsets = np.arange(n_rows, dtype=np.int64)[:, None] * LEVELS
+    flat = (rows.astype(np.int64) + offsets).ravel()
+    return np.bincount(flat, minlength=n_rows * LEVELS).reshape(n_rows, LEVELS)
+
+# Función para obtener el valor que ocupa una posición (rango) en datos ordenados
+def _value_at_rank(cumulative, rank):
+    # El valor buscado es el primer nivel cuyo conteo acumulado supera el rango
+    return (cumulative <= rank[:, None]).sum(axis=1)
+
+# Función para calcular un cuantil exacto a partir del histograma acumulado
+def histogram_quantile(cumulative, n, q):
+    """
+    Calcula el cuantil q con interpolación lineal (la misma que usa pandas) sin ordenar.
+
+    :param cumulative: Histograma acumulado de forma (n_filas, 256).
+    :param n: Número de valores por fila.
+    :param q: Cuantil entre 0 y 1.
+    :return: Arreglo float64 con el cuantil de cada fila.
+    """
+    position = q * (n - 1)
+    lower = int(np.floor(position))
+    upper = int(np.ceil(position))
+    fraction = position - lower
+
+    ranks = np.full(cumulative.shape[0], lower, dtype=np.int64)
+    v_lower = _value_at_rank(cumulative, ranks).astype(np.float64)
+    ranks[:] = upper
+    v_upper = _value_at_rank(cumulative, ranks).astype(np.float64)
+
+    # Interpolación lineal con la misma fórmula que numpy para obtener resultados idénticos
+    diff = v_upper - v_lower
+    if fraction >= 0.5:
+        return v_upper - diff * (1 - fraction)
+    return v_lower + diff * fraction
+
+# Función para obtener el mínimo y el máximo de cada fila a partir de su histograma
+def histogram_min_max(counts):
+    # Primer y último nivel con conteo distinto de cero
+    presentes = counts > 0
+    return presentes.argmax(axis=1), LEVELS - 1 - presentes[:, ::-1].argmax(axis=1)
+
+# Función para obtener la moda de cada fila a partir de su histograma
+def histogram_mode(counts):
+    # argmax devuelve el menor nivel en caso de empate, igual que df.mode(axis=1)[0] y scipy.stats.mode
+    return counts.argmax(axis=1)
+
+# Función para calcular las estadísticas de orden de cada fila con un solo histograma acumulado
+def order_statistics(counts):
+    """
+    Obtiene mediana, moda, cuartiles, mínimo, máximo y rango de cada fila a partir de su
+    histograma de 256 niveles, en O(n + 256) y sin ordenar los datos.
+
+    :param counts: Histogramas de forma (n_filas, 256), por ejemplo de row_histograms.
+    :return: Diccionario {nombre de la estadística: arreglo con un valor por fila}.
+    """
+    n = counts[0].sum() if counts.shape[0] else 0
+    cumulative = np.cumsum(counts, axis=1)
+    minimo, maximo = histogram_min_max(counts)
+    mediana = histogram_quantile(cumulative, n, 0.5)
+
+    return {
+        'Mediana': mediana,
+        'Moda': histogram_mode(counts),
+        'Rango': maximo - minimo,
+        'Mínimo': minimo,
+        'Máximo': maximo,
+        'Cuartil 1': histogram_quantile(cumulative, n, 0.25),
+        'Cuartil 2': mediana.copy(),
+        'Cuartil 3': histogram_quantile(cumulative, n, 0.75),
+    }
+
+# Función para calcular la varianza de cada fila con el mismo redondeo que df.var(axis=1)
+def row_variance(rows, media, ddof=1):
+    """
+    Usa el algoritmo de dos pasadas de pandas: los cuadrados de (media - x) se suman columna
+    por columna, de izquierda a derecha, en el mismo orden que pandas, así que el resultado es
+    idéntico bit a bit (con la suma de cuadrados del histograma difiere en los últimos dígitos).
+
+    :param rows: Arreglo 2D (n_filas, n_columnas).
+    :param media: Media de cada fila.
+    :param ddof: Grados de libertad que se restan (1 = varianza muestral, como pandas).
+    :return: Arreglo float64 con la varianza de cada fila (NaN si n_columnas - ddof <= 0).
+    """
+    n = rows.shape[1]
+    if n - ddof <= 0:
+        return np.full(rows.shape[0], np.nan)
+
+    acumulado = np.zeros(rows.shape[0])
+    for j in range(n):
+        desviacion = media - rows[:, j]
+        acumulado += desviacion * desviacion
+    return acumulado / (n - ddof)
+
+# Función para calcular las doce estadísticas de cada fila en una sola pasada
+def calculate_row_statistics(rows):
+    """
+    Calcula las doce estadísticas de calculate_statistics para cada fila de una matriz uint8,
+    usando un histograma de 256 niveles por fila en lugar de ordenar los datos.
+    Los resultados son idénticos a los de las funciones de pandas.
+
+    :param rows: Arreglo 2D (n_filas, n_columnas) con valores entre 0 y 255.
+    :return: Diccionario {nombre de la estadística: arreglo con un valor por fila}.
+    """
+    rows = as_uint8(rows)
+    counts = row_histograms(rows)
+    levels = np.arange(LEVELS, dtype=np.int64)
+
+    # Suma exacta en enteros
+    suma = counts @ levels
+    media = suma / rows.shape[1]
+    varianza = row_variance(rows, media)
+
+    resultados = {
+        'Suma': suma,
+        'Media': media,
+        'Varianza': varianza,
+        'Desviación Estándar': np.sqrt(varianza),
+    }
+    resultados.update(order_statistics(counts))
+    return {columna: resultados[columna] for columna in STATISTICS_COLUMNS}
+
+# Función para calcular estadísticas de un DataFrame
+def calculate_statistics(df):
+    """
+    Calcula varias estadísticas para cada fila de un DataFrame. Si todos los valores son
+    píxeles (enteros entre 0 y 255) se usa un histograma por fila; si no, las funciones de pandas.
+
+    :param df: DataFrame con los datos de entrada.
+    :return: Un DataFrame con las estadísticas calculadas.
+    """
+    if df.shape[1] > 0:
+        try:
+            rows = as_uint8(df.to_numpy())
+        except (TypeError, ValueError):
+            rows = None
+        if rows is not None:
+            return pd.DataFrame(calculate_row_statistics(rows), index=df.index)
+
+    resultados = {
+        'Suma': df.sum(axis=1),
+        'Media': df.mean(axis=1),
+        'Mediana': df.median(axis=1),
+        'Moda': df.mode(axis=1)[0],
+        'Varianza': df.var(axis=1),
+        'Desviación Estándar': df.std(axis=1),
+        'Rango': df.max(axis=1) - df.min(axis=1),
+        'Mínimo': df.min(axis=1),
+        'Máximo': df.max(axis=1),
+        'Cuartil 1': df.quantile(0.25, axis=1),
+        'Cuartil 2': df.quantile(0.5, axis=1),
+        'Cuartil 3': df.quantile(0.75, axis=1),
+    }
+    return pd.DataFrame(resultados)
+
+# Función para calcular las estadísticas de todas las filas de todas las imágenes
+def calculate_corpus_statistics(image_files, stack):
+    """
+    Calcula las doce estadísticas de cada fila de cada imagen sobre un arreglo 3D apilado,
+    en una sola pasada, y devuelve una tabla ordenada (una fila por imagen y fila de la matriz).
+
+    :param image_files: Nombres de las imágenes, uno por matriz del arreglo.
+    :param stack: Arreglo 3D (n_imágenes, filas, columnas) con valores entre 0 y 255.
+    :return: DataFrame con las columnas Imagen, Fila y las doce estadísticas.
+    """
+    stack = np.asarray(stack)
+    n_images, n_rows = stack.shape[0], stack.shape[1]
+
+    # Unir todas las filas de todas las imágenes en una sola matriz 2D
+    resultados = calculate_row_statistics(stack.reshape(n_images * n_rows, -1))
+
+    tabla = pd.DataFrame({
+        'Imagen': np.repeat(np.asarray(image_files, dtype=object), n_rows),
+        'Fila': np.tile(np.arange(n_rows), n_images),
+    })
+    for columna in STATISTICS_COLUMNS:
+        tabla[columna] = resultados[columna]
+
+    return tabla
@@ -0,0 +1,334 @@
+import os
+import cv2
+from functools import partial
+from multiprocessing import Pool
+from vector_store import create_corpus_memmap, save_corpus_manifest
+from image_channels import extract_channel, extract_channels
+
+# Banderas de OpenCV para decodificar un JPEG a 1/2, 1/4 o 1/8 de su resolución (escalado DCT)
+REDUCED_COLOR_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# Marcadores SOF de JPEG que contienen las dimensiones de la imagen
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# Función para leer el ancho y el alto de un JPEG desde su encabezado, sin decodificarlo
+def read_jpeg_dimensions(image_path):
+    """
+    Lee las dimensiones de un archivo JPEG recorriendo sus marcadores hasta el segmento SOF.
+
+    :param image_path: La ruta completa de la imagen.
+    :return: Tupla (ancho, alto) o None si el archivo no es un JPEG válido.
+    """
+    with open(image_path, 'rb') as f:
+        if f.read(2) != b'\xff\xd8':
+            return None
+
+        while True:
+            byte = f.read(1)
+            # Saltar bytes de relleno hasta el siguiente marcador
+            while byte and byte != b'\xff':
+                byte = f.read(1)
+            while byte == b'\xff':
+                byte = f.read(1)
+            if not byte:
+                return None
+
+            marker = byte[0]
+            # Marcadores sin segmento de datos (RSTn, TEM)
+            if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+                continue
+            # Fin de imagen o inicio de datos sin haber encontrado SOF
+            if marker in (0xD9, 0xDA):
+                return None
+
+            length_bytes = f.read(2)
+            if len(length_bytes) < 2:
+                return None
+            length = int.from_bytes(length_bytes, 'big')
+
+            if marker in _JPEG_SOF_MARKERS:
+                data = f.read(5)
+                if len(data) < 5:
+                    return None
+                height = int.from_bytes(data[1:3], 'big')
+                width = int.from_bytes(data[3:5], 'big')
+                return width, height
+
+            f.seek(length - 2, 1)
+
+# Resolución mínima de la imagen reducida respecto al tamaño final. Con márgenes menores cv2.resize
+# toma muestras de píxeles ya promediados por el escalado DCT y la diferencia con la decodificación
+# completa llega a más de 100 niveles en algunos píxeles (ver test_reduced_decode.py)
+REDUCTION_MARGIN = 16
+
+# Función para elegir el mayor factor de reducción que conserva suficiente resolución
+def choose_reduction_factor(image_path, size, margin=REDUCTION_MARGIN):
+    """
+    Elige el factor de decodificación reducida (1, 2, 4 u 8) para un tamaño final dado.
+    La imagen reducida debe conservar al menos margin veces el tamaño final en ambos ejes;
+    se usa el lado menor para no depender de la orientación EXIF.
+
+    :param image_path: La ruta completa de la imagen.
+    :param size: Tamaño final (ancho, alto).
+    :param margin: Resolución mínima de la imagen reducida respecto al tamaño final.
+    :return: Factor de reducción (1 si no se puede reducir o la imagen no es JPEG).
+    """
+    # Se revisa el contenido y no la extensión: hay PNG guardados como .jpeg en el corpus
+    dimensions = read_jpeg_dimensions(image_path)
+    if dimensions is None:
+        return 1
+
+    lado_menor = min(dimensions)
+    objetivo = margin * max(size)
+    for factor in (8, 4, 2):
+        if lado_menor // factor >= objetivo:
+            return factor
+    return 1
+
+# Función para leer una imagen a la menor resolución que permita el tamaño final
+def read_image_for_size(image_path, size, reduced=True):
+    """
+    Lee una imagen a color; si es un JPEG mucho más grande que el tamaño final,
+    la decodifica directamente a 1/2, 1/4 o 1/8 de su resolución.
+
+    :param image_path: La ruta completa de la imagen.
+    :param size: Tamaño final (ancho, alto) al que se redimensionará la imagen.
+    :param reduced: Si es False se decodifica siempre a resolución completa.
+    :return: Imagen BGR o None si no se pudo leer.
+    """
+    factor = _decode_factor(image_path, size, reduced)
+    return cv2.imread(image_path, REDUCED_COLOR_FLAGS.get(factor, cv2.IMREAD_COLOR))
+
+# Función para obtener el factor con el que read_image_for_size decodificará una imagen
+def _decode_factor(image_path, size, reduced):
+    try:
+        return choose_reduction_factor(image_path, size) if reduced else 1
+    except OSError:
+        return 1
+
+# Función para obtener la forma de la matriz que devuelve cv2.resize para un tamaño dado
+def resized_shape(size):
+    # cv2.resize recibe el tamaño como (ancho, alto) y devuelve una matriz (alto, ancho)
+    return (size[1], size[0])
+
+# Función para convertir una imagen en el vector del canal R (Rojo)
+def image_to_r_vector(image_path, size=(4, 4), reduced=True):
+    """
+    Convierte una imagen en un vector 1D del canal R.
+
+    :param image_path: La ruta completa de la imagen.
+    :param size: Tamaño al que se redimensionará la imagen, por defecto 4x4.
+    :param reduced: Si es True, los JPEG grandes se decodifican a resolución reducida.
+    :return: Un vector 1D del canal R y el canal R en 2D.
+    """
+    # Leer la imagen en formato RGB (a resolución reducida cuando el tamaño final lo permite)
+    image = read_image_for_size(image_path, size, reduced)
+    if image is None:
+        raise ValueError(f"No se pudo leer la imagen en {image_path}")
+
+    # Redimensionar la imagen a un tamaño fijo
+    image_resized = cv2.resize(image, size)
+
+    # Copiar solo el canal R (OpenCV usa BGR por defecto) en lugar de separar los tres con cv2.split
+    r_channel = extract_channel(image_resized, 'R')
+
+    # Vector 1D del canal R: vista sobre el mismo arreglo, sin otra copia
+    r_vector = r_channel.reshape(-1)
+
+    return r_vector, r_channel
+
+# Función para convertir una imagen en el vector de sus tres canales (B, G, R)
+def image_to_color_vector(image_path, size=(100, 100), reduced=True):
+    """
+    Convierte una imagen en un vector 1D con sus tres canales intercalados (B, G, R).
+
+    :param image_path: La ruta completa de la imagen.
+    :param size: Tamaño al que se redimensionará la imagen.
+    :param reduced: Si es True, los JPEG grandes se decodifican a resolución reducida.
+    :return: Un vector 1D de la imagen y la imagen redimensionada.
+    """
+    image = read_image_for_size(image_path, size, reduced)
+    if image is None:
+        raise ValueError(f"No se pudo leer la imagen en {image_path}")
+
+    image_resized = cv2.resize(image, size)
+    return image_resized.reshape(-1), image_resized
+
+# Función para convertir una imagen en un bloque con varios canales, decodificándola una sola vez
+def image_to_channel_block(image_path, size=(4, 4), channels=('R',), reduced=True):
+    """
+    Decodifica y redimensiona la imagen una vez y obtiene de ella todos los canales pedidos
+    (R, G, B, Gray, H, S, V, Lab_L, Lab_a, Lab_b).
+
+    :param image_path: La ruta completa de la imagen.
+    :param size: Tamaño al que se redimensionará la imagen.
+    :param channels: Canales en el orden del bloque.
+    :param reduced: Si es True, los JPEG grandes se decodifican a resolución reducida.
+    :return: Un vector 1D del bloque y el bloque uint8 (n_canales, alto, ancho).
+    """
+    image = read_image_for_size(image_path, size, reduced)
+    if image is None:
+        raise ValueError(f"No se pudo leer la imagen en {image_path}")
+
+    image_resized = cv2.resize(image, size)
+    height, width = image_resized.shape[:2]
+    block = extract_channels(image_resized, channels)
+    block = block.reshape(block.shape[0], height, width)
+    return block.reshape(-1), block
+
+# Función para vectorizar una imagen con los mismos parámetros que una matriz del corpus
+def image_to_corpus_vector(image_path, vector_shape):
+    """
+    Elige el tamaño y el canal (R o BGR) a partir de la forma de las matrices del corpus.
+
+    :param image_path: La ruta completa de la imagen.
+    :param vector_shape: Forma de la matriz de cada imagen: (alto, ancho) para R o (alto, ancho, 3) para BGR.
+    :return: Vector 1D uint8.
+    """
+    size = (vector_shape[1], vector_shape[0])
+    if len(vector_shape) == 3:
+        return image_to_color_vector(image_path, size)[0]
+    return image_to_r_vector(image_path, size)[0]
+
+# Función que inicializa cada proceso del pool
+def _init_worker():
+    # Cada proceso ya es un núcleo: evitar que OpenCV abra sus propios hilos
+    cv2.setNumThreads(1)
+
+# Función que ejecuta un proceso del pool para una sola imagen
+def _vectorize_task(task):
+    """
+    Vectoriza una imagen sin propagar excepciones, para que un archivo dañado
+    no detenga el lote completo.
+
+    :param task: Tupla (función de vectorización, ruta de la imagen, tamaño, decodificación reducida).
+    :return: Tupla (vector, matriz, mensaje de error o None).
+    """
+    to_vector, image_path, size, reduced = task
+    try:
+        vector, matrix = to_vector(image_path, size, reduced=reduced)
+        return vector, matrix, None
+    except Exception as e:
+        return None, None, str(e)
+
+# Función para ejecutar las tareas de vectorización en un pool de procesos, en orden
+def _run_tasks(tasks, workers, chunksize):
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Con un solo proceso (o pocas imágenes) no vale la pena levantar el pool
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield _vectorize_task(task)
+        return
+
+    with Pool(processes=min(workers, len(tasks)), initializer=_init_worker) as pool:
+        # imap conserva el orden de entrada aunque los procesos terminen desordenados
+        yield from pool.imap(_vectorize_task, tasks, chunksize=max(1, chunksize))
+
+# Función para vectorizar un corpus de imágenes en paralelo con cualquier función de vectorización
+def _iter_vectors(to_vector, channel, corpus_path, image_files, size, workers, chunksize, cache=None, reduced=True):
+    size = tuple(size)
+    paths = [os.path.join(corpus_path, image_file) for image_file in image_files]
+
+    # Consultar primero la caché: solo las imágenes sin entrada se envían al pool. La clave lleva el factor
+    # de decodificación, así una entrada reducida nunca se entrega a quien pidió la decodificación completa
+    if cache is not None:
+        keys = [cache.make_key(path, size, channel, decode_factor=_decode_factor(path, size, reduced)) for path in paths]
+    else:
+        keys = [None] * len(paths)
+    hits = [cache is not None and cache.contains(key) for key in keys]
+    results = _run_tasks([(to_vector, path, size, reduced) for path, hit in zip(paths, hits) if not hit], workers, chunksize)
+
+    for image_file, path, key, hit in zip(image_files, paths, keys, hits):
+        matrix = cache.get(key) if hit else None
+        if matrix is not None:
+            yield image_file, matrix.reshape(-1), matrix, None
+            continue
+
+        # Si la entrada se desalojó mientras tanto, la imagen se vectoriza aquí mismo
+        vector, matrix, error = next(results) if not hit else _vectorize_task((to_vector, path, size, reduced))
+        if error is None and cache is not None:
+            cache.put(key, matrix)
+        yield image_file, vector, matrix, error
+
+# Función para vectorizar el canal R de un corpus de imágenes en paralelo
+def iter_r_vectors(corpus_path, image_files, size, workers=None, chunksize=16, cache=None, reduced=True):
+    """
+    Decodifica, redimensiona y separa el canal R de cada imagen usando un pool de procesos.
+    Los resultados se entregan en el mismo orden que image_files.
+
+    :param corpus_path: Ruta del directorio donde están las imágenes.
+    :param image_files: Lista de nombres de archivos de imagen a procesar.
+    :param size: Tamaño al que se redimensionarán las imágenes.
+    :param workers: Número de procesos (None = todos los núcleos, 1 = secuencial sin pool).
+    :param chunksize: Número de imágenes que se envían juntas a cada proceso.
+    :param cache: VectorCache opcional; las imágenes sin cambios se leen de la caché sin decodificar.
+    :param reduced: Si es True, los JPEG grandes se decodifican a resolución reducida; si es False, completa.
+    :return: Generador de tuplas (archivo, vector R, canal R, mensaje de error o None).
+    """
+    return _iter_vectors(image_to_r_vector, 'R', corpus_path, image_files, size, workers, chunksize, cache, reduced)
+
+# Función para vectorizar los tres canales de un corpus de imágenes en paralelo
+def iter_color_vectors(corpus_path, image_files, size, workers=None, chunksize=16, cache=None, reduced=True):
+    """
+    Igual que iter_r_vectors, pero conserva los tres canales (B, G, R) de cada imagen.
+
+    :return: Generador de tuplas (archivo, vector BGR, imagen redimensionada, mensaje de error o None).
+    """
+    return _iter_vectors(image_to_color_vector, 'BGR', corpus_path, image_files, size, workers, chunksize, cache, reduced)
+
+# Función para vectorizar varios canales de un corpus de imágenes en paralelo
+def iter_channel_blocks(corpus_path, image_files, size, channels, workers=None, chunksize=16, cache=None, reduced=True):
+    """
+    Igual que iter_r_vectors, pero cada imagen se decodifica una sola vez y de ella salen
+    todos los canales pedidos.
+
+    :param channels: Canales en el orden del bloque, por ejemplo ('R', 'G', 'B', 'Gray').
+    :return: Generador de tuplas (archivo, vector del bloque, bloque (n_canales, alto, ancho), mensaje de error o None).
+    """
+    channels = tuple(channels)
+    to_block = partial(image_to_channel_block, channels=channels)
+    return _iter_vectors(to_block, ','.join(channels), corpus_path, image_files, size, workers, chunksize, cache, reduced)
+
+# Función para escribir los vectores de un corpus directamente en una matriz mapeada en memoria
+def build_corpus_memmap(corpus_path, image_files, matrix_path, size, color=False, workers=None, chunksize=16, cache=None,
+                        reduced=True):
+    """
+    Vectoriza el corpus escribiendo cada vector en una fila de una matriz np.memmap uint8
+    preasignada de forma (n_imágenes, alto*ancho[*3]), sin construir diccionarios ni DataFrames.
+
+    :param corpus_path: Ruta del directorio donde están las imágenes.
+    :param image_files: Lista de nombres de archivos de imagen a procesar.
+    :param matrix_path: Ruta del archivo .npy de la matriz.
+    :param size: Tamaño al que se redimensionarán las imágenes.
+    :param color: Si es True se guardan los tres canales; si no, solo el canal R.
+    :param workers: Número de procesos (None = todos los núcleos, 1 = secuencial).
+    :param chunksize: Número de imágenes que se envían juntas a cada proceso.
+    :param cache: VectorCache opcional con los vectores de ejecuciones anteriores.
+    :param reduced: Si es False, las imágenes se decodifican siempre a resolución completa.
+    :return: Lista de tuplas (archivo, error) con las imágenes que no se pudieron procesar.
+    """
+    # Forma de la matriz de cada imagen (la de cv2.resize, más los tres canales si es a color)
+    vector_shape = resized_shape(size) + ((3,) if color else ())
+    matrix = create_corpus_memmap(matrix_path, len(image_files), vector_shape)
+
+    iter_vectors = iter_color_vectors if color else iter_r_vectors
+    names, errores = [], []
+    for image_file, vector, _, error in iter_vectors(corpus_path, image_files, size, workers, chunksize, cache, reduced):
+        if error is not None:
+            print(f"Error procesando {image_file}: {error}")
+            errores.append((image_file, error))
+            continue
+
+        # Las imágenes válidas ocupan las primeras filas, en orden
+        matrix[len(names)] = vector
+        names.append(image_file)
+
+    matrix.flush()
+    save_corpus_manifest(matrix_path, names, vector_shape)
+    return errores
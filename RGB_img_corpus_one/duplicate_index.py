@@ -0,0 +1,289 @@
+import os
+import sys
+import hashlib
+import argparse
+from collections import Counter
+import cv2
+import numpy as np
+import pandas as pd
+from corpus_vectorizer import iter_r_vectors
+from vector_store import iter_r_matrices
+from report_writer import ReportWriter
+
+# Número de bits en 1 de cada byte, para contar diferencias entre hashes sin desempacarlos
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Extensiones de imagen aceptadas (las mismas que get_image_files)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Función para reducir las matrices de un bloque al tamaño del hash
+def _reduce_matrices(matrices, shape):
+    """
+    Redimensiona cada matriz a (alto, ancho) = shape con cv2.INTER_AREA.
+    Si las matrices ya son de ese tamaño o más pequeñas (por ejemplo, los vectores 4x4 u 8x8),
+    se usan tal cual.
+
+    :param matrices: Arreglo 3D (n, alto, ancho).
+    :param shape: Forma (alto, ancho) del hash.
+    :return: Arreglo 3D float32.
+    """
+    matrices = np.asarray(matrices)
+    if matrices.shape[1] <= shape[0] or matrices.shape[2] <= shape[1]:
+        return matrices.astype(np.float32)
+    return np.stack([cv2.resize(m.astype(np.float32), (shape[1], shape[0]), interpolation=cv2.INTER_AREA)
+                     for m in matrices])
+
+# Función para calcular el hash promedio (aHash) de un bloque de matrices
+def average_hash(matrices, hash_size=8):
+    """
+    Un bit por píxel: 1 si el píxel es mayor que la media de su imagen.
+
+    :param matrices: Arreglo 3D (n, alto, ancho) con el canal de cada imagen.
+    :param hash_size: Lado de la matriz reducida (8 da hashes de 64 bits).
+    :return: Arreglo uint8 (n, bytes) con los bits empaquetados.
+    """
+    reduced = _reduce_matrices(matrices, (hash_size, hash_size))
+    bits = reduced > reduced.mean(axis=(1, 2), keepdims=True)
+    return np.packbits(bits.reshape(len(bits), -1), axis=1)
+
+# Función para calcular el hash de diferencias (dHash) de un bloque de matrices
+def difference_hash(matrices, hash_size=8):
+    """
+    Un bit por par de píxeles vecinos en cada fila: 1 si el de la derecha es más claro.
+    Es más robusto que aHash ante cambios de brillo y contraste.
+
+    :param matrices: Arreglo 3D (n, alto, ancho) con el canal de cada imagen.
+    :param hash_size: Número de comparaciones por fila (8 da hashes de 64 bits).
+    :return: Arreglo uint8 (n, bytes) con los bits empaquetados.
+    """
+    reduced = _reduce_matrices(matrices, (hash_size, hash_size + 1))
+    bits = reduced[:, :, 1:] > reduced[:, :, :-1]
+    return np.packbits(bits.reshape(len(bits), -1), axis=1)
+
+# Función para calcular la distancia de Hamming entre hashes empaquetados
+def hamming_distance(a, b):
+    """
+    :param a: Arreglo uint8 (..., bytes).
+    :param b: Arreglo uint8 (..., bytes), compatible con a por broadcasting.
+    :return: Número de bits distintos.
+    """
+    return _POPCOUNT[np.bitwise_xor(a, b)].sum(axis=-1, dtype=np.int64)
+
+# Función para calcular la huella del contenido de un archivo
+def file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Función para unir pares de imágenes en grupos (union-find)
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def _union(parent, i, j):
+    ri, rj = _find(parent, i), _find(parent, j)
+    if ri != rj:
+        # El representante de cada grupo es la imagen con el índice menor
+        parent[max(ri, rj)] = min(ri, rj)
+
+# Función para encontrar pares de hashes cercanos sin comparar todos contra todos
+def near_duplicate_pairs(hashes, max_distance=4, bands=None):
+    """
+    Divide los bits de cada hash en bandas y solo compara las imágenes que coinciden
+    exactamente en alguna banda (LSH por bandas). Con bandas = max_distance + 1, dos hashes
+    a distancia <= max_distance siempre comparten al menos una banda, así que no se pierde ningún par.
+
+    :param hashes: Arreglo uint8 (n, bytes) de average_hash o difference_hash.
+    :param max_distance: Distancia de Hamming máxima para considerar dos imágenes casi iguales.
+    :param bands: Número de bandas (None = max_distance + 1).
+    :return: Lista de tuplas (i, j, distancia) con i < j.
+    """
+    n = len(hashes)
+    if n < 2:
+        return []
+    bits = np.unpackbits(hashes, axis=1)
+    bands = min(bands or max_distance + 1, bits.shape[1])
+
+    pares, distancias = [], []
+    for banda in np.array_split(np.arange(bits.shape[1]), bands):
+        # Clave entera de la banda y orden estable: las imágenes de una misma cubeta quedan contiguas
+        pesos = np.left_shift(np.uint64(1), np.arange(len(banda))[::-1].astype(np.uint64))
+        claves = (bits[:, banda].astype(np.uint64) * pesos).sum(axis=1, dtype=np.uint64)
+        orden = np.argsort(claves, kind='stable')
+        ordenadas = claves[orden]
+
+        # Pares de cada cubeta comparando con el vecino a distancia k en el orden;
+        # cuando ningún vecino a distancia k comparte clave, ninguna cubeta tiene más de k imágenes
+        k = 1
+        while k < n:
+            iguales = ordenadas[k:] == ordenadas[:-k]
+            if not iguales.any():
+                break
+            i, j = orden[:-k][iguales], orden[k:][iguales]
+            d = hamming_distance(hashes[i], hashes[j])
+            cercanos = d <= max_distance
+            pares.append(np.sort(np.stack([i[cercanos], j[cercanos]], axis=1), axis=1))
+            distancias.append(d[cercanos])
+            k += 1
+
+    if not pares:
+        return []
+
+    # Un mismo par puede aparecer en varias bandas
+    pares, unicos = np.unique(np.concatenate(pares), axis=0, return_index=True)
+    distancias = np.concatenate(distancias)[unicos]
+    return [(int(i), int(j), int(d)) for (i, j), d in zip(pares, distancias)]
+
+# Función para agrupar las imágenes duplicadas y casi duplicadas de un corpus
+def find_duplicates(image_files, matrices, max_distance=4, hash_kind='dhash', hash_size=8, file_paths=None):
+    """
+    Agrupa las imágenes en tres pasos, ninguno cuadrático:
+    1) archivos idénticos (misma huella SHA-1 de sus bytes), si se dan las rutas;
+    2) vectores idénticos (np.unique sobre las filas);
+    3) casi duplicados por hash perceptual y LSH por bandas.
+
+    :param image_files: Nombres de las imágenes.
+    :param matrices: Arreglo 3D (n, alto, ancho) con el canal R de cada imagen.
+    :param max_distance: Distancia de Hamming máxima entre hashes de casi duplicados.
+    :param hash_kind: 'dhash' o 'ahash'.
+    :param hash_size: Lado del hash (8 = 64 bits).
+    :param file_paths: Rutas de los archivos de imagen (opcional, para los duplicados exactos de archivo).
+    :return: DataFrame con Imagen, Grupo, Representante, Tipo y Distancia (bits) al representante.
+    """
+    matrices = np.asarray(matrices)
+    n = len(image_files)
+    parent = list(range(n))
+    tipo = ['Única'] * n
+
+    # 1) Archivos con el mismo contenido
+    if file_paths is not None:
+        por_huella = {}
+        for i, path in enumerate(file_paths):
+            primero = por_huella.setdefault(file_digest(path), i)
+            if primero != i:
+                _union(parent, primero, i)
+                tipo[i] = 'Archivo idéntico'
+
+    # 2) Vectores idénticos
+    vectores = matrices.reshape(n, -1)
+    _, inverso = np.unique(vectores, axis=0, return_inverse=True)
+    primero_por_vector = {}
+    for i, clave in enumerate(np.asarray(inverso).ravel()):
+        primero = primero_por_vector.setdefault(clave, i)
+        if primero != i:
+            _union(parent, primero, i)
+            if tipo[i] == 'Única':
+                tipo[i] = 'Vector idéntico'
+
+    # 3) Casi duplicados por hash perceptual; las bandas se arman sobre los hashes distintos,
+    #    así un hash repetido muchas veces no llena una cubeta con pares redundantes
+    hashes = (difference_hash if hash_kind == 'dhash' else average_hash)(matrices, hash_size)
+    distintos, primeros, inverso = np.unique(hashes, axis=0, return_index=True, return_inverse=True)
+    inverso = np.asarray(inverso).ravel()
+    for i, clave in enumerate(inverso):
+        if primeros[clave] != i:
+            _union(parent, primeros[clave], i)
+            if tipo[i] == 'Única':
+                tipo[i] = 'Casi duplicado'
+    for a, b, _ in near_duplicate_pairs(distintos, max_distance):
+        i, j = sorted((int(primeros[a]), int(primeros[b])))
+        _union(parent, i, j)
+        if tipo[j] == 'Única':
+            tipo[j] = 'Casi duplicado'
+
+    raices = [_find(parent, i) for i in range(n)]
+    tamanos = Counter(raices)
+    numeros = {raiz: k for k, raiz in enumerate(dict.fromkeys(raices))}
+    for i, raiz in enumerate(raices):
+        if raiz == i:
+            tipo[i] = 'Única' if tamanos[i] == 1 else 'Representante'
+
+    return pd.DataFrame({
+        'Imagen': list(image_files),
+        'Grupo': [numeros[raiz] for raiz in raices],
+        'Representante': [image_files[raiz] for raiz in raices],
+        'Tipo': tipo,
+        'Distancia': [int(d) for d in hamming_distance(hashes, hashes[raices])] if n else [],
+    })
+
+# Función para exportar un vector por grupo (los vectores únicos del corpus)
+def export_unique_vectors(image_files, matrices, grupos, excel_path):
+    """
+    Guarda el vector de cada representante como una columna (mismo formato que vectores_unicos.xlsx)
+    y la tabla de grupos en una segunda hoja.
+
+    :param image_files: Nombres de las imágenes.
+    :param matrices: Arreglo 3D (n, alto, ancho) con el canal R de cada imagen.
+    :param grupos: DataFrame de find_duplicates.
+    :param excel_path: Ruta del archivo Excel de salida.
+    :return: Número de vectores únicos.
+    """
+    matrices = np.asarray(matrices)
+    representantes = [i for i, (imagen, rep) in enumerate(zip(grupos['Imagen'], grupos['Representante'])) if imagen == rep]
+    unicos = pd.DataFrame(matrices.reshape(len(matrices), -1)[representantes].T,
+                          columns=[image_files[i] for i in representantes])
+
+    with ReportWriter(excel_path) as reporte:
+        reporte.add_sheet('Vectores únicos', unicos)
+        reporte.add_sheet('Grupos', grupos)
+    return len(representantes)
+
+# Función para cargar las matrices R de un corpus (carpeta de imágenes, almacén, matriz .npy o carpeta de Excel)
+def load_r_matrices(input_path, size=(8, 8), workers=None):
+    """
+    :param input_path: Carpeta de imágenes o salida de los scripts 0.0-0.4.
+    :param size: Tamaño (ancho, alto) al que se vectorizan las imágenes si input_path es una carpeta de imágenes.
+    :param workers: Número de procesos para vectorizar.
+    :return: Tupla (nombres, matrices 3D, rutas de los archivos o None).
+    """
+    if os.path.isdir(input_path):
+        image_files = sorted(f for f in os.listdir(input_path) if f.endswith(IMAGE_EXTENSIONS))
+        if image_files:
+            nombres, matrices = [], []
+            for image_file, _, r_channel, error in iter_r_vectors(input_path, image_files, size, workers):
+                if error is not None:
+                    print(f"Error procesando {image_file}: {error}")
+                    continue
+                nombres.append(image_file)
+                matrices.append(r_channel)
+            rutas = [os.path.join(input_path, f) for f in nombres]
+            return nombres, np.stack(matrices) if matrices else np.empty((0, size[1], size[0]), np.uint8), rutas
+
+    nombres, bloques = [], []
+    for image_files, stack in iter_r_matrices(input_path):
+        nombres.extend(image_files)
+        bloques.append(np.asarray(stack))
+    if len({b.shape[1:] for b in bloques}) > 1:
+        raise ValueError("Las matrices del corpus no tienen todas la misma forma.")
+    return nombres, np.concatenate(bloques) if bloques else np.empty((0,) + tuple(size[::-1]), np.uint8), None
+
+# Función principal: buscar duplicados y exportar los vectores únicos
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca imágenes duplicadas y casi duplicadas y exporta los vectores únicos.")
+    parser.add_argument('input_path', help="Carpeta de imágenes, almacén de vectores, matriz .npy o carpeta de archivos *_RGB_Vector.xlsx.")
+    parser.add_argument('output_excel', help="Archivo Excel de salida (por ejemplo, vectores_unicos.xlsx).")
+    parser.add_argument('--size', type=int, nargs=2, default=(8, 8), metavar=('ANCHO', 'ALTO'),
+                        help="Tamaño de los vectores si se vectoriza una carpeta de imágenes (por defecto 8 8).")
+    parser.add_argument('--distance', type=int, default=4, help="Distancia de Hamming máxima para casi duplicados (por defecto 4).")
+    parser.add_argument('--hash', choices=['dhash', 'ahash'], default='dhash', help="Hash perceptual (por defecto dhash).")
+    parser.add_argument('--workers', type=int, default=None, help="Número de procesos para vectorizar.")
+    args = parser.parse_args(argv)
+
+    nombres, matrices, rutas = load_r_matrices(args.input_path, tuple(args.size), args.workers)
+    if not nombres:
+        print(f"No se encontraron imágenes en {args.input_path}.")
+        return 1
+
+    grupos = find_duplicates(nombres, matrices, args.distance, args.hash, file_paths=rutas)
+    unicos = export_unique_vectors(nombres, matrices, grupos, args.output_excel)
+
+    print(grupos[grupos['Tipo'] != 'Única'].to_string(index=False))
+    print(f"{len(nombres)} imágenes, {unicos} vectores únicos. Guardado en: {args.output_excel}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
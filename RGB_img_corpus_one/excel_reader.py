@@ -0,0 +1,170 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from openpyxl import load_workbook
+
+# Lector tipo calamine (opcional): analiza el .xlsx en código nativo y libera el GIL
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+# Función para saber si una celda está vacía (openpyxl devuelve None y calamine una cadena vacía)
+def _is_empty(value):
+    return value is None or (isinstance(value, str) and value == '')
+
+# Función para convertir una celda en número, igual que pd.to_numeric(errors='coerce')
+def _to_float(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return np.nan
+
+# Función para convertir filas de celdas en un arreglo numérico
+def numeric_block(rows, n_columns):
+    """
+    Convierte una lista de filas (tuplas de celdas) en un arreglo float64; los textos no numéricos,
+    las fechas y las celdas vacías quedan como NaN. Si todas las celdas son números se convierte
+    de una sola vez con NumPy; si no, celda por celda.
+
+    :param rows: Lista de filas.
+    :param n_columns: Número de columnas del arreglo (las filas más cortas se rellenan con NaN).
+    :return: Arreglo float64 de forma (filas, n_columns).
+    """
+    if all(len(row) == n_columns for row in rows):
+        try:
+            return np.array(rows, dtype=np.float64).reshape(len(rows), n_columns)
+        except (TypeError, ValueError):
+            pass
+
+    bloque = np.full((len(rows), n_columns), np.nan)
+    for i, row in enumerate(rows):
+        for j, value in enumerate(row[:n_columns]):
+            bloque[i, j] = _to_float(value)
+    return bloque
+
+# Función para obtener los nombres de columna a partir de la fila de encabezado, como pandas
+def _header_names(header):
+    nombres, vistos = [], {}
+    for j, value in enumerate(header):
+        nombre = f"Unnamed: {j}" if _is_empty(value) else value
+        # Los nombres repetidos se numeran: a, a.1, a.2...
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}.{vistos[nombre]}"
+        vistos.setdefault(nombre, 0)
+        nombres.append(nombre)
+    return nombres
+
+# Función para recortar las filas y columnas vacías del final de la hoja
+def _trim_rows(rows):
+    rows = [tuple(row) for row in rows]
+    while rows and all(_is_empty(value) for value in rows[-1]):
+        rows.pop()
+    n_columns = max((len(row) for row in rows), default=0)
+    while n_columns and all(len(row) < n_columns or _is_empty(row[n_columns - 1]) for row in rows):
+        n_columns -= 1
+    return rows, n_columns
+
+# Función para armar el resultado de un lector a partir de las filas de la hoja
+def _rows_to_arrays(rows, header):
+    rows, n_columns = _trim_rows(rows)
+    if header:
+        encabezado = list(rows[0][:n_columns]) if rows else []
+        encabezado += [None] * (n_columns - len(encabezado))
+        return _header_names(encabezado), numeric_block(rows[1:], n_columns)
+    return list(range(n_columns)), numeric_block(rows, n_columns)
+
+# Lector con pandas (la ruta de siempre, se usa como referencia)
+def _read_pandas(excel_path, header):
+    df = pd.read_excel(excel_path, header=0 if header else None)
+    values = df.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    return list(df.columns), values.reshape(len(df), len(df.columns))
+
+# Lector con openpyxl en modo de solo lectura (recorre las filas del XML sin crear las celdas)
+def _read_openpyxl(excel_path, header):
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = list(workbook.worksheets[0].iter_rows(values_only=True))
+    finally:
+        workbook.close()
+    return _rows_to_arrays(rows, header)
+
+# Lector con calamine (si está instalado python-calamine)
+def _read_calamine(excel_path, header):
+    workbook = CalamineWorkbook.from_path(excel_path)
+    rows = workbook.get_sheet_by_index(0).to_python(skip_empty_area=False)
+    return _rows_to_arrays(rows, header)
+
+# Lectores disponibles, del más rápido al más lento
+READERS = {
+    'calamine': _read_calamine,
+    'openpyxl': _read_openpyxl,
+    'pandas': _read_pandas,
+}
+
+# Función para listar los lectores que se pueden usar en este entorno
+def available_engines():
+    return [engine for engine in READERS if engine != 'calamine' or CalamineWorkbook is not None]
+
+# Función para elegir el lector por defecto (calamine si está instalado, si no openpyxl en solo lectura)
+def default_engine():
+    return available_engines()[0]
+
+# Función para leer la primera hoja de un libro de Excel como arreglo numérico
+def read_workbook(excel_path, header=True, engine=None):
+    """
+    Lee la primera hoja de un libro y la devuelve directamente como arreglo NumPy,
+    con el mismo resultado que pd.read_excel seguido de pd.to_numeric(errors='coerce').
+
+    :param excel_path: Ruta del archivo Excel.
+    :param header: Si es True, la primera fila son los nombres de columna (como header=0 en pandas);
+                   si es False, las columnas se numeran 0, 1, 2... (como header=None).
+    :param engine: 'calamine', 'openpyxl' o 'pandas' (None = default_engine()).
+    :return: Tupla (lista de nombres de columna, arreglo float64 (filas, columnas)).
+    """
+    engine = engine or default_engine()
+    if engine not in available_engines():
+        raise ValueError(f"Lector de Excel no disponible: {engine}. Disponibles: {', '.join(available_engines())}.")
+    return READERS[engine](excel_path, header)
+
+# Función para leer varios libros a la vez con un grupo de hilos
+def read_workbooks(excel_paths, header=True, engine=None, workers=None, progress=None):
+    """
+    Lee varios libros con read_workbook en un grupo de hilos. La lectura del disco, la
+    descompresión del .xlsx y el lector calamine liberan el GIL, así que se solapan entre libros;
+    el análisis del XML con openpyxl no, por eso con un solo núcleo se lee en secuencia.
+
+    :param excel_paths: Rutas de los archivos Excel.
+    :param header: Igual que en read_workbook.
+    :param engine: Igual que en read_workbook.
+    :param workers: Número de hilos (None = todos los núcleos, 1 = secuencial sin hilos).
+    :param progress: JobProgress opcional para informar el avance y permitir cancelar.
+    :return: Lista de tuplas (nombres de columna, arreglo float64), en el orden de excel_paths.
+    """
+    excel_paths = list(excel_paths)
+    if progress is not None:
+        progress.start(len(excel_paths), "Leyendo libros")
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    resultados = []
+    if workers <= 1 or len(excel_paths) <= 1:
+        for excel_path in excel_paths:
+            resultados.append(read_workbook(excel_path, header, engine))
+            if progress is not None:
+                progress.advance()
+        return resultados
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(excel_paths))) as executor:
+        for resultado in executor.map(lambda excel_path: read_workbook(excel_path, header, engine), excel_paths):
+            resultados.append(resultado)
+            if progress is not None:
+                progress.advance()
+    return resultados
@@ -0,0 +1,125 @@
+import cv2
+import numpy as np
+
+# Posición de cada canal en las imágenes de OpenCV (BGR)
+CHANNEL_INDEX = {'B': 0, 'G': 1, 'R': 2}
+
+# Canales derivados: conversión de color de OpenCV y posición del canal en la imagen convertida
+# (todos quedan en uint8: en HSV, H va de 0 a 179; en Lab, L, a y b van de 0 a 255)
+DERIVED_CHANNELS = {
+    'Gray': (cv2.COLOR_BGR2GRAY, None),
+    'H': (cv2.COLOR_BGR2HSV, 0),
+    'S': (cv2.COLOR_BGR2HSV, 1),
+    'V': (cv2.COLOR_BGR2HSV, 2),
+    'Lab_L': (cv2.COLOR_BGR2Lab, 0),
+    'Lab_a': (cv2.COLOR_BGR2Lab, 1),
+    'Lab_b': (cv2.COLOR_BGR2Lab, 2),
+}
+
+# Grupos de canales que se pueden pedir por su nombre
+CHANNEL_GROUPS = {
+    'RGB': ('R', 'G', 'B'),
+    'BGR': ('B', 'G', 'R'),
+    'HSV': ('H', 'S', 'V'),
+    'Lab': ('Lab_L', 'Lab_a', 'Lab_b'),
+}
+
+# Función para convertir una lista de canales en texto ("R,G,Gray,HSV") en una tupla de canales
+def parse_channels(spec):
+    """
+    Expande los grupos (RGB, BGR, HSV, Lab) y quita los canales repetidos, conservando el orden.
+
+    :param spec: Texto separado por comas o lista de nombres de canal o de grupo.
+    :return: Tupla de canales.
+    """
+    nombres = [c.strip() for c in spec.split(',')] if isinstance(spec, str) else list(spec)
+    canales = []
+    for nombre in nombres:
+        if not nombre:
+            continue
+        for canal in CHANNEL_GROUPS.get(nombre, (nombre,)):
+            if canal not in CHANNEL_INDEX and canal not in DERIVED_CHANNELS:
+                opciones = list(CHANNEL_INDEX) + list(DERIVED_CHANNELS) + list(CHANNEL_GROUPS)
+                raise ValueError(f"Canal desconocido: {canal}. Opciones: {', '.join(opciones)}.")
+            if canal not in canales:
+                canales.append(canal)
+    return tuple(canales)
+
+# Función para obtener un canal de la imagen sin copiar datos
+def channel_view(image, channel='R'):
+    """
+    Devuelve el canal como una vista con saltos sobre la imagen BGR (image[..., 2] para R).
+    A diferencia de cv2.split, no crea ningún plano nuevo.
+
+    :param image: Imagen BGR de forma (alto, ancho, 3).
+    :param channel: 'B', 'G' o 'R'.
+    :return: Vista 2D (alto, ancho) del canal.
+    """
+    return image[..., CHANNEL_INDEX[channel]]
+
+# Función para comprobar que un arreglo de salida se puede escribir sin copias intermedias
+def _check_output(out, size, dtype):
+    if out.dtype != dtype or out.size != size:
+        raise ValueError(f"La salida debe tener {size} elementos de tipo {dtype}.")
+    # reshape de un arreglo no contiguo devuelve una copia y la escritura se perdería
+    if not out.flags.c_contiguous:
+        raise ValueError("La salida debe ser un arreglo contiguo (por ejemplo, una fila de la matriz del corpus).")
+
+# Función para copiar un canal a un vector contiguo
+def extract_channel(image, channel='R', out=None):
+    """
+    Copia un canal de la imagen a un arreglo contiguo con una sola copia.
+    Si se da out (por ejemplo, una fila preasignada de la matriz del corpus), el canal
+    se escribe ahí directamente y no se reserva memoria nueva.
+
+    :param image: Imagen BGR de forma (alto, ancho, 3).
+    :param channel: 'B', 'G' o 'R'.
+    :param out: Arreglo 1D contiguo opcional de alto*ancho elementos.
+    :return: El canal en 2D (alto, ancho); su reshape(-1) es el vector sin copiar.
+    """
+    view = channel_view(image, channel)
+    if out is None:
+        return np.ascontiguousarray(view)
+
+    _check_output(out, view.size, image.dtype)
+    plane = out.reshape(view.shape)
+    np.copyto(plane, view)
+    return plane
+
+# Función para copiar varios canales a una matriz contigua (un canal por fila)
+def extract_channels(image, channels='RGB', out=None):
+    """
+    Separa los canales de la imagen en una matriz (n_canales, alto*ancho) con una sola reserva,
+    en lugar de los tres planos de cv2.split más una copia por cada flatten().
+    Los canales derivados (Gray, H, S, V, Lab_L, Lab_a, Lab_b) salen de la misma imagen
+    decodificada; cada conversión de color se hace una sola vez aunque se pidan varios de sus canales.
+
+    :param image: Imagen BGR de forma (alto, ancho, 3).
+    :param channels: Canales en el orden de las filas de salida, por ejemplo ('R', 'Gray', 'H'); un texto
+                     se interpreta con parse_channels ('RGB', 'Lab', 'Gray' o 'R,G,Gray').
+    :param out: Arreglo contiguo opcional de n_canales*alto*ancho elementos donde escribir.
+    :return: Matriz (n_canales, alto*ancho); cada fila es el vector de un canal.
+    """
+    # Un texto se interpreta como nombres de canal o de grupo, no carácter por carácter
+    if isinstance(channels, str):
+        channels = parse_channels(channels)
+
+    height, width = image.shape[:2]
+    if out is None:
+        out = np.empty((len(channels), height * width), dtype=image.dtype)
+    else:
+        _check_output(out, len(channels) * height * width, image.dtype)
+        out = out.reshape(len(channels), height * width)
+
+    planes = out.reshape(len(channels), height, width)
+    convertidas = {}
+    for plane, channel in zip(planes, channels):
+        if channel in CHANNEL_INDEX:
+            np.copyto(plane, channel_view(image, channel))
+            continue
+
+        code, index = DERIVED_CHANNELS[channel]
+        if code not in convertidas:
+            convertidas[code] = cv2.cvtColor(image, code)
+        np.copyto(plane, convertidas[code] if index is None else convertidas[code][..., index])
+    return out
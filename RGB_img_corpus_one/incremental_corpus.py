@@ -0,0 +1,133 @@
+import os
+import json
+import numpy as np
+from corpus_statistics import LEVELS
+from streaming_statistics import ChannelAccumulator, merge_accumulators
+
+# Archivos del modo incremental dentro de la carpeta de salida
+MANIFEST_NAME = "incremental_manifest.json"
+PARTIALS_NAME = "incremental_partials.npz"
+
+# Función para obtener la firma de un archivo (tamaño y fecha de modificación)
+def file_signature(image_path):
+    """
+    Devuelve la firma de un archivo usada para detectar cambios entre ejecuciones.
+
+    :param image_path: Ruta completa del archivo.
+    :return: Diccionario con el tamaño en bytes y la fecha de modificación en nanosegundos.
+    """
+    stat = os.stat(image_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+# Función para leer el manifiesto de archivos procesados
+def load_incremental_manifest(output_path):
+    """
+    Lee el manifiesto de la ejecución anterior.
+
+    :param output_path: Carpeta de salida del vectorizador.
+    :return: Diccionario {"params": parámetros, "images": {archivo: firma}} (vacío si no existe).
+    """
+    manifest_file = os.path.join(output_path, MANIFEST_NAME)
+    if not os.path.isfile(manifest_file):
+        return {"params": None, "images": {}}
+    with open(manifest_file, encoding="utf-8") as f:
+        return json.load(f)
+
+# Función para guardar el manifiesto de archivos procesados
+def save_incremental_manifest(output_path, manifest):
+    """
+    Guarda el manifiesto de archivos procesados.
+
+    :param output_path: Carpeta de salida del vectorizador.
+    :param manifest: Diccionario {"params": parámetros, "images": {archivo: firma}}.
+    """
+    with open(os.path.join(output_path, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1)
+
+# Función para separar el corpus en imágenes nuevas o modificadas, eliminadas y sin cambios
+def plan_incremental_run(corpus_path, image_files, manifest, params):
+    """
+    Compara el directorio actual con el manifiesto anterior.
+    Si los parámetros cambiaron (por ejemplo, el tamaño), todas las imágenes se consideran pendientes.
+
+    :param corpus_path: Ruta del directorio donde están las imágenes.
+    :param image_files: Lista de nombres de archivos de imagen actuales.
+    :param manifest: Manifiesto de la ejecución anterior.
+    :param params: Parámetros de la ejecución actual (deben ser serializables en JSON).
+    :return: Tupla (pendientes, eliminadas, sin_cambios, firmas actuales).
+    """
+    anteriores = manifest["images"] if manifest.get("params") == params else {}
+
+    firmas, pendientes, sin_cambios = {}, [], []
+    for image_file in image_files:
+        firmas[image_file] = file_signature(os.path.join(corpus_path, image_file))
+        if anteriores.get(image_file) == firmas[image_file]:
+            sin_cambios.append(image_file)
+        else:
+            pendientes.append(image_file)
+
+    eliminadas = [image_file for image_file in manifest["images"] if image_file not in firmas]
+    return pendientes, eliminadas, sin_cambios, firmas
+
+# Función para leer los acumuladores parciales de cada imagen
+def load_partials(output_path):
+    """
+    Lee los acumuladores parciales (uno por imagen) guardados en la ejecución anterior.
+
+    :param output_path: Carpeta de salida del vectorizador.
+    :return: Diccionario {archivo: ChannelAccumulator}.
+    """
+    partials_file = os.path.join(output_path, PARTIALS_NAME)
+    if not os.path.isfile(partials_file):
+        return {}
+
+    data = np.load(partials_file, allow_pickle=False)
+    partials = {}
+    for i, image_file in enumerate(data["names"]):
+        accumulator = ChannelAccumulator()
+        accumulator.count = int(data["count"][i])
+        accumulator.total = int(data["total"][i])
+        accumulator.mean = float(data["mean"][i])
+        accumulator.m2 = float(data["m2"][i])
+        accumulator.minimum = int(data["minimum"][i])
+        accumulator.maximum = int(data["maximum"][i])
+        accumulator.histogram = data["histogram"][i].astype(np.int64)
+        partials[str(image_file)] = accumulator
+    return partials
+
+# Función para guardar los acumuladores parciales de cada imagen
+def save_partials(output_path, partials):
+    """
+    Guarda los acumuladores parciales en un solo archivo .npz con un arreglo por campo.
+
+    :param output_path: Carpeta de salida del vectorizador.
+    :param partials: Diccionario {archivo: ChannelAccumulator}.
+    """
+    names = list(partials)
+    accumulators = [partials[name] for name in names]
+    np.savez(
+        os.path.join(output_path, PARTIALS_NAME),
+        names=np.array(names, dtype=str),
+        count=np.array([a.count for a in accumulators], dtype=np.int64),
+        total=np.array([a.total for a in accumulators], dtype=np.int64),
+        mean=np.array([a.mean for a in accumulators], dtype=np.float64),
+        m2=np.array([a.m2 for a in accumulators], dtype=np.float64),
+        minimum=np.array([a.minimum for a in accumulators], dtype=np.int64),
+        maximum=np.array([a.maximum for a in accumulators], dtype=np.int64),
+        histogram=np.array([a.histogram for a in accumulators], dtype=np.int64).reshape(len(names), LEVELS),
+    )
+
+# Función para calcular el resumen del corpus a partir de los acumuladores parciales
+def summarize_partials(image_files, partials):
+    """
+    Devuelve el resumen de cada imagen y el del corpus completo, combinando los parciales
+    sin volver a leer ningún vector.
+
+    :param image_files: Nombres de las imágenes en el orden del reporte.
+    :param partials: Diccionario {archivo: ChannelAccumulator}.
+    :return: Lista de diccionarios (una fila por imagen más la fila "Corpus").
+    """
+    filas = [dict(Imagen=image_file, **partials[image_file].summary()) for image_file in image_files]
+    corpus = merge_accumulators(partials[image_file] for image_file in image_files)
+    filas.append(dict(Imagen="Corpus", **corpus.summary()))
+    return filas
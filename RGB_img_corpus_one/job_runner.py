@@ -0,0 +1,279 @@
+import time
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+# Excepción que se lanza dentro de un trabajo cuando el usuario lo cancela
+class JobCancelled(Exception):
+    pass
+
+# Avance de un trabajo, compartido entre el hilo de trabajo y la interfaz
+class JobProgress:
+    """
+    Lleva la cuenta de los elementos procesados de un trabajo y envía el avance
+    (hechos, total, velocidad y tiempo restante) a la cola de eventos de la interfaz.
+    Las funciones de trabajo lo reciben en el parámetro progress y llaman a start() y advance().
+    """
+
+    def __init__(self, job_id, name, events, cancel_event, min_interval=0.1):
+        self.job_id = job_id
+        self.name = name
+        self.stage = ""
+        self.total = None
+        self.done = 0
+        self._events = events
+        self._cancel_event = cancel_event
+        self._min_interval = min_interval
+        self._start = time.perf_counter()
+        self._last_emit = 0.0
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check(self):
+        """
+        Lanza JobCancelled si el usuario pidió cancelar el trabajo.
+        """
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def start(self, total, stage=""):
+        """
+        Inicia una etapa del trabajo.
+
+        :param total: Número de elementos de la etapa (None si no se conoce).
+        :param stage: Nombre de la etapa que se muestra en la interfaz.
+        """
+        self.check()
+        self.total = total
+        self.stage = stage
+        self.done = 0
+        self._start = time.perf_counter()
+        self._emit(force=True)
+
+    def advance(self, n=1):
+        """
+        Suma n elementos procesados y revisa si se pidió cancelar.
+
+        :param n: Número de elementos terminados.
+        """
+        self.check()
+        self.done += n
+        self._emit(force=self.total is not None and self.done >= self.total)
+
+    def snapshot(self):
+        """
+        Devuelve el estado actual del trabajo.
+
+        :return: Diccionario con nombre, etapa, hechos, total, velocidad (elementos/s) y ETA (s).
+        """
+        elapsed = time.perf_counter() - self._start
+        throughput = self.done / elapsed if elapsed > 0 and self.done else 0.0
+        eta = None
+        if throughput and self.total is not None:
+            eta = max(self.total - self.done, 0) / throughput
+        return {
+            "job_id": self.job_id, "name": self.name, "stage": self.stage,
+            "done": self.done, "total": self.total, "throughput": throughput, "eta": eta,
+        }
+
+    def _emit(self, force=False):
+        # Limitar los mensajes para no saturar la interfaz
+        now = time.perf_counter()
+        if force or now - self._last_emit >= self._min_interval:
+            self._last_emit = now
+            self._events.put(("progress", self.snapshot()))
+
+# Ejecutor de trabajos en segundo plano para las interfaces de tkinter
+class JobRunner:
+    """
+    Ejecuta los trabajos uno tras otro en un hilo de trabajo, para que la ventana no se congele.
+    Los trabajos se pueden encolar (por ejemplo, varios corpus seguidos) y cancelar.
+    Toda la comunicación con la interfaz pasa por una cola que se revisa con root.after,
+    así que los callbacks siempre se ejecutan en el hilo de tkinter.
+    """
+
+    def __init__(self, root, on_progress=None, on_finish=None, poll_ms=100):
+        """
+        :param root: Ventana principal de tkinter.
+        :param on_progress: Función que recibe el diccionario de JobProgress.snapshot().
+        :param on_finish: Función que recibe (estado, nombre, resultado o mensaje de error);
+                          el estado es 'ok', 'error' o 'cancelado'.
+        :param poll_ms: Cada cuántos milisegundos se revisa la cola de eventos.
+        """
+        self.root = root
+        self.on_progress = on_progress
+        self.on_finish = on_finish
+        self.poll_ms = poll_ms
+        self.pending = 0
+
+        self._jobs = queue.Queue()
+        self._events = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._next_id = 0
+
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    def submit(self, name, func, *args, on_success=None, **kwargs):
+        """
+        Encola un trabajo. La función debe aceptar el parámetro progress (JobProgress).
+
+        :param name: Nombre del trabajo que se muestra en la interfaz.
+        :param func: Función a ejecutar en el hilo de trabajo (no debe usar tkinter).
+        :param on_success: Función opcional que recibe el resultado, en el hilo de tkinter.
+        :return: Identificador del trabajo.
+        """
+        self._next_id += 1
+        self.pending += 1
+        self._jobs.put((self._next_id, name, func, args, kwargs, on_success))
+        return self._next_id
+
+    def cancel(self):
+        """
+        Cancela el trabajo en curso; los trabajos en cola siguen.
+        """
+        self._cancel_event.set()
+
+    def cancel_all(self):
+        """
+        Vacía la cola de trabajos y cancela el trabajo en curso.
+        """
+        while True:
+            try:
+                job_id, name, *_ = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            self._events.put(("finish", ("cancelado", name, None, None)))
+        self._cancel_event.set()
+
+    # Función del hilo de trabajo: ejecuta los trabajos en orden de llegada
+    def _work(self):
+        while True:
+            job_id, name, func, args, kwargs, on_success = self._jobs.get()
+            self._cancel_event.clear()
+            progress = JobProgress(job_id, name, self._events, self._cancel_event)
+            try:
+                result = func(*args, progress=progress, **kwargs)
+                self._events.put(("finish", ("ok", name, result, on_success)))
+            except JobCancelled:
+                self._events.put(("finish", ("cancelado", name, None, None)))
+            except Exception as e:
+                self._events.put(("finish", ("error", name, str(e), None)))
+
+    # Función que revisa la cola de eventos desde el hilo de tkinter
+    def _poll(self):
+        while True:
+            try:
+                kind, data = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                if self.on_progress is not None:
+                    self.on_progress(data)
+                continue
+
+            status, name, result, on_success = data
+            self.pending -= 1
+            if status == "ok" and on_success is not None:
+                on_success(result)
+            if self.on_finish is not None:
+                self.on_finish(status, name, result)
+
+        self.root.after(self.poll_ms, self._poll)
+
+# Panel con barra de progreso, estado y botones de cancelación
+class ProgressPanel:
+    """
+    Muestra el avance de los trabajos de un JobRunner: etapa, elementos hechos,
+    velocidad, tiempo restante y número de trabajos en cola.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.runner = None
+
+        frame = tk.Frame(root, bg='black')
+        frame.pack(side=tk.BOTTOM, fill='x', pady=10)
+
+        self.bar = ttk.Progressbar(frame, mode='determinate', length=600)
+        self.bar.pack(pady=5)
+
+        self.label = tk.Label(frame, text="Sin trabajos en curso", fg="white", bg='black', font=("arial", 14))
+        self.label.pack(pady=5)
+
+        buttons = tk.Frame(frame, bg='black')
+        buttons.pack()
+        ttk.Button(buttons, text="Cancelar", command=self.cancel).pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Cancelar todo", command=self.cancel_all).pack(side=tk.LEFT, padx=5)
+
+    def attach(self, runner):
+        """
+        Conecta el panel a un JobRunner.
+
+        :param runner: JobRunner cuyos trabajos se muestran.
+        """
+        self.runner = runner
+        runner.on_progress = self.update_progress
+
+    def cancel(self):
+        if self.runner is not None:
+            self.runner.cancel()
+
+    def cancel_all(self):
+        if self.runner is not None:
+            self.runner.cancel_all()
+
+    def update_progress(self, snapshot):
+        done, total = snapshot["done"], snapshot["total"]
+        if total:
+            self.bar.configure(mode='determinate', maximum=total, value=done)
+            texto = f"{snapshot['name']} - {snapshot['stage']}: {done}/{total}"
+        else:
+            self.bar.configure(mode='indeterminate')
+            self.bar.step()
+            texto = f"{snapshot['name']} - {snapshot['stage']}: {done}"
+
+        if snapshot["throughput"]:
+            texto += f" ({snapshot['throughput']:.1f}/s"
+            texto += f", faltan {snapshot['eta']:.0f} s)" if snapshot["eta"] is not None else ")"
+
+        en_cola = self.runner.pending - 1 if self.runner is not None else 0
+        if en_cola > 0:
+            texto += f" - en cola: {en_cola}"
+        self.label.configure(text=texto)
+
+    def show_finished(self, status, name):
+        """
+        Muestra el resultado del último trabajo terminado.
+
+        :param status: 'ok', 'error' o 'cancelado'.
+        :param name: Nombre del trabajo.
+        """
+        mensajes = {"ok": "terminado", "error": "terminado con error", "cancelado": "cancelado"}
+        self.bar.configure(mode='determinate', value=0)
+        self.label.configure(text=f"{name}: {mensajes.get(status, status)}")
+
+# Función para crear un JobRunner con su panel de progreso en una ventana
+def create_job_runner(root):
+    """
+    Crea el panel de progreso (abajo de la ventana) y un JobRunner conectado a él.
+    Los errores de los trabajos se muestran con messagebox en el hilo de tkinter.
+
+    :param root: Ventana principal de tkinter.
+    :return: JobRunner listo para recibir trabajos.
+    """
+    panel = ProgressPanel(root)
+
+    def on_finish(status, name, result):
+        panel.show_finished(status, name)
+        if status == "error":
+            messagebox.showerror("Error", f"{name}: {result}")
+
+    runner = JobRunner(root, on_finish=on_finish)
+    panel.attach(runner)
+    return runner
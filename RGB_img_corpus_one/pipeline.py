@@ -0,0 +1,524 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from corpus_vectorizer import iter_r_vectors, iter_channel_blocks, resized_shape
+from vector_store import get_store_path, write_vector_store, iter_r_matrices
+from vector_cache import VectorCache
+from channel_store import ChannelVectorBuilder, load_channel_block
+from image_channels import parse_channels
+from corpus_statistics import calculate_corpus_statistics, STATISTICS_COLUMNS
+from batch_regression import ajustar_regresiones, calcular_residuos, guardar_residuos, clasificar_bandas
+from report_writer import ReportWriter
+
+# Archivo con el estado de cada etapa dentro de la carpeta de trabajo
+STATE_NAME = "pipeline_state.json"
+
+# Libro único con las tablas de todas las etapas (opción --report)
+REPORT_NAME = "Reporte_Pipeline.xlsx"
+
+# Bloque con todos los canales de todas las imágenes (opción --channels)
+CHANNELS_NAME = "canales_corpus.npz"
+
+# Etapas del pipeline en orden y las etapas de las que depende cada una
+STAGES = ['vectorize', 'statistics', 'columns', 'regression', 'residuals', 'sigma']
+DEPENDENCIES = {
+    'vectorize': [],
+    'statistics': ['vectorize'],
+    'columns': ['statistics'],
+    'regression': ['columns'],
+    'residuals': ['columns', 'regression'],
+    'sigma': ['columns'],
+}
+
+# Carpetas de salida de cada etapa, con los mismos nombres que usan los scripts
+FOLDERS = {
+    'vectorize': '0.2.dataImages',
+    'statistics': '0.3.dataStadictist',
+    'columns': '0.5.Resultados',
+    'regression': '0.5.Resultados',
+    'residuals': '0.5.Resultados',
+    'sigma': '0.6.Resultados',
+}
+
+# Extensiones de imagen aceptadas (las mismas que get_image_files)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# ------------------------ Estado y huellas ------------------------
+
+# Función para leer el estado de la ejecución anterior
+def load_state(workdir):
+    state_file = os.path.join(workdir, STATE_NAME)
+    if not os.path.isfile(state_file):
+        return {}
+    with open(state_file, encoding='utf-8') as f:
+        return json.load(f)
+
+# Función para guardar el estado de forma atómica (un corte a mitad de escritura no lo corrompe)
+def save_state(workdir, state):
+    state_file = os.path.join(workdir, STATE_NAME)
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp_file, state_file)
+
+# Función para calcular la huella del contenido de varios archivos
+def hash_files(paths):
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode('utf-8'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+# Función para calcular la huella de la lista de imágenes del corpus (nombre, tamaño y fecha)
+def hash_corpus(corpus_path):
+    digest = hashlib.sha1()
+    for image_file in sorted(f for f in os.listdir(corpus_path) if f.endswith(IMAGE_EXTENSIONS)):
+        stat = os.stat(os.path.join(corpus_path, image_file))
+        digest.update(f"{image_file}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()
+
+# Función para calcular la huella de las entradas de una etapa
+def stage_fingerprint(stage, ctx, state):
+    """
+    Combina los parámetros de la etapa con la huella de las salidas de sus dependencias.
+    Si nada de eso cambió, la etapa no necesita volver a ejecutarse.
+
+    :param stage: Nombre de la etapa.
+    :param ctx: Diccionario con los argumentos de la ejecución.
+    :param state: Estado actual del pipeline.
+    :return: Huella hexadecimal.
+    """
+    entradas = {'stage': stage, 'params': STAGE_PARAMS[stage](ctx)}
+    entradas['deps'] = [state[dep]['output_hash'] for dep in DEPENDENCIES[stage]]
+    if stage == 'vectorize':
+        entradas['corpus'] = hash_corpus(ctx['corpus_path'])
+    return hashlib.sha1(json.dumps(entradas, sort_keys=True).encode('utf-8')).hexdigest()
+
+# ------------------------ Etapas ------------------------
+
+# Función para obtener la carpeta de salida de una etapa
+def stage_dir(ctx, stage):
+    path = os.path.join(ctx['workdir'], FOLDERS[stage])
+    if not os.path.exists(path):
+        os.makedirs(path)
+    return path
+
+# Función para saber si la ejecución analiza otros canales además del R
+def is_multichannel(ctx):
+    return tuple(ctx.get('channels', ('R',))) != ('R',)
+
+# Función para obtener el nombre del archivo de estadísticas de una imagen (y de un canal, con --channels)
+def statistics_file_name(image_file, channel=None):
+    stem = os.path.splitext(image_file)[0]
+    if channel is None:
+        return f"Estadisticas_{stem}_RGB_Vector.xlsx"
+    return f"Estadisticas_{stem}_{channel}_Vector.xlsx"
+
+# Etapa 1: vectorizar el canal R de todas las imágenes en el almacén binario
+def run_vectorize(ctx):
+    output_path = stage_dir(ctx, 'vectorize')
+    image_files = sorted(f for f in os.listdir(ctx['corpus_path']) if f.endswith(IMAGE_EXTENSIONS))
+    if is_multichannel(ctx):
+        return run_vectorize_channels(ctx, output_path, image_files)
+
+    cache = VectorCache(os.path.join(output_path, "vector_cache"))
+    errores = []
+    try:
+        def vectores_validos():
+            for image_file, r_vector, _, error in iter_r_vectors(ctx['corpus_path'], image_files, ctx['size'],
+                                                                 ctx['workers'], cache=cache):
+                if error is not None:
+                    print(f"Error procesando {image_file}: {error}")
+                    errores.append((image_file, error))
+                    continue
+                yield image_file, r_vector
+
+        write_vector_store(get_store_path(output_path), vectores_validos(), resized_shape(ctx['size']))
+    finally:
+        cache.close()
+
+    if errores:
+        print(f"{len(errores)} imágenes no se pudieron procesar.")
+
+    store_path = get_store_path(output_path)
+    return [os.path.join(store_path, f) for f in os.listdir(store_path) if f.endswith(('.npy', '.csv', '.json'))]
+
+# Etapa 1 con varios canales: cada imagen se decodifica una vez y se guardan todos los canales pedidos
+def run_vectorize_channels(ctx, output_path, image_files):
+    channels = tuple(ctx['channels'])
+    # cv2.resize devuelve (alto, ancho) para size=(ancho, alto)
+    builder = ChannelVectorBuilder((ctx['size'][1], ctx['size'][0]), channels, capacity=len(image_files))
+
+    cache = VectorCache(os.path.join(output_path, "vector_cache"))
+    errores = []
+    try:
+        for image_file, _, block, error in iter_channel_blocks(ctx['corpus_path'], image_files, ctx['size'], channels,
+                                                               ctx['workers'], cache=cache):
+            if error is not None:
+                print(f"Error procesando {image_file}: {error}")
+                errores.append((image_file, error))
+                continue
+            builder.add_vectors(image_file, *block.reshape(len(channels), -1))
+    finally:
+        cache.close()
+
+    if errores:
+        print(f"{len(errores)} imágenes no se pudieron procesar.")
+
+    channels_file = os.path.join(output_path, CHANNELS_NAME)
+    builder.save(channels_file)
+    return [channels_file]
+
+# Función para calcular las estadísticas de todos los canales de todas las imágenes en un solo cálculo
+def channel_statistics(channels_file):
+    """
+    Apila las matrices de todos los canales (canal por canal) en un solo arreglo 3D y calcula
+    las estadísticas de cada fila con una sola llamada a calculate_corpus_statistics.
+
+    :param channels_file: Archivo .npz con el bloque de canales de la etapa 'vectorize'.
+    :return: DataFrame con las columnas Imagen, Canal, Fila y las doce estadísticas.
+    """
+    image_files, channels, block = load_channel_block(channels_file)
+    n, c, alto = block.shape[:3]
+    if n == 0:
+        return pd.DataFrame(columns=['Imagen', 'Canal', 'Fila'] + STATISTICS_COLUMNS)
+
+    pila = block.transpose(1, 0, 2, 3).reshape((c * n,) + block.shape[2:])
+    estadisticas = calculate_corpus_statistics(list(image_files) * c, pila)
+    estadisticas.insert(1, 'Canal', np.repeat(np.asarray(channels, dtype=object), n * alto))
+    return estadisticas
+
+# Etapa 2: estadísticas de cada fila de cada matriz R (o de cada canal, con --channels)
+def run_statistics(ctx):
+    output_path = stage_dir(ctx, 'statistics')
+
+    if is_multichannel(ctx):
+        estadisticas = channel_statistics(os.path.join(ctx['workdir'], FOLDERS['vectorize'], CHANNELS_NAME))
+    else:
+        input_path = get_store_path(os.path.join(ctx['workdir'], FOLDERS['vectorize']))
+        tablas = [calculate_corpus_statistics(names, stack) for names, stack in iter_r_matrices(input_path)]
+        if tablas:
+            estadisticas = pd.concat(tablas, ignore_index=True)
+        else:
+            estadisticas = pd.DataFrame(columns=['Imagen', 'Fila'] + STATISTICS_COLUMNS)
+
+    # Tabla binaria para las etapas siguientes
+    table_file = os.path.join(output_path, "estadisticas_corpus.pkl")
+    estadisticas.to_pickle(table_file)
+    return [table_file]
+
+# Función para leer la matriz de columnas que produce la etapa 'columns'
+def load_columns(ctx):
+    data = np.load(os.path.join(ctx['workdir'], FOLDERS['columns'], "columnas.npz"), allow_pickle=False)
+    return list(data['nombres']), data['Y'], data['mascara']
+
+# Función para leer el canal de cada serie (None si la ejecución solo usó el canal R)
+def load_column_channels(ctx):
+    with np.load(os.path.join(ctx['workdir'], FOLDERS['columns'], "columnas.npz"), allow_pickle=False) as data:
+        return list(data['canales']) if 'canales' in data.files else None
+
+# Función para armar la tabla de Resultados_Columnas.xlsx (una columna por imagen)
+def columns_frame(nombres, Y, mascara):
+    return pd.DataFrame(np.where(mascara, Y, np.nan).T, columns=nombres)
+
+# Función para armar la tabla de Resultados_Regresiones.xlsx (una columna por serie)
+def regression_frame(nombres, pendiente, interseccion, r2):
+    return pd.DataFrame([pendiente, interseccion, r2], index=['Pendiente', 'Intersección', 'R^2'], columns=nombres)
+
+# Etapa 3: extraer la misma columna de estadísticas de todas las imágenes
+def run_columns(ctx):
+    estadisticas = pd.read_pickle(os.path.join(ctx['workdir'], FOLDERS['statistics'], "estadisticas_corpus.pkl"))
+    output_path = stage_dir(ctx, 'columns')
+
+    column = ctx['column']
+    if isinstance(column, int):
+        if not 0 <= column < len(STATISTICS_COLUMNS):
+            raise ValueError(f"El índice de columna {column} está fuera de rango (0 a {len(STATISTICS_COLUMNS) - 1}). "
+                             f"Opciones: {', '.join(STATISTICS_COLUMNS)}")
+        column = STATISTICS_COLUMNS[column]
+    if column not in STATISTICS_COLUMNS:
+        raise ValueError(f"La columna {column} no existe. Opciones: {', '.join(STATISTICS_COLUMNS)}")
+
+    # Una serie por imagen (y por canal), con el mismo nombre que le da process_excel_files;
+    # con varios canales las series de todos quedan en la misma matriz, canal por canal
+    multicanal = 'Canal' in estadisticas.columns
+    nombres, canales, series = [], [], []
+    for clave, grupo in estadisticas.groupby(['Canal', 'Imagen'] if multicanal else ['Imagen'], sort=False):
+        canal, image_file = clave if multicanal else (None, clave[0])
+        nombres.append(statistics_file_name(image_file, canal))
+        canales.append(canal)
+        series.append(grupo.sort_values('Fila')[column].to_numpy(dtype=np.float64))
+
+    largo = max((len(serie) for serie in series), default=0)
+    Y = np.zeros((len(series), largo))
+    mascara = np.zeros((len(series), largo), dtype=bool)
+    for i, serie in enumerate(series):
+        Y[i, :len(serie)] = serie
+        mascara[i, :len(serie)] = True
+
+    columns_file = os.path.join(output_path, "columnas.npz")
+    extra = {'canales': np.array(canales, dtype=str)} if multicanal else {}
+    np.savez(columns_file, nombres=np.array(nombres, dtype=str), Y=Y, mascara=mascara, **extra)
+    return [columns_file]
+
+# Etapa 4: regresión lineal de cada serie (X = 1, 2, ..., n como en 0.5.1)
+def run_regression(ctx):
+    nombres, Y, mascara = load_columns(ctx)
+    output_path = stage_dir(ctx, 'regression')
+
+    ajustes = ajustar_regresiones(Y, mascara, x_inicio=1)
+    regression_file = os.path.join(output_path, "regresiones.npz")
+    np.savez(regression_file, nombres=np.array(nombres, dtype=str),
+             **{clave.replace('^', '').replace('ó', 'o'): valores for clave, valores in ajustes.items()})
+    return [regression_file]
+
+# Etapa 5: distancias de cada punto a su recta de regresión
+def run_residuals(ctx):
+    nombres, Y, mascara = load_columns(ctx)
+    output_path = stage_dir(ctx, 'residuals')
+
+    data = np.load(os.path.join(ctx['workdir'], FOLDERS['regression'], "regresiones.npz"), allow_pickle=False)
+    ajustes = {'Pendiente': data['Pendiente'], 'Intersección': data['Interseccion'], 'n': data['n']}
+
+    con_signo, _ = calcular_residuos(Y, mascara, ajustes, x_inicio=1, perpendicular=ctx['perpendicular'])
+    residuals_file = os.path.join(output_path, 'Resultados_Distancias.npz')
+    guardar_residuos(residuals_file, nombres, con_signo, ajustes, ctx['perpendicular'])
+    return [residuals_file]
+
+# Etapa 6: conteo de puntos dentro de ±1σ, ±2σ y ±3σ (X = 0, 1, ..., n-1 como en 0.6.x)
+def run_sigma(ctx):
+    nombres, Y, mascara = load_columns(ctx)
+    output_path = stage_dir(ctx, 'sigma')
+
+    ajustes = ajustar_regresiones(Y, mascara, x_inicio=0)
+    bandas = clasificar_bandas(Y, mascara, ajustes, x_inicio=0, k_sigmas=(1, 2, 3))
+
+    # Conteos en binario; la tabla de Excel y la hoja del reporte se arman a partir de este archivo
+    sigma_file = os.path.join(output_path, 'intervalos_confianza.npz')
+    canales = load_column_channels(ctx)
+    extra = {'canales': np.array(canales, dtype=str)} if canales is not None else {}
+    np.savez(sigma_file, nombres=np.array(nombres, dtype=str), acumulados=bandas['acumulados'],
+             exclusivos=bandas['exclusivos'], fuera=bandas['fuera'], **extra)
+    return [sigma_file]
+
+# Función de cada etapa y parámetros que afectan su resultado
+STAGE_RUNNERS = {
+    'vectorize': run_vectorize,
+    'statistics': run_statistics,
+    'columns': run_columns,
+    'regression': run_regression,
+    'residuals': run_residuals,
+    'sigma': run_sigma,
+}
+# Solo entran los parámetros que cambian los resultados binarios; --no-excel y --report no,
+# porque los archivos Excel se escriben aparte a partir de esos resultados
+STAGE_PARAMS = {
+    # Los canales solo entran en la huella con --channels: las carpetas del modo R no se invalidan
+    'vectorize': lambda ctx: dict({'size': list(ctx['size'])},
+                                  **({'channels': list(ctx['channels'])} if is_multichannel(ctx) else {})),
+    'statistics': lambda ctx: {},
+    'columns': lambda ctx: {'column': ctx['column']},
+    'regression': lambda ctx: {},
+    'residuals': lambda ctx: {'perpendicular': ctx['perpendicular']},
+    'sigma': lambda ctx: {},
+}
+
+# ------------------------ Reporte ------------------------
+
+# Función para leer la tabla de regresiones guardada por la etapa 'regression'
+def load_regression_frame(ctx):
+    with np.load(os.path.join(ctx['workdir'], FOLDERS['regression'], "regresiones.npz"), allow_pickle=False) as data:
+        return regression_frame(list(data['nombres']), data['Pendiente'], data['Interseccion'], data['R2'])
+
+# Función para leer las distancias absolutas guardadas por la etapa 'residuals'
+def load_residuals_frame(ctx):
+    with np.load(os.path.join(ctx['workdir'], FOLDERS['residuals'], "Resultados_Distancias.npz"), allow_pickle=False) as data:
+        return pd.DataFrame(np.abs(data['distancias']).T, columns=list(data['nombres']))
+
+# Función para leer la tabla de estadísticas guardada por la etapa 'statistics'
+def load_statistics_frame(ctx):
+    return pd.read_pickle(os.path.join(ctx['workdir'], FOLDERS['statistics'], "estadisticas_corpus.pkl"))
+
+# Función para armar la tabla de Resultados_intervalos_confianza.xlsx a partir de los conteos de la etapa 'sigma'
+def load_sigma_frame(ctx):
+    with np.load(os.path.join(ctx['workdir'], FOLDERS['sigma'], "intervalos_confianza.npz"), allow_pickle=False) as data:
+        resultados = pd.DataFrame({'Columna': list(data['nombres'])})
+        for j, (k, porcentaje) in enumerate(((1, '68%'), (2, '95%'), (3, '99.7%'))):
+            resultados[f"Dentro de {porcentaje} (±{k}σ)"] = data['acumulados'][:, j]
+        for j, etiqueta in enumerate(("0-68% (±1σ)", "68-95% (±1σ a ±2σ)", "95-99.7% (±2σ a ±3σ)")):
+            resultados[f"Dentro de {etiqueta}"] = data['exclusivos'][:, j]
+        resultados['Fuera de ±3σ'] = data['fuera']
+        if 'canales' in data.files:
+            resultados.insert(1, 'Canal', list(data['canales']))
+    return resultados
+
+# Tablas del reporte: nombre de la hoja, etapa que la produce, función que la arma y si lleva índice
+REPORT_SHEETS = [
+    ('Estadisticas', 'statistics', load_statistics_frame, False),
+    ('Columnas', 'columns', lambda ctx: columns_frame(*load_columns(ctx)), False),
+    ('Regresiones', 'regression', load_regression_frame, True),
+    ('Distancias', 'residuals', load_residuals_frame, False),
+    ('Intervalos de confianza', 'sigma', load_sigma_frame, False),
+]
+
+# ------------------------ Archivos Excel por etapa ------------------------
+
+# Función para escribir un archivo Excel por imagen (y por canal), el formato que leen los scripts 0.5.x
+def export_statistics(ctx):
+    estadisticas = load_statistics_frame(ctx)
+    output_path = stage_dir(ctx, 'statistics')
+    multicanal = 'Canal' in estadisticas.columns
+    archivos = []
+    for clave, estadisticas_df in estadisticas.groupby(['Imagen', 'Canal'] if multicanal else ['Imagen'], sort=False):
+        archivos.append(os.path.join(output_path, statistics_file_name(*clave)))
+        estadisticas_df[STATISTICS_COLUMNS].to_excel(archivos[-1], index=False)
+    return archivos
+
+# Función para escribir la tabla de una etapa en el archivo Excel que usan los scripts 0.5.x y 0.6.x
+def export_table(stage, file_name, armar, index=False):
+    def exportar(ctx):
+        excel_file = os.path.join(stage_dir(ctx, stage), file_name)
+        armar(ctx).to_excel(excel_file, index=index)
+        return [excel_file]
+    return exportar
+
+# Archivos Excel de cada etapa; se escriben solo si se pidieron y no cuentan en la huella de la etapa
+STAGE_EXPORTS = {
+    'statistics': export_statistics,
+    'columns': export_table('columns', 'Resultados_Columnas.xlsx', lambda ctx: columns_frame(*load_columns(ctx))),
+    'regression': export_table('regression', 'Resultados_Regresiones.xlsx', load_regression_frame, index=True),
+    'residuals': export_table('residuals', 'Resultados_Distancias.xlsx', load_residuals_frame),
+    'sigma': export_table('sigma', 'Resultados_intervalos_confianza.xlsx', load_sigma_frame),
+}
+
+# Función para escribir las tablas de todas las etapas terminadas en un solo libro
+def write_report(ctx, stages):
+    """
+    Arma una hoja por etapa a partir de sus resultados binarios (en hilos, a la vez) y las escribe
+    en Reporte_Pipeline.xlsx de una sola pasada, en lugar de un libro pequeño por imagen y por etapa.
+
+    :param ctx: Diccionario con los argumentos de la ejecución.
+    :param stages: Etapas que se incluyen (solo las que ya terminaron).
+    :return: Ruta del reporte.
+    """
+    state = load_state(ctx['workdir'])
+    report_file = os.path.join(ctx['workdir'], REPORT_NAME)
+    with ReportWriter(report_file, workers=ctx['workers']) as reporte:
+        for nombre, stage, armar, index in REPORT_SHEETS:
+            if stage in stages and stage in state:
+                reporte.add_sheet_async(nombre, armar, ctx, index=index)
+    print(f"Reporte guardado en: {report_file}")
+    return report_file
+
+# ------------------------ Ejecución ------------------------
+
+# Función para ejecutar las etapas pedidas, saltando las que no cambiaron
+def run_pipeline(ctx, until=None, force=()):
+    """
+    Ejecuta las etapas en orden. Cada etapa terminada se registra en pipeline_state.json
+    junto con la huella de sus entradas y de sus salidas; en la siguiente ejecución se salta
+    si su huella no cambió y sus salidas siguen en disco. Así, tras un corte, el pipeline
+    continúa desde la primera etapa que no terminó. Los archivos Excel de cada etapa se escriben
+    aparte, a partir de sus resultados binarios, así que pedirlos no obliga a repetir la etapa.
+
+    :param ctx: Diccionario con los argumentos de la ejecución.
+    :param until: Última etapa a ejecutar (None = todas).
+    :param force: Etapas que se vuelven a ejecutar aunque no hayan cambiado.
+    :return: Diccionario {etapa: 'ejecutada' o 'sin cambios'}.
+    """
+    if not os.path.exists(ctx['workdir']):
+        os.makedirs(ctx['workdir'])
+
+    state = load_state(ctx['workdir'])
+    stages = STAGES[:STAGES.index(until) + 1] if until else STAGES
+    resumen = {}
+
+    for stage in stages:
+        fingerprint = stage_fingerprint(stage, ctx, state)
+        previo = state.get(stage)
+        al_dia = (previo is not None and previo['fingerprint'] == fingerprint
+                  and all(os.path.isfile(path) for path in previo['outputs']))
+
+        if al_dia and stage not in force:
+            print(f"[{stage}] sin cambios, se omite")
+            resumen[stage] = 'sin cambios'
+            # Los archivos Excel pueden faltar si la etapa se ejecutó antes con --no-excel o --report
+            excel_outputs = previo.get('excel_outputs')
+            if ctx['excel'] and stage in STAGE_EXPORTS and not (
+                    excel_outputs is not None and all(os.path.isfile(path) for path in excel_outputs)):
+                state[stage]['excel_outputs'] = STAGE_EXPORTS[stage](ctx)
+                save_state(ctx['workdir'], state)
+            continue
+
+        print(f"[{stage}] ejecutando...")
+        inicio = time.perf_counter()
+        # Quitar el registro antes de ejecutar: si la etapa se interrumpe no queda marcada como terminada
+        state.pop(stage, None)
+        save_state(ctx['workdir'], state)
+
+        outputs = STAGE_RUNNERS[stage](ctx)
+        state[stage] = {
+            'fingerprint': fingerprint,
+            'outputs': outputs,
+            'output_hash': hash_files(outputs),
+            'seconds': round(time.perf_counter() - inicio, 3),
+        }
+        if ctx['excel'] and stage in STAGE_EXPORTS:
+            state[stage]['excel_outputs'] = STAGE_EXPORTS[stage](ctx)
+        save_state(ctx['workdir'], state)
+        print(f"[{stage}] terminada en {state[stage]['seconds']} s")
+        resumen[stage] = 'ejecutada'
+
+    if ctx.get('report'):
+        write_report(ctx, stages)
+    return resumen
+
+# Función para leer los argumentos de la línea de comandos
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pipeline completo: vectorizar -> estadísticas -> columnas -> regresión -> distancias -> sigma.")
+    parser.add_argument('corpus_path', help="Carpeta con las imágenes del corpus.")
+    parser.add_argument('workdir', help="Carpeta de trabajo donde se guardan los resultados de cada etapa.")
+    parser.add_argument('--size', type=int, nargs=2, default=(10, 10), metavar=('ANCHO', 'ALTO'),
+                        help="Tamaño al que se redimensionan las imágenes (por defecto 10 10).")
+    parser.add_argument('--column', default='Media',
+                        help="Columna de estadísticas a extraer (nombre o índice, por defecto Media).")
+    parser.add_argument('--channels', default='R',
+                        help="Canales a analizar separados por comas: R, G, B, Gray, H, S, V, Lab_L, Lab_a, Lab_b "
+                             "o los grupos RGB, HSV y Lab (por defecto R). Cada imagen se decodifica una sola vez.")
+    parser.add_argument('--workers', type=int, default=None, help="Número de procesos (por defecto, todos los núcleos).")
+    parser.add_argument('--perpendicular', action='store_true', help="Distancia perpendicular a la recta en lugar de vertical.")
+    parser.add_argument('--no-excel', action='store_true', help="No escribir los reportes Excel intermedios.")
+    parser.add_argument('--report', action='store_true',
+                        help=f"Escribir todas las tablas en un solo libro {REPORT_NAME} en lugar de un archivo por imagen y por etapa.")
+    parser.add_argument('--until', choices=STAGES, default=None, help="Última etapa a ejecutar.")
+    parser.add_argument('--force', choices=STAGES, nargs='*', default=[], help="Etapas a ejecutar aunque no hayan cambiado.")
+    return parser.parse_args(argv)
+
+# Función principal
+def main(argv=None):
+    args = parse_args(argv)
+    ctx = {
+        'corpus_path': args.corpus_path,
+        'workdir': args.workdir,
+        'size': tuple(args.size),
+        'channels': parse_channels(args.channels),
+        'column': int(args.column) if args.column.isdigit() else args.column,
+        'workers': args.workers,
+        'perpendicular': args.perpendicular,
+        'excel': not args.no_excel and not args.report,
+        'report': args.report,
+    }
+    run_pipeline(ctx, until=args.until, force=set(args.force))
+    return 0
+
+# Ejecutar la función principal
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from openpyxl import Workbook
+
+# Escritor xlsxwriter (opcional): en modo constant_memory escribe cada fila al disco y la libera
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Largo máximo y caracteres no permitidos en los nombres de hoja de Excel
+MAX_SHEET_NAME = 31
+INVALID_SHEET_CHARS = '[]:*?/\\'
+
+# Función para obtener un nombre de hoja válido y que no se repita en el libro
+def unique_sheet_name(name, used):
+    """
+    Reemplaza los caracteres no permitidos, recorta a 31 caracteres y agrega un sufijo _1, _2...
+    si el nombre ya existe (Excel no distingue mayúsculas de minúsculas en los nombres de hoja).
+
+    :param name: Nombre deseado.
+    :param used: Conjunto con los nombres ya usados en minúsculas; se le agrega el nombre elegido.
+    :return: Nombre de hoja.
+    """
+    base = ''.join('_' if c in INVALID_SHEET_CHARS else c for c in str(name)).strip("'") or 'Sheet'
+    base = base[:MAX_SHEET_NAME]
+    nombre, n = base, 1
+    while nombre.lower() in used:
+        sufijo = f"_{n}"
+        nombre, n = base[:MAX_SHEET_NAME - len(sufijo)] + sufijo, n + 1
+    used.add(nombre.lower())
+    return nombre
+
+# Función para convertir un valor de NumPy o pandas en uno que entiendan los escritores de Excel
+def _cell(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is pd.NA or value is pd.NaT or (isinstance(value, float) and not np.isfinite(value)):
+        return None
+    return value
+
+# Función para convertir un DataFrame en encabezado y filas de celdas (los NaN quedan vacíos, igual que to_excel)
+def frame_to_rows(frame, index=False):
+    """
+    Convierte la tabla columna por columna: las columnas numéricas pasan a listas de Python
+    de una sola vez y solo las demás se revisan celda por celda.
+
+    :param frame: DataFrame con la tabla de la hoja.
+    :param index: Si es True, el índice se escribe como primera columna (igual que to_excel(index=True)).
+    :return: Tupla (encabezado, lista de filas).
+    """
+    encabezado = [_cell(c) for c in frame.columns]
+    columnas = [frame.index.to_series()] if index else []
+    columnas += [serie for _, serie in frame.items()]
+
+    listas = []
+    for serie in columnas:
+        valores = serie.to_numpy()
+        if valores.dtype.kind in 'biuf':
+            lista = valores.tolist()
+            if valores.dtype.kind == 'f':
+                for i in np.flatnonzero(~np.isfinite(valores)):
+                    lista[i] = None
+        else:
+            lista = [_cell(v) for v in valores]
+        listas.append(lista)
+
+    if index:
+        encabezado = [frame.index.name] + encabezado
+    return encabezado, [list(fila) for fila in zip(*listas)]
+
+# Escritura con xlsxwriter en modo de memoria constante
+def _write_xlsxwriter(excel_path, sheets):
+    workbook = xlsxwriter.Workbook(excel_path, {'constant_memory': True})
+    try:
+        for nombre, encabezado, filas in sheets:
+            worksheet = workbook.add_worksheet(nombre)
+            worksheet.write_row(0, 0, encabezado)
+            for r, fila in enumerate(filas, start=1):
+                worksheet.write_row(r, 0, fila)
+    finally:
+        workbook.close()
+
+# Escritura con openpyxl en modo de solo escritura (las filas se serializan sin crear celdas)
+def _write_openpyxl(excel_path, sheets):
+    workbook = Workbook(write_only=True)
+    for nombre, encabezado, filas in sheets:
+        worksheet = workbook.create_sheet(nombre)
+        worksheet.append(encabezado)
+        for fila in filas:
+            worksheet.append(fila)
+    workbook.save(excel_path)
+
+# Escritores disponibles, del más rápido al más lento
+WRITERS = {
+    'xlsxwriter': _write_xlsxwriter,
+    'openpyxl': _write_openpyxl,
+}
+
+# Función para elegir el escritor por defecto (xlsxwriter si está instalado, si no openpyxl en solo escritura)
+def default_write_engine():
+    return 'xlsxwriter' if xlsxwriter is not None else 'openpyxl'
+
+# Reporte de varias hojas que se escribe de una sola vez
+class ReportWriter:
+    """
+    Junta en memoria las tablas de un proceso y las escribe en un solo libro de varias hojas,
+    en una sola pasada y con un escritor de solo escritura, en lugar de un libro pequeño por tabla.
+    Las hojas se pueden preparar en un grupo de hilos (add_sheet_async) mientras se agregan las demás.
+
+    Uso:
+        with ReportWriter(ruta) as reporte:
+            reporte.add_sheet('Resumen', df)
+            reporte.add_sheet_async('Detalle', construir_tabla, datos)
+    """
+
+    def __init__(self, excel_path, engine=None, workers=None):
+        """
+        :param excel_path: Ruta del libro de salida.
+        :param engine: 'xlsxwriter' u 'openpyxl' (None = default_write_engine()).
+        :param workers: Hilos para preparar las hojas (None = todos los núcleos, 1 = sin hilos).
+        """
+        self.excel_path = excel_path
+        self.engine = engine or default_write_engine()
+        if self.engine not in WRITERS or (self.engine == 'xlsxwriter' and xlsxwriter is None):
+            raise ValueError(f"Escritor de Excel no disponible: {self.engine}.")
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.sheet_names = []
+        self._sheets = []
+        self._used = set()
+        self._executor = None
+
+    def __len__(self):
+        return len(self._sheets)
+
+    def add_sheet(self, name, frame, index=False):
+        """
+        Agrega una tabla ya calculada.
+
+        :param name: Nombre deseado de la hoja (se ajusta con unique_sheet_name).
+        :param frame: DataFrame o arreglo 2D.
+        :param index: Si es True, se escribe el índice como primera columna.
+        :return: Nombre final de la hoja.
+        """
+        return self.add_sheet_async(name, lambda: frame, index=index)
+
+    def add_sheet_async(self, name, function, *args, index=False):
+        """
+        Agrega una hoja cuya tabla se calcula con function(*args) en un hilo aparte;
+        la conversión a filas también se hace en ese hilo.
+
+        :param name: Nombre deseado de la hoja.
+        :param function: Función que devuelve un DataFrame o un arreglo 2D.
+        :param args: Argumentos de la función.
+        :param index: Si es True, se escribe el índice como primera columna.
+        :return: Nombre final de la hoja.
+        """
+        def preparar():
+            frame = function(*args)
+            if not isinstance(frame, pd.DataFrame):
+                frame = pd.DataFrame(np.asarray(frame))
+            return frame_to_rows(frame, index)
+
+        nombre = unique_sheet_name(name, self._used)
+        if self.workers <= 1:
+            self._sheets.append((nombre, preparar()))
+        else:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            self._sheets.append((nombre, self._executor.submit(preparar)))
+        self.sheet_names.append(nombre)
+        return nombre
+
+    def save(self):
+        """
+        Espera a que todas las hojas estén listas y escribe el libro en una sola pasada.
+
+        :return: Ruta del libro guardado.
+        """
+        try:
+            hojas = []
+            for nombre, hoja in self._sheets:
+                encabezado, filas = hoja.result() if hasattr(hoja, 'result') else hoja
+                hojas.append((nombre, encabezado, filas))
+        finally:
+            self.close()
+
+        carpeta = os.path.dirname(self.excel_path)
+        if carpeta and not os.path.exists(carpeta):
+            os.makedirs(carpeta)
+        # Un libro de Excel necesita al menos una hoja
+        WRITERS[self.engine](self.excel_path, hojas or [('Sheet1', [], [])])
+        return self.excel_path
+
+    def close(self):
+        """
+        Libera el grupo de hilos sin escribir el libro.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Si hubo un error no se escribe un libro incompleto
+        if exc_type is None:
+            self.save()
+        else:
+            self.close()
+        return False
@@ -0,0 +1,266 @@
+import os
+import sys
+import argparse
+import numpy as np
+from corpus_vectorizer import image_to_corpus_vector, build_corpus_memmap
+from vector_store import is_corpus_memmap, open_corpus_matrix
+
+# Distancias disponibles
+METRICS = ('l2', 'cosine')
+
+# Extensiones de imagen aceptadas (las mismas que get_image_files)
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Función para calcular la norma al cuadrado de cada fila, por bloques
+def row_norms(matrix, block_size=1024):
+    """
+    :param matrix: Arreglo 2D uint8 (n, d), puede estar mapeado en memoria.
+    :param block_size: Número de filas que se convierten a float a la vez.
+    :return: Arreglo float64 (n,) con la suma de cuadrados de cada fila.
+    """
+    norms = np.empty(len(matrix), dtype=np.float64)
+    for start in range(0, len(matrix), block_size):
+        block = np.asarray(matrix[start:start + block_size], dtype=np.float64)
+        norms[start:start + len(block)] = np.einsum('ij,ij->i', block, block)
+    return norms
+
+# Función para combinar los k mejores acumulados con los candidatos de un bloque nuevo
+def _merge_top_k(best_d, best_i, block_d, block_i, k):
+    cand_d = np.concatenate([best_d, block_d], axis=1)
+    cand_i = np.concatenate([best_i, block_i], axis=1)
+    if cand_d.shape[1] > k:
+        keep = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+        cand_d = np.take_along_axis(cand_d, keep, axis=1)
+        cand_i = np.take_along_axis(cand_i, keep, axis=1)
+    return cand_d, cand_i
+
+# Función de búsqueda exacta de los k vecinos más cercanos (fuerza bruta por bloques)
+def knn_search(matrix, queries, k=5, metric='l2', block_size=1024, norms=None, ids=None):
+    """
+    Compara cada consulta con todas las filas del corpus usando un producto de matrices por bloque:
+    ||q - x||² = ||q||² - 2 q·x + ||x||² y coseno = 1 - q·x / (||q|| ||x||). Solo un bloque de
+    block_size filas se convierte a float64 a la vez (exacto para vectores uint8), así que el corpus
+    puede estar mapeado en memoria.
+
+    :param matrix: Arreglo 2D (n, d) con un vector por fila (uint8 o float).
+    :param queries: Arreglo 2D (q, d) con los vectores de consulta.
+    :param k: Número de vecinos.
+    :param metric: 'l2' (distancia euclidiana) o 'cosine' (1 - similitud coseno).
+    :param block_size: Número de filas del corpus por bloque.
+    :param norms: Normas al cuadrado de las filas (de row_norms); se calculan si no se dan.
+    :param ids: Índice de cada fila de matrix en el corpus completo (None = 0..n-1).
+    :return: Tupla (índices (q, k), distancias (q, k)), ordenados de menor a mayor distancia.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Métrica desconocida: {metric}. Opciones: {', '.join(METRICS)}")
+
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+    n = len(matrix)
+    k = min(k, n)
+    if norms is None:
+        norms = row_norms(matrix, block_size)
+    q_norms = np.einsum('ij,ij->i', queries, queries)
+
+    best_d = np.empty((len(queries), 0), dtype=np.float64)
+    best_i = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, n, block_size):
+        block = np.asarray(matrix[start:start + block_size], dtype=np.float64)
+        block_norms = norms[start:start + len(block)]
+        productos = queries @ block.T
+
+        if metric == 'l2':
+            distancias = np.maximum(q_norms[:, None] - 2.0 * productos + block_norms[None, :], 0.0)
+        else:
+            denominador = np.sqrt(q_norms[:, None] * block_norms[None, :])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                distancias = np.where(denominador > 0, 1.0 - productos / denominador, 1.0)
+
+        # Los k mejores del bloque, sin ordenar todo el bloque
+        block_i = np.broadcast_to(np.arange(start, start + len(block)), distancias.shape)
+        if distancias.shape[1] > k:
+            keep = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+            distancias = np.take_along_axis(distancias, keep, axis=1)
+            block_i = np.take_along_axis(block_i, keep, axis=1)
+        best_d, best_i = _merge_top_k(best_d, best_i, distancias, block_i, k)
+
+    orden = np.argsort(best_d, axis=1, kind='stable')
+    best_d = np.take_along_axis(best_d, orden, axis=1)
+    best_i = np.take_along_axis(best_i, orden, axis=1)
+    if metric == 'l2':
+        best_d = np.sqrt(best_d)
+    if ids is not None:
+        best_i = np.asarray(ids)[best_i]
+    return best_i, best_d
+
+# Función para entrenar un índice IVF (k-means grueso + listas invertidas) en NumPy
+def train_ivf(matrix, nlist, iterations=10, sample_size=None, block_size=1024, seed=0):
+    """
+    Agrupa el corpus en nlist celdas con k-means sobre una muestra y asigna cada fila a su
+    centroide más cercano. Una consulta solo revisa las filas de las nprobe celdas más cercanas.
+
+    :param matrix: Arreglo 2D (n, d) del corpus.
+    :param nlist: Número de celdas (por ejemplo, sqrt(n)).
+    :param iterations: Iteraciones de k-means.
+    :param sample_size: Filas usadas para entrenar (None = 64 por celda).
+    :param block_size: Número de filas por bloque al asignar el corpus completo.
+    :param seed: Semilla del muestreo.
+    :return: Diccionario con 'centroides' (nlist, d), 'ids' (filas ordenadas por celda) y 'inicios' (nlist + 1).
+    """
+    n = len(matrix)
+    nlist = max(1, min(nlist, n))
+    rng = np.random.default_rng(seed)
+    sample_size = min(n, sample_size or 64 * nlist)
+    muestra = np.asarray(matrix[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float64)
+
+    centroides = muestra[rng.choice(len(muestra), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        asignacion, _ = knn_search(centroides, muestra, k=1, block_size=block_size)
+        asignacion = asignacion[:, 0]
+        conteos = np.bincount(asignacion, minlength=nlist)
+        sumas = np.zeros_like(centroides)
+        np.add.at(sumas, asignacion, muestra)
+        # Las celdas vacías conservan su centroide anterior
+        llenas = conteos > 0
+        centroides[llenas] = sumas[llenas] / conteos[llenas, None]
+
+    # Asignar todas las filas del corpus, por bloques
+    centroid_norms = row_norms(centroides)
+    asignacion = np.empty(n, dtype=np.int64)
+    for start in range(0, n, block_size):
+        block = matrix[start:start + block_size]
+        asignacion[start:start + len(block)] = knn_search(centroides, block, k=1, norms=centroid_norms)[0][:, 0]
+
+    ids = np.argsort(asignacion, kind='stable')
+    inicios = np.concatenate([[0], np.cumsum(np.bincount(asignacion, minlength=nlist))])
+    return {'centroides': centroides, 'ids': ids, 'inicios': inicios}
+
+# Índice de búsqueda sobre la matriz del corpus
+class SimilarityIndex:
+    """
+    Abre la matriz del corpus (archivo .npy con manifiesto de los scripts 0.0/0.1, o almacén de
+    vectores de 0.2-0.4) y responde consultas de los k vecinos más cercanos. Las normas y el índice
+    IVF opcional se guardan junto a la matriz .npy para no recalcularlos en cada consulta.
+    """
+
+    def __init__(self, input_path, block_size=1024):
+        """
+        :param input_path: Ruta de la matriz .npy del corpus o de la carpeta del almacén.
+        :param block_size: Número de filas por bloque en la búsqueda exacta.
+        """
+        self.block_size = block_size
+        self.matrix, self.image_files, self.vector_shape = open_corpus_matrix(input_path)
+        self._base = os.path.splitext(input_path)[0] if is_corpus_memmap(input_path) else None
+
+        self.norms = self._load_norms()
+        self.ivf = self._load_ivf()
+
+    def _sidecar(self, suffix):
+        return self._base + suffix if self._base is not None else None
+
+    def _load_norms(self):
+        # Las normas guardadas solo sirven si corresponden a la matriz actual
+        ruta = self._sidecar(".norms.npy")
+        if ruta is not None and os.path.isfile(ruta) and os.path.getmtime(ruta) >= os.path.getmtime(self._base + ".npy"):
+            norms = np.load(ruta)
+            if len(norms) == len(self.matrix):
+                return norms
+        norms = row_norms(self.matrix, self.block_size)
+        if ruta is not None:
+            np.save(ruta, norms)
+        return norms
+
+    def _load_ivf(self):
+        ruta = self._sidecar(".ivf.npz")
+        if ruta is None or not os.path.isfile(ruta) or os.path.getmtime(ruta) < os.path.getmtime(self._base + ".npy"):
+            return None
+        with np.load(ruta) as data:
+            ivf = {clave: data[clave] for clave in data.files}
+        return ivf if ivf['inicios'][-1] == len(self.matrix) else None
+
+    def build_ivf(self, nlist=None, iterations=10, seed=0):
+        """
+        Entrena el índice aproximado IVF y lo guarda junto a la matriz.
+
+        :param nlist: Número de celdas (None = raíz cuadrada del número de imágenes).
+        :param iterations: Iteraciones de k-means.
+        :param seed: Semilla del muestreo.
+        """
+        nlist = nlist or max(1, int(np.sqrt(len(self.matrix))))
+        self.ivf = train_ivf(self.matrix, nlist, iterations, block_size=self.block_size, seed=seed)
+        ruta = self._sidecar(".ivf.npz")
+        if ruta is not None:
+            np.savez(ruta, **self.ivf)
+
+    def vectorize(self, image_path):
+        """
+        Vectoriza una imagen de consulta con los mismos parámetros que el corpus
+        (tamaño y canal R o BGR, tomados de la forma de las matrices).
+
+        :param image_path: Ruta de la imagen.
+        :return: Vector 1D uint8.
+        """
+        return image_to_corpus_vector(image_path, self.vector_shape)
+
+    def search(self, queries, k=5, metric='l2', nprobe=None):
+        """
+        Busca los k vecinos más cercanos de cada consulta.
+
+        :param queries: Arreglo 2D (q, d) de vectores de consulta.
+        :param k: Número de vecinos.
+        :param metric: 'l2' o 'cosine'.
+        :param nprobe: Número de celdas IVF que se revisan (None = búsqueda exacta en todo el corpus).
+        :return: Lista (una por consulta) de listas de tuplas (imagen, distancia).
+        """
+        queries = np.atleast_2d(queries)
+        if nprobe is None or self.ivf is None:
+            ids, distancias = knn_search(self.matrix, queries, k, metric, self.block_size, self.norms)
+            return [[(self.image_files[i], float(d)) for i, d in zip(fila_i, fila_d)]
+                    for fila_i, fila_d in zip(ids, distancias)]
+
+        # Aproximado: solo las filas de las nprobe celdas más cercanas a cada consulta
+        celdas, _ = knn_search(self.ivf['centroides'], queries, nprobe)
+        resultados = []
+        for query, celdas_query in zip(queries, celdas):
+            candidatos = np.sort(np.concatenate([
+                self.ivf['ids'][self.ivf['inicios'][c]:self.ivf['inicios'][c + 1]] for c in celdas_query]))
+            ids, distancias = knn_search(self.matrix[candidatos], query[None, :], k, metric, self.block_size,
+                                         self.norms[candidatos], ids=candidatos)
+            resultados.append([(self.image_files[i], float(d)) for i, d in zip(ids[0], distancias[0])])
+        return resultados
+
+# Función principal: buscar las imágenes del corpus más parecidas a una o varias imágenes
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Busca las k imágenes del corpus más parecidas a una imagen.")
+    parser.add_argument('index_path', help="Matriz .npy del corpus (con su manifiesto) o carpeta del almacén de vectores.")
+    parser.add_argument('images', nargs='+', help="Imágenes de consulta.")
+    parser.add_argument('-k', type=int, default=5, help="Número de vecinos (por defecto 5).")
+    parser.add_argument('--metric', choices=METRICS, default='l2', help="Distancia (por defecto l2).")
+    parser.add_argument('--corpus', default=None, help="Carpeta de imágenes para crear la matriz si index_path no existe.")
+    parser.add_argument('--size', type=int, nargs=2, default=(100, 100), metavar=('ANCHO', 'ALTO'),
+                        help="Tamaño de los vectores al crear la matriz (por defecto 100 100).")
+    parser.add_argument('--color', action='store_true', help="Usar los tres canales (BGR) al crear la matriz; si no, solo R.")
+    parser.add_argument('--build-ivf', type=int, nargs='?', const=0, default=None, metavar='NLIST',
+                        help="Entrenar el índice aproximado IVF (NLIST celdas, por defecto sqrt(n)).")
+    parser.add_argument('--nprobe', type=int, default=None, help="Celdas IVF a revisar (sin este parámetro la búsqueda es exacta).")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.index_path):
+        if args.corpus is None:
+            print(f"No existe {args.index_path}; indique --corpus para crearlo.")
+            return 1
+        image_files = sorted(f for f in os.listdir(args.corpus) if f.endswith(IMAGE_EXTENSIONS))
+        build_corpus_memmap(args.corpus, image_files, args.index_path, tuple(args.size), color=args.color)
+
+    index = SimilarityIndex(args.index_path)
+    if args.build_ivf is not None:
+        index.build_ivf(args.build_ivf or None)
+
+    queries = np.stack([index.vectorize(image_path) for image_path in args.images])
+    for image_path, vecinos in zip(args.images, index.search(queries, args.k, args.metric, args.nprobe)):
+        print(f"Imágenes más parecidas a {image_path}:")
+        for posicion, (image_file, distancia) in enumerate(vecinos, 1):
+            print(f"  {posicion}. {image_file} (distancia {distancia:.4f})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import numpy as np
+from openpyxl import load_workbook
+from corpus_statistics import LEVELS, as_uint8, histogram_quantile
+from excel_reader import numeric_block
+
+# Acumulador de estadísticas en línea para un canal uint8
+class ChannelAccumulator:
+    """
+    Acumula estadísticas de un canal de 8 bits consumiendo los datos por bloques, en memoria constante.
+    La media y la varianza se actualizan con el método de Welford (combinación de Chan por bloques),
+    el mínimo y el máximo se llevan en línea, y un histograma de 256 niveles da la mediana, la moda
+    y los cuartiles exactos. Dos acumuladores se pueden combinar con merge().
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.histogram = np.zeros(LEVELS, dtype=np.int64)
+
+    def update(self, values):
+        """
+        Agrega un bloque de valores al acumulador.
+
+        :param values: Arreglo de cualquier forma con valores enteros entre 0 y 255.
+        :return: El mismo acumulador, para encadenar llamadas.
+        """
+        values = as_uint8(values).ravel()
+        if values.size == 0:
+            return self
+
+        # Estadísticas del bloque a partir de su histograma
+        histogram = np.bincount(values, minlength=LEVELS).astype(np.int64)
+        levels = np.arange(LEVELS, dtype=np.int64)
+        count = int(values.size)
+        total = int(histogram @ levels)
+        mean = total / count
+        m2 = float(histogram @ (levels - mean) ** 2)
+
+        presentes = np.flatnonzero(histogram)
+        self._combine(count, total, mean, m2, int(presentes[0]), int(presentes[-1]), histogram)
+        return self
+
+    def merge(self, other):
+        """
+        Combina otro acumulador (por ejemplo, el de otro proceso) con este.
+
+        :param other: ChannelAccumulator a combinar.
+        :return: El mismo acumulador, para encadenar llamadas.
+        """
+        if other.count:
+            self._combine(other.count, other.total, other.mean, other.m2,
+                          other.minimum, other.maximum, other.histogram)
+        return self
+
+    def _combine(self, count, total, mean, m2, minimum, maximum, histogram):
+        # Combinación de Chan et al. de dos conjuntos (n, media, M2)
+        n = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / n
+        self.m2 += m2 + delta * delta * self.count * count / n
+        self.count = n
+        self.total += total
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+        self.histogram += histogram
+
+    def variance(self, ddof=1):
+        if self.count - ddof <= 0:
+            return float('nan')
+        return self.m2 / (self.count - ddof)
+
+    def std(self, ddof=1):
+        return float(np.sqrt(self.variance(ddof)))
+
+    def quantile(self, q):
+        """
+        Cuantil exacto con interpolación lineal (igual que pandas), calculado del histograma.
+
+        :param q: Cuantil entre 0 y 1.
+        :return: Valor del cuantil.
+        """
+        if self.count == 0:
+            return float('nan')
+        return float(histogram_quantile(np.cumsum(self.histogram)[None, :], self.count, q)[0])
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def mode(self):
+        # En caso de empate se devuelve el menor nivel, igual que pandas y scipy
+        return int(self.histogram.argmax()) if self.count else None
+
+    def summary(self):
+        """
+        Devuelve las estadísticas acumuladas con los nombres usados en los reportes.
+
+        :return: Diccionario {nombre de la estadística: valor}.
+        """
+        return {
+            "Suma": self.total,
+            "Media": self.mean if self.count else float('nan'),
+            "Mediana": self.median(),
+            "Moda": self.mode(),
+            "Varianza": self.variance(),
+            "Desviación estándar": self.std(),
+            "Mínimo": self.minimum,
+            "Máximo": self.maximum,
+            "Cuartil 1": self.quantile(0.25),
+            "Cuartil 3": self.quantile(0.75),
+        }
+
+# Función para combinar los acumuladores de varios procesos o bloques
+def merge_accumulators(accumulators):
+    """
+    Combina una lista de acumuladores en uno nuevo.
+
+    :param accumulators: Iterable de ChannelAccumulator.
+    :return: ChannelAccumulator con el resultado combinado.
+    """
+    resultado = ChannelAccumulator()
+    for accumulator in accumulators:
+        resultado.merge(accumulator)
+    return resultado
+
+# Función para leer un archivo Excel por bloques de filas sin cargarlo completo
+def iter_excel_row_chunks(excel_path, chunk_rows=4096):
+    """
+    Lee la primera hoja de un archivo Excel en modo de solo lectura y la entrega por bloques de filas.
+
+    :param excel_path: Ruta del archivo Excel.
+    :param chunk_rows: Número de filas por bloque.
+    :return: Generador de tuplas (encabezados, bloque float64 de forma (filas, columnas));
+             los valores no numéricos se convierten en NaN.
+    """
+    workbook = load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+
+        bloque = []
+        for row in rows:
+            bloque.append(row)
+            if len(bloque) == chunk_rows:
+                yield header, numeric_block(bloque, len(header))
+                bloque = []
+        if bloque:
+            yield header, numeric_block(bloque, len(header))
+    finally:
+        workbook.close()
@@ -0,0 +1,48 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from corpus_vectorizer import image_to_r_vector, iter_r_vectors, choose_reduction_factor
+from benchmark_reduced_decode import (SIZES, MAX_MEAN_DIFFERENCE, MAX_P99_DIFFERENCE, MAX_DIFFERENCE,
+                                      reduced_decode_differences)
+
+# Corpus de ejemplo del repositorio
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'curpus')
+
+# Función para obtener las rutas de las imágenes del corpus de ejemplo
+def corpus_images():
+    if not os.path.isdir(CORPUS_PATH):
+        return []
+    return [os.path.join(CORPUS_PATH, f) for f in sorted(os.listdir(CORPUS_PATH)) if f.endswith(('.png', '.jpg', '.jpeg'))]
+
+# La decodificación reducida debe quedar cerca de la completa en todos los píxeles, no solo en promedio
+@pytest.mark.parametrize('size', SIZES)
+def test_reduced_decode_within_bounds(size):
+    image_paths = corpus_images()
+    if not image_paths:
+        pytest.skip("No se encontró el corpus de ejemplo.")
+
+    full = [image_to_r_vector(path, size, reduced=False)[1] for path in image_paths]
+    reduced = [image_to_r_vector(path, size, reduced=True)[1] for path in image_paths]
+    media, p99, maxima = reduced_decode_differences(full, reduced)
+
+    assert media <= MAX_MEAN_DIFFERENCE
+    assert p99 <= MAX_P99_DIFFERENCE
+    assert maxima <= MAX_DIFFERENCE
+
+# Con reduced=False los vectorizadores del corpus deben dar exactamente la decodificación completa
+def test_corpus_vectorizer_reduced_false_is_full_decode(tmp_path):
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 256, (1200, 1600, 3), dtype=np.uint8)
+    image_path = tmp_path / 'grande.jpg'
+    cv2.imwrite(str(image_path), image)
+
+    size = (8, 8)
+    assert choose_reduction_factor(str(image_path), size) > 1
+
+    esperado = cv2.resize(cv2.imread(str(image_path), cv2.IMREAD_COLOR), size)[:, :, 2]
+    (_, vector, matrix, error), = iter_r_vectors(str(tmp_path), ['grande.jpg'], size, workers=1, reduced=False)
+
+    assert error is None
+    assert np.array_equal(matrix, esperado)
+    assert np.array_equal(vector, esperado.ravel())
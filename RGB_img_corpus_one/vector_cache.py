@@ -0,0 +1,152 @@
+import os
+import time
+import sqlite3
+import hashlib
+import numpy as np
+
+# Tamaño máximo por defecto de la caché en disco (512 MB)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Caché persistente de vectores indexada por el contenido del archivo y los parámetros de redimensionado
+class VectorCache:
+    """
+    Guarda en disco las matrices ya vectorizadas para no volver a decodificar imágenes sin cambios.
+    La clave combina la identidad del archivo (hash del contenido, o tamaño + fecha de modificación)
+    con el tamaño final, el canal, la interpolación y el factor de decodificación reducida, así que
+    un archivo modificado, un tamaño nuevo o un cambio de decodificación simplemente no encuentra entrada. Cuando se supera max_bytes se eliminan las entradas usadas
+    hace más tiempo (LRU).
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, key_mode='stat'):
+        """
+        :param cache_dir: Carpeta donde se guardará la caché.
+        :param max_bytes: Tamaño máximo de la caché en bytes.
+        :param key_mode: 'stat' (tamaño + fecha de modificación) o 'hash' (SHA-1 del contenido).
+        """
+        if key_mode not in ('stat', 'hash'):
+            raise ValueError("key_mode debe ser 'stat' o 'hash'.")
+
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.key_mode = key_mode
+        self.hits = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"))
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, bytes INTEGER, last_access REAL)")
+        self._db.commit()
+
+    # Función para obtener la identidad del archivo según el modo de la clave
+    def _file_identity(self, image_path):
+        if self.key_mode == 'hash':
+            digest = hashlib.sha1()
+            with open(image_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            return digest.hexdigest()
+
+        stat = os.stat(image_path)
+        return f"{os.path.abspath(image_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def make_key(self, image_path, size, channel, interpolation='linear', decode_factor=1):
+        """
+        Construye la clave de una imagen para un tamaño, canal, interpolación y decodificación dados.
+
+        :param image_path: Ruta de la imagen.
+        :param size: Tamaño final (ancho, alto).
+        :param channel: Nombre del canal o conjunto de canales (por ejemplo 'R' o 'BGR').
+        :param interpolation: Nombre de la interpolación usada al redimensionar.
+        :param decode_factor: Factor de decodificación reducida (1 = resolución completa).
+        :return: Clave hexadecimal o None si el archivo no existe.
+        """
+        try:
+            identity = self._file_identity(image_path)
+        except OSError:
+            return None
+        text = f"{identity}|{size[0]}x{size[1]}|{channel}|{interpolation}|1/{decode_factor}"
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def contains(self, key):
+        """
+        Indica si existe una entrada para la clave, sin leerla. Las ausencias se cuentan como fallos.
+
+        :param key: Clave de make_key.
+        :return: True si la entrada está en disco.
+        """
+        found = key is not None and os.path.exists(self._entry_path(key))
+        if not found:
+            self.misses += 1
+        return found
+
+    def get(self, key):
+        """
+        Devuelve la matriz guardada para una clave y la marca como usada recientemente.
+
+        :param key: Clave de make_key.
+        :return: Arreglo guardado o None si no existe.
+        """
+        if key is None:
+            self.misses += 1
+            return None
+
+        path = self._entry_path(key)
+        try:
+            matrix = np.load(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return matrix
+
+    def put(self, key, matrix):
+        """
+        Guarda una matriz en la caché y aplica el límite de tamaño.
+
+        :param key: Clave de make_key.
+        :param matrix: Arreglo a guardar.
+        """
+        if key is None:
+            return
+
+        path = self._entry_path(key)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        np.save(path, matrix)
+
+        self._db.execute("INSERT OR REPLACE INTO entries (key, bytes, last_access) VALUES (?, ?, ?)",
+                         (key, os.path.getsize(path), time.time()))
+        self.evict()
+
+    def evict(self):
+        """
+        Elimina las entradas usadas hace más tiempo hasta que la caché quede bajo max_bytes.
+        """
+        total = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._db.execute("SELECT key, bytes FROM entries ORDER BY last_access").fetchall():
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self):
+        """
+        Guarda el índice en disco y cierra la caché.
+        """
+        self._db.commit()
+        self._db.close()
+        print(f"Caché de vectores: {self.hits} aciertos, {self.misses} fallos")
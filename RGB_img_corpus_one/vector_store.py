@@ -0,0 +1,257 @@
+import os
+import glob
+import json
+import numpy as np
+import pandas as pd
+from excel_reader import read_workbooks
+
+# Nombre de la carpeta del almacén dentro de la carpeta de salida
+STORE_DIRNAME = "vector_store"
+
+# Función para obtener la ruta del almacén de vectores dentro de una carpeta
+def get_store_path(output_path):
+    """
+    Devuelve la ruta del almacén de vectores de un corpus.
+
+    :param output_path: Carpeta de salida del vectorizador.
+    :return: Ruta de la carpeta del almacén.
+    """
+    return os.path.join(output_path, STORE_DIRNAME)
+
+# Función para verificar si una carpeta contiene un almacén de vectores
+def has_vector_store(path):
+    """
+    Indica si la carpeta (o su subcarpeta vector_store) contiene un almacén válido.
+
+    :param path: Carpeta a revisar.
+    :return: Ruta del almacén encontrado o None.
+    """
+    for candidate in (path, get_store_path(path)):
+        if os.path.isfile(os.path.join(candidate, "meta.json")):
+            return candidate
+    return None
+
+# Función para guardar un bloque de vectores en disco
+def _flush_chunk(store_path, chunk_id, buffer, count):
+    chunk_file = os.path.join(store_path, f"vectors_{chunk_id:05d}.npy")
+    np.save(chunk_file, buffer[:count])
+
+# Función para escribir todos los vectores de un corpus en un solo almacén binario
+def write_vector_store(store_path, items, shape, chunk_size=4096):
+    """
+    Escribe los vectores de un corpus en bloques .npy de tipo uint8 más un índice de nombres.
+    Reemplaza cualquier almacén previo en la misma carpeta.
+
+    :param store_path: Carpeta donde se guardará el almacén.
+    :param items: Iterable de tuplas (nombre de la imagen, vector 1D).
+    :param shape: Forma (filas, columnas) de la matriz de cada imagen.
+    :param chunk_size: Número de imágenes por bloque .npy.
+    :return: Número de vectores guardados.
+    """
+    if not os.path.exists(store_path):
+        os.makedirs(store_path)
+
+    # Eliminar bloques y metadatos de una ejecución anterior; meta.json se escribe al final,
+    # así un almacén interrumpido (por ejemplo, un trabajo cancelado) no pasa por válido
+    for old_file in glob.glob(os.path.join(store_path, "vectors_*.npy")) + [os.path.join(store_path, "meta.json")]:
+        if os.path.exists(old_file):
+            os.remove(old_file)
+
+    shape = tuple(int(d) for d in shape)
+    buffer = np.empty((chunk_size,) + shape, dtype=np.uint8)
+    index = {'Imagen': [], 'Bloque': [], 'Fila': []}
+    chunk_id, count = 0, 0
+
+    for image_file, vector in items:
+        buffer[count] = np.asarray(vector, dtype=np.uint8).reshape(shape)
+        index['Imagen'].append(image_file)
+        index['Bloque'].append(chunk_id)
+        index['Fila'].append(count)
+        count += 1
+
+        # Guardar el bloque cuando se llena
+        if count == chunk_size:
+            _flush_chunk(store_path, chunk_id, buffer, count)
+            chunk_id, count = chunk_id + 1, 0
+
+    if count:
+        _flush_chunk(store_path, chunk_id, buffer, count)
+
+    pd.DataFrame(index).to_csv(os.path.join(store_path, "index.csv"), index=False)
+
+    total = len(index['Imagen'])
+    with open(os.path.join(store_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"shape": list(shape), "dtype": "uint8", "chunk_size": chunk_size, "count": total}, f)
+
+    print(f"Almacén de vectores guardado en: {store_path} ({total} imágenes)")
+    return total
+
+# Función para leer el índice de nombres del almacén
+def read_store_index(store_path):
+    """
+    Lee el índice de nombres del almacén.
+
+    :param store_path: Carpeta del almacén.
+    :return: DataFrame con las columnas Imagen, Bloque y Fila.
+    """
+    return pd.read_csv(os.path.join(store_path, "index.csv"))
+
+# Función para recorrer el almacén bloque por bloque
+def iter_vector_store_chunks(store_path, mmap=True):
+    """
+    Recorre el almacén bloque por bloque sin cargar todo el corpus en memoria.
+
+    :param store_path: Carpeta del almacén.
+    :param mmap: Si es True, los bloques se abren mapeados en memoria.
+    :return: Generador de tuplas (lista de nombres, arreglo uint8 de forma (n, filas, columnas)).
+    """
+    index = read_store_index(store_path)
+    for chunk_id, group in index.groupby('Bloque', sort=True):
+        chunk_file = os.path.join(store_path, f"vectors_{chunk_id:05d}.npy")
+        # Las filas de cada bloque se guardan en el mismo orden que el índice
+        yield group['Imagen'].tolist(), np.load(chunk_file, mmap_mode='r' if mmap else None)
+
+# Función para leer todo el almacén como un solo arreglo
+def read_vector_store(store_path):
+    """
+    Lee todos los vectores del almacén como un arreglo 3D.
+
+    :param store_path: Carpeta del almacén.
+    :return: Tupla (lista de nombres, arreglo uint8 de forma (n, filas, columnas)).
+    """
+    with open(os.path.join(store_path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    names = []
+    data = np.empty((meta["count"],) + tuple(meta["shape"]), dtype=np.uint8)
+    start = 0
+    for chunk_names, chunk in iter_vector_store_chunks(store_path):
+        data[start:start + len(chunk_names)] = chunk
+        names.extend(chunk_names)
+        start += len(chunk_names)
+
+    return names, data
+
+# Función para exportar el almacén al formato Excel anterior (un archivo por imagen)
+def export_vector_store_to_excel(store_path, output_path):
+    """
+    Exporta cada vector del almacén a un archivo *_RGB_Vector.xlsx como reporte final opcional.
+
+    :param store_path: Carpeta del almacén.
+    :param output_path: Carpeta donde se guardarán los archivos Excel.
+    """
+    if not os.path.exists(output_path):
+        os.makedirs(output_path)
+
+    for chunk_names, chunk in iter_vector_store_chunks(store_path):
+        for image_file, matrix in zip(chunk_names, chunk):
+            excel_file = os.path.join(output_path, f'{os.path.splitext(image_file)[0]}_RGB_Vector.xlsx')
+            pd.DataFrame(np.asarray(matrix)).to_excel(excel_file, index=False, header=False)
+            print(f"Archivo guardado en: {excel_file}")
+
+# Función para crear la matriz del corpus preasignada y mapeada en memoria
+def create_corpus_memmap(matrix_path, n_images, vector_shape):
+    """
+    Crea un archivo .npy de forma (n_imágenes, longitud del vector) uint8 mapeado en memoria.
+
+    :param matrix_path: Ruta del archivo .npy de la matriz.
+    :param n_images: Número máximo de imágenes (filas).
+    :param vector_shape: Forma de la matriz de cada imagen, por ejemplo (alto, ancho) o (alto, ancho, 3).
+    :return: np.memmap escribible.
+    """
+    output_dir = os.path.dirname(matrix_path)
+    if output_dir and not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    row_length = int(np.prod(vector_shape))
+    return np.lib.format.open_memmap(matrix_path, mode='w+', dtype=np.uint8, shape=(n_images, row_length))
+
+# Función para obtener la ruta del manifiesto de una matriz del corpus
+def get_manifest_path(matrix_path):
+    return os.path.splitext(matrix_path)[0] + ".manifest.json"
+
+# Función para guardar el manifiesto de nombres de la matriz del corpus
+def save_corpus_manifest(matrix_path, image_files, vector_shape):
+    """
+    Guarda junto a la matriz un manifiesto con los nombres de archivo de cada fila.
+
+    :param matrix_path: Ruta del archivo .npy de la matriz.
+    :param image_files: Nombres de las imágenes en el orden de las filas.
+    :param vector_shape: Forma de la matriz de cada imagen.
+    """
+    with open(get_manifest_path(matrix_path), "w", encoding="utf-8") as f:
+        json.dump({"images": list(image_files), "shape": list(vector_shape), "count": len(image_files)}, f)
+
+# Función para abrir la matriz del corpus sin copiarla a memoria
+def open_corpus_memmap(matrix_path, mode='r'):
+    """
+    Abre la matriz del corpus mapeada en memoria junto con su manifiesto.
+    Solo se devuelven las filas de imágenes válidas.
+
+    :param matrix_path: Ruta del archivo .npy de la matriz.
+    :param mode: Modo de apertura de np.load ('r' solo lectura, 'r+' lectura y escritura).
+    :return: Tupla (matriz de forma (n, longitud), lista de nombres, forma de la matriz de cada imagen).
+    """
+    with open(get_manifest_path(matrix_path), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    matrix = np.load(matrix_path, mmap_mode=mode)
+    return matrix[:manifest["count"]], manifest["images"], tuple(manifest["shape"])
+
+# Función para verificar si una ruta es una matriz del corpus con manifiesto
+def is_corpus_memmap(path):
+    return os.path.isfile(path) and path.endswith('.npy') and os.path.isfile(get_manifest_path(path))
+
+# Función para abrir la matriz del corpus como un arreglo 2D (un vector por fila)
+def open_corpus_matrix(input_path):
+    """
+    Abre una matriz .npy del corpus (mapeada en memoria) o lee un almacén de vectores.
+
+    :param input_path: Ruta de la matriz .npy con manifiesto o de la carpeta del almacén.
+    :return: Tupla (matriz (n, longitud), lista de nombres, forma de la matriz de cada imagen).
+    """
+    if is_corpus_memmap(input_path):
+        return open_corpus_memmap(input_path)
+
+    store_path = has_vector_store(input_path)
+    if store_path is None:
+        raise ValueError(f"{input_path} no es una matriz del corpus ni un almacén de vectores.")
+    names, data = read_vector_store(store_path)
+    return data.reshape(len(data), -1), names, tuple(data.shape[1:])
+
+# Función para recorrer las matrices R de cualquier fuente del pipeline en bloques apilados
+def iter_r_matrices(input_path, chunk_size=4096):
+    """
+    Recorre las matrices R guardadas en una matriz .npy, en un almacén de vectores
+    o en una carpeta de archivos *_RGB_Vector.xlsx, entregándolas apiladas en bloques 3D.
+
+    :param input_path: Ruta de la matriz .npy, del almacén o de la carpeta de archivos Excel.
+    :param chunk_size: Número máximo de imágenes por bloque (solo para la matriz .npy).
+    :return: Generador de tuplas (lista de nombres, arreglo 3D (n, filas, columnas)).
+    """
+    # Matriz del corpus mapeada en memoria: cada fila es el vector de una imagen
+    if is_corpus_memmap(input_path):
+        matrix, image_files, vector_shape = open_corpus_memmap(input_path)
+        for start in range(0, len(image_files), chunk_size):
+            chunk = matrix[start:start + chunk_size]
+            yield image_files[start:start + chunk_size], chunk.reshape(len(chunk), vector_shape[0], -1)
+        return
+
+    # Almacén binario de vectores
+    store_path = has_vector_store(input_path)
+    if store_path is not None:
+        yield from iter_vector_store_chunks(store_path)
+        return
+
+    # Carpeta de archivos Excel: se agrupan las matrices que tienen la misma forma
+    # (los libros se leen en paralelo con el lector de solo lectura y llegan como arreglos)
+    grupos = {}
+    excel_files = [f for f in os.listdir(input_path) if f.endswith('.xlsx')]
+    libros = read_workbooks([os.path.join(input_path, f) for f in excel_files], header=False)
+    for excel_file, (_, matriz) in zip(excel_files, libros):
+        nombres, matrices = grupos.setdefault(matriz.shape, ([], []))
+        nombres.append(excel_file)
+        matrices.append(matriz)
+
+    for nombres, matrices in grupos.values():
+        yield nombres, np.stack(matrices)